@@ -1,7 +1,7 @@
 import json
 from .llm_client import get_llm_json_response
 
-def chat_with_data(message: str, user_role: str) -> dict:
+async def chat_with_data(message: str, user_role: str) -> dict:
     """
     Conversational agent for Donors and Admins to ask questions about the platform,
     orphanages, or how to help.
@@ -22,7 +22,7 @@ def chat_with_data(message: str, user_role: str) -> dict:
     
     user_prompt = message
     
-    llm_response_text = get_llm_json_response(system_prompt, user_prompt)
+    llm_response_text = await get_llm_json_response(system_prompt, user_prompt)
     
     try:
         return json.loads(llm_response_text)
@@ -0,0 +1,208 @@
+# ============================================================
+# agent/cohort_matcher.py — Cohort × Opportunity Matching
+# Matches a whole transition cohort (youth nearing
+# transitionTimeline.expectedExitDate) against the entire
+# opportunity board at once, without the LLM:
+#
+#   Q  (children × terms)       query term counts per child
+#                               (child_query in opportunity_index)
+#   W  (terms × opportunities)  BM25 posting weights, only for the
+#                               terms the cohort actually uses
+#   S = Q @ W                   similarity of every pair
+#
+# S is computed COHORT_BLOCK_SIZE children at a time, so memory
+# stays bounded for any cohort. Each block updates:
+#   • per-child top-k     (argpartition along each row)
+#   • per-opportunity top-k (merged with the best so far)
+#
+# Optional capacity-aware assignment then gives each child at
+# most one opportunity from their ASSIGN_POOL best, best pairs
+# first, without filling any opportunity beyond its capacity.
+#
+# scipy is not a dependency, so both matrices are dense NumPy
+# over the cohort's vocabulary — which is small, since it only
+# holds skill/education/type/location terms.
+# ============================================================
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .opportunity_index import get_opportunity_index, child_query
+
+COHORT_BLOCK_SIZE = 512
+
+# Assignment looks this far down each child's list, so a child
+# whose favourites fill up still gets a place
+ASSIGN_POOL = 50
+
+# Largest k a caller may ask for (matches per child / candidates
+# per opportunity)
+MAX_K = 50
+
+
+def _id(record: dict, index: int) -> str:
+    return str(record.get("_id") or record.get("id") or index)
+
+
+def transition_cohort(children: List[dict], within_days: int) -> List[dict]:
+    """
+    Children whose expectedExitDate falls within the next
+    within_days days (or has already passed).
+    """
+
+    cutoff = datetime.now(timezone.utc) + timedelta(days=within_days)
+    cohort = []
+    for child in children:
+        exit_date = (child.get("transitionTimeline") or {}).get("expectedExitDate")
+        if isinstance(exit_date, str):
+            try:
+                exit_date = datetime.fromisoformat(exit_date.replace("Z", "+00:00"))
+            except ValueError:
+                continue
+        if not isinstance(exit_date, datetime):
+            continue
+        if exit_date.tzinfo is None:
+            exit_date = exit_date.replace(tzinfo=timezone.utc)
+        if exit_date <= cutoff:
+            cohort.append(child)
+    return cohort
+
+
+def _query_matrix(children: List[dict]):
+    """
+    (children × terms) count matrix and its term list.
+    """
+
+    queries = [child_query(child) for child in children]
+    vocabulary: Dict[str, int] = {}
+    for query in queries:
+        for term in query:
+            vocabulary.setdefault(term, len(vocabulary))
+
+    matrix = np.zeros((len(children), len(vocabulary)), dtype=np.float32)
+    for row, query in enumerate(queries):
+        for term, count in query.items():
+            matrix[row, vocabulary[term]] = count
+    return matrix, list(vocabulary)
+
+
+def _assign(pairs: List[tuple], capacity: np.ndarray) -> Dict[int, int]:
+    """
+    Greedy assignment over (score, child, opportunity) pairs,
+    best first: each child once, each opportunity up to capacity.
+    """
+
+    assigned: Dict[int, int] = {}
+    remaining = capacity.copy()
+    for score, child, opportunity in sorted(pairs, reverse=True):
+        if child in assigned or remaining[opportunity] <= 0:
+            continue
+        assigned[child] = opportunity
+        remaining[opportunity] -= 1
+    return assigned
+
+
+def match_cohort(children: List[dict], opportunities: List[dict], k: int = 5,
+                 assign: bool = False, capacity: Optional[Dict[str, int]] = None,
+                 default_capacity: int = 1) -> dict:
+    """
+    Scores every child against every opportunity.
+
+    Args:
+        children         : cohort profiles
+        opportunities    : active Opportunity documents
+        k                : matches kept per child and candidates per opportunity
+        assign           : also return a capacity-aware assignment
+        capacity         : opportunity id → places (default_capacity otherwise)
+
+    Returns:
+        {"children": [{childId, name, matches: [{opportunityId, title, score}]}],
+         "opportunities": [{opportunityId, title, candidates: [{childId, name, score}]}],
+         "assignments": [{childId, opportunityId, score}]   (only if assign)}
+        Pairs sharing no terms (score 0) are never listed.
+    """
+
+    m, n = len(children), len(opportunities)
+    result = {"children": [], "opportunities": []}
+    if assign:
+        result["assignments"] = []
+    if m == 0 or n == 0:
+        return result
+
+    index = get_opportunity_index(opportunities)
+    queries, terms = _query_matrix(children)
+    weights = index.term_matrix(terms)
+
+    k_child = min(max(k, ASSIGN_POOL) if assign else k, n)
+    child_top = np.zeros((m, k_child), dtype=np.int64)
+    child_scores = np.zeros((m, k_child), dtype=np.float32)
+
+    # Running per-opportunity best: (k, n) child rows and scores
+    k_opp = min(k, m)
+    opp_top = np.full((0, n), -1, dtype=np.int64)
+    opp_scores = np.zeros((0, n), dtype=np.float32)
+
+    for start in range(0, m, COHORT_BLOCK_SIZE):
+        block = queries[start:start + COHORT_BLOCK_SIZE] @ weights   # (b, n)
+        rows = np.arange(block.shape[0])[:, None]
+
+        # Per-child top-k within the row
+        top = np.argpartition(-block, k_child - 1, axis=1)[:, :k_child] if k_child < n \
+            else np.tile(np.arange(n), (block.shape[0], 1))
+        order = np.argsort(-block[rows, top], axis=1, kind="stable")
+        child_top[start:start + block.shape[0]] = top[rows, order]
+        child_scores[start:start + block.shape[0]] = block[rows, top[rows, order]]
+
+        # Per-opportunity: merge this block's rows with the best so far
+        merged_scores = np.vstack([opp_scores, block])
+        merged_rows = np.vstack([opp_top, np.arange(start, start + block.shape[0])[:, None].repeat(n, axis=1)])
+        keep = min(k_opp, merged_scores.shape[0])
+        best = np.argpartition(-merged_scores, keep - 1, axis=0)[:keep] if keep < merged_scores.shape[0] \
+            else np.arange(merged_scores.shape[0])[:, None].repeat(n, axis=1)
+        columns = np.arange(n)[None, :]
+        opp_scores = merged_scores[best, columns]
+        opp_top = merged_rows[best, columns]
+
+    order = np.argsort(-opp_scores, axis=0, kind="stable")
+    columns = np.arange(n)[None, :]
+    opp_scores, opp_top = opp_scores[order, columns], opp_top[order, columns]
+
+    child_ids = [_id(c, i) for i, c in enumerate(children)]
+    opp_ids = [_id(o, j) for j, o in enumerate(opportunities)]
+
+    for i in range(m):
+        result["children"].append({
+            "childId": child_ids[i],
+            "name": children[i].get("name"),
+            "matches": [
+                {"opportunityId": opp_ids[j], "title": opportunities[j].get("title"), "score": round(float(s), 3)}
+                for j, s in zip(child_top[i][:k], child_scores[i][:k]) if s > 0
+            ]
+        })
+
+    for j in range(n):
+        result["opportunities"].append({
+            "opportunityId": opp_ids[j],
+            "title": opportunities[j].get("title"),
+            "candidates": [
+                {"childId": child_ids[i], "name": children[i].get("name"), "score": round(float(s), 3)}
+                for i, s in zip(opp_top[:, j], opp_scores[:, j]) if s > 0
+            ]
+        })
+
+    if assign:
+        places = np.array([(capacity or {}).get(opp_ids[j], default_capacity) for j in range(n)])
+        pairs = [
+            (float(s), i, int(j))
+            for i in range(m) for j, s in zip(child_top[i], child_scores[i]) if s > 0
+        ]
+        for i, j in sorted(_assign(pairs, places).items()):
+            result["assignments"].append({
+                "childId": child_ids[i],
+                "opportunityId": opp_ids[j],
+                "score": round(float(child_scores[i][child_top[i] == j][0]), 3)
+            })
+
+    return result
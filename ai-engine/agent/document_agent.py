@@ -1,7 +1,7 @@
 import json
 from .llm_client import get_llm_json_response
 
-def process_document(image_url: str, doc_type: str) -> dict:
+async def process_document(image_url: str, doc_type: str) -> dict:
     """
     Agent 3: Smart Document Extraction Agent.
     Simulates OCR + AI extraction of structured data from an identity document.
@@ -30,7 +30,7 @@ def process_document(image_url: str, doc_type: str) -> dict:
     
     user_prompt = f"Analyze this document: {image_url}"
     
-    llm_response_text = get_llm_json_response(system_prompt, user_prompt)
+    llm_response_text = await get_llm_json_response(system_prompt, user_prompt)
     
     try:
         return json.loads(llm_response_text)
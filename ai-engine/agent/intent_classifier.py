@@ -14,9 +14,15 @@
 import os
 import json
 import re
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
-from config.settings import LLM_PROVIDER, get_llm
+from config.settings import (
+    LLM_PROVIDER, CLASSIFIER_MODE, CASCADE_CONFIDENCE_THRESHOLD,
+    INTENT_CACHE_SIZE, INTENT_CACHE_TTL, INTENT_LOG_PATH
+)
+from agent.llm_client import get_chat_model, ainvoke
+from agent.intent_model import get_intent_model
+from memory.cache import TieredCache
 
 # ============================================================
 # Intent Model
@@ -59,6 +65,11 @@ class Intent(BaseModel):
     # Example: "Would you like to donate money, sponsor a child,
     #           or send supplies to an orphanage?"
 
+    source: str = "keywords"
+    # Which classifier tier produced this intent:
+    # "keywords" → _fallback_intent, "local" → local trained model,
+    # "cache" → intent cache, "llm" → live LLM call
+
 # ============================================================
 # MAIN FUNCTION — called by operator.py
 # This is the only function operator.py needs to call.
@@ -80,26 +91,63 @@ async def classify(message: str, session_id: str = "") -> Intent:
         Intent object with workflow, amount, filters, confidence
     """
 
+    # ── LOCAL MODEL MODE ──────────────────────────────────────
+    # Offline trained model first — unsure messages fall through
+    if CLASSIFIER_MODE == "local":
+        local_intent = _local_intent(message)
+        if local_intent and local_intent.confidence >= CASCADE_CONFIDENCE_THRESHOLD:
+            return _record(local_intent)
+
     # Check LLM_PROVIDER from settings.py
     # If not "fallback" → use LLM for smart classification
     # If "fallback"     → use keyword matching (no API key needed)
 
-    if LLM_PROVIDER != "fallback":
-        # ── LLM MODE ──────────────────────────────────────────
-        try:
-            intent = await _classify_with_llm(message)
-            intent.raw_message = message
-            return intent
-        except Exception as e:
-            # If LLM call fails for any reason, fall back to keywords
-            print(f"[intent_classifier] LLM failed ({e}), using fallback")
-            return _fallback_intent(message)
-    else:
+    if LLM_PROVIDER == "fallback":
         # ── FALLBACK MODE ─────────────────────────────────────
         # LLM_PROVIDER=fallback in .env — use keyword matching
         # This lets you build and test all workflows without any API key
         print("[intent_classifier] Fallback mode — using keyword matching")
-        return _fallback_intent(message)
+        return _record(_fallback_intent(message))
+
+    # ── CASCADE MODE ──────────────────────────────────────────
+    # Keywords first — only unsure or ambiguous messages go on to the LLM
+    keyword_intent = None
+    if CLASSIFIER_MODE == "cascade":
+        keyword_intent = _fallback_intent(message)
+        if (keyword_intent.confidence >= CASCADE_CONFIDENCE_THRESHOLD
+                and not keyword_intent.needs_clarification):
+            return _record(keyword_intent)
+        print(f"[intent_classifier] Keyword confidence {keyword_intent.confidence} "
+              f"below {CASCADE_CONFIDENCE_THRESHOLD}, escalating to LLM")
+
+    # ── LLM MODE ──────────────────────────────────────────────
+    # Same phrasing seen before? Skip the LLM round-trip
+    cached = await _get_cached_intent(message)
+    if cached:
+        return _record(cached)
+
+    try:
+        intent = await _classify_with_llm(message)
+        intent.raw_message = message
+        return _record(intent)
+    except Exception as e:
+        # If LLM call fails for any reason, fall back to keywords
+        print(f"[intent_classifier] LLM failed ({e}), using fallback")
+        return _record(keyword_intent or _fallback_intent(message))
+
+
+# Requests answered per tier — served by GET /metrics
+_tier_counts = {"keywords": 0, "local": 0, "cache": 0, "llm": 0}
+
+
+def _record(intent: Intent) -> Intent:
+    """
+    Counts which tier answered and logs it. Returns the intent unchanged.
+    """
+
+    _tier_counts[intent.source] = _tier_counts.get(intent.source, 0) + 1
+    print(f"[intent_classifier] Answered by tier: {intent.source}")
+    return intent
 
 
 # ============================================================
@@ -110,27 +158,31 @@ async def classify(message: str, session_id: str = "") -> Intent:
 async def _classify_with_llm(message: str) -> Intent:
     """
     Sends the message to the LLM and parses the structured response.
-    Uses get_llm() from settings.py — automatically picks
+    Uses the cached chat model from llm_client.py — automatically
     Groq, Anthropic, or OpenAI based on LLM_PROVIDER in .env.
     """
 
-    # Get LLM instance from settings — fast=True uses smaller/faster model
+    # Cached model built at startup — fast=True uses smaller/faster model
     # which is perfect for intent classification
-    llm = get_llm(fast=True)
-
-    if llm is None:
-        print("[intent_classifier] get_llm() returned None, using fallback")
+    if get_chat_model(fast=True) is None:
+        print("[intent_classifier] get_chat_model() returned None, using fallback")
         return _fallback_intent(message)
 
     prompt = _build_prompt(message)
 
-    # Invoke the LLM — works the same for Groq, Anthropic, OpenAI
+    # Await the LLM — works the same for Groq, Anthropic, OpenAI
     # because all use LangChain's unified interface
-    response = llm.invoke(prompt)
-    raw_text = response.content
+    raw_text = await ainvoke(prompt, fast=True)
 
     print(f"[intent_classifier] LLM ({LLM_PROVIDER}) responded successfully")
-    return _parse_llm_response(raw_text, message)
+    intent = _parse_llm_response(raw_text, message)
+
+    if intent is None:
+        return _fallback_intent(message)
+
+    await _cache_intent(message, intent)
+    _log_training_pair(message, intent)
+    return intent
 
 
 def _build_prompt(message: str) -> str:
@@ -175,11 +227,11 @@ Rules:
 - Always return valid JSON only"""
 
 
-def _parse_llm_response(raw_response: str, original_message: str) -> Intent:
+def _parse_llm_response(raw_response: str, original_message: str) -> Optional[Intent]:
     """
     Parses the raw LLM text response into a clean Intent object.
-    If parsing fails for any reason, returns a safe fallback
-    instead of crashing the whole system.
+    If parsing fails for any reason, returns None so the caller
+    can fall back instead of crashing the whole system.
 
     Args:
         raw_response     : raw text from LLM (should be JSON)
@@ -199,15 +251,101 @@ def _parse_llm_response(raw_response: str, original_message: str) -> Intent:
             confidence=float(data.get("confidence", 0.8)),
             needs_clarification=bool(data.get("needs_clarification", False)),
             clarification_question=data.get("clarification_question"),
-            raw_message=original_message
+            raw_message=original_message,
+            source="llm"
         )
 
     except Exception as e:
         # LLM returned something we couldn't parse
-        # Fall back to keyword matching rather than crashing
+        # Caller falls back to keyword matching rather than crashing
         print(f"[intent_classifier] Failed to parse LLM response: {e}")
         print(f"[intent_classifier] Raw response was: {raw_response}")
-        return _fallback_intent(original_message)
+        return None
+
+
+# ============================================================
+# INTENT CACHE — repeated phrasings skip the LLM entirely
+# Key = message normalized with the amount stripped out, so
+# "Donate ₹5000 for books" and "donate rs 200 for books" share
+# one entry. The amount is re-extracted from each message.
+# ============================================================
+
+_intent_cache = TieredCache("intent", max_entries=INTENT_CACHE_SIZE, ttl=INTENT_CACHE_TTL)
+
+_NUMBER_RE   = re.compile(r'\d+(?:,\d+)*(?:\.\d+)?')
+_CURRENCY_RE = re.compile(r'₹|\brs\b\.?|\binr\b|\brupees?\b')
+_PUNCT_RE    = re.compile(r'[^\w\s<>]')
+
+
+def _cache_key(message: str) -> str:
+    """
+    Normalizes a message into its cache key.
+    Lowercase, numbers → <amt>, currency words and punctuation dropped,
+    whitespace collapsed.
+    """
+
+    msg = message.lower()
+    msg = _NUMBER_RE.sub(" <amt> ", msg)
+    msg = _CURRENCY_RE.sub(" ", msg)
+    msg = _PUNCT_RE.sub(" ", msg)
+    return " ".join(msg.split())
+
+
+def _amount_for_cache(message: str) -> Optional[float]:
+    """
+    The amount a cached intent gets for this message.
+    Same rules as the fallback classifier, plus a lone bare number
+    ("donate 5000 for books") counts as the amount.
+    """
+
+    amount = _extract_amount(message.lower())
+    if amount is None:
+        numbers = _NUMBER_RE.findall(message)
+        if len(numbers) == 1:
+            amount = float(numbers[0].replace(",", ""))
+    return amount
+
+
+async def _get_cached_intent(message: str) -> Optional[Intent]:
+    """
+    Returns a cached Intent for this message with its own amount
+    re-injected, or None on a miss.
+    """
+
+    cached = await _intent_cache.get(_cache_key(message))
+    if cached is None:
+        return None
+
+    cached.pop("source", None)
+    return Intent(**cached, amount=_amount_for_cache(message), raw_message=message, source="cache")
+
+
+async def _cache_intent(message: str, intent: Intent) -> None:
+    """
+    Stores an LLM-classified Intent without its amount.
+    Only cached when the amount can be re-derived exactly from the
+    text — otherwise a later hit could attach the wrong amount.
+    """
+
+    if intent.amount != _amount_for_cache(message):
+        return
+
+    await _intent_cache.set(
+        _cache_key(message),
+        intent.dict(exclude={"amount", "raw_message", "source"})
+    )
+
+
+def classifier_stats() -> dict:
+    """
+    Per-tier answer counts and intent cache counters — served by GET /metrics.
+    """
+
+    return {
+        "mode": "fallback" if LLM_PROVIDER == "fallback" else CLASSIFIER_MODE,
+        "tiers": dict(_tier_counts),
+        "cache": _intent_cache.stats()
+    }
 
 
 # ============================================================
@@ -216,108 +354,287 @@ def _parse_llm_response(raw_response: str, original_message: str) -> Intent:
 # Keeps the system working at all times during development
 # ============================================================
 
+# Keyword lists for each workflow
+_URGENT_KEYWORDS = ["urgent", "urgently", "emergency", "critical", "immediately",
+                    "asap", "right now", "serious", "severe"]
+
+_MEDICAL_KEYWORDS = ["sick", "hospital", "surgery", "treatment", "medicine",
+                     "medical", "disease", "operation", "doctor", "ill",
+                     "emergency", "cancer", "injury", "health"]
+
+_SPONSORSHIP_KEYWORDS = ["sponsor", "sponsorship", "monthly", "long-term",
+                         "long term", "adopt", "support a child", "regular"]
+
+_SUPPLY_KEYWORDS = ["supply", "supplies", "blanket", "blankets", "food",
+                    "clothes", "clothing", "uniform", "uniforms", "items",
+                    "material", "stationery", "toys", "mattress", "bed",
+                    "orphanage", "send", "donate items", "donate goods"]
+
+_EDUCATION_KEYWORDS = ["education", "school", "book", "books", "study",
+                       "learn", "uniform", "fee", "fees", "tuition",
+                       "scholarship", "college", "class", "stationary"]
+
+_ITEM_MAP = {
+    "blanket": "blankets", "book": "books", "uniform": "uniforms",
+    "food": "food", "toy": "toys", "stationery": "stationery",
+    "clothes": "clothing", "mattress": "mattress"
+}
+
+# Workflow categories in priority order — used to break ties
+_WORKFLOW_PRIORITY = ["medical", "sponsorship", "supply", "education"]
+
+
+# ============================================================
+# COMPILED KEYWORD MATCHER
+# Built once at import. The message is split into words once
+# and each DISTINCT word costs one dict lookup, so cost no
+# longer grows with the number of keywords, only (mildly)
+# with message length.
+# Words match whole (word-boundary semantics: "ill" no longer
+# matches "will"), with suffixes s / es / ing / ly allowed.
+# ============================================================
+
+_SUFFIXES = ("s", "es", "ing", "ly")
+
+# Punctuation stripped from the ends of each word
+_PUNCT = ".,!?;:'\"()[]{}<>*"
+
+
+def _build_keyword_tags() -> dict:
+    """
+    Maps every keyword to the set of tags it counts towards,
+    e.g. "uniform" → {"supply", "education", "item:uniforms"}.
+    """
+
+    tags: dict = {}
+    groups = {
+        "urgent": _URGENT_KEYWORDS,
+        "medical": _MEDICAL_KEYWORDS,
+        "sponsorship": _SPONSORSHIP_KEYWORDS,
+        "supply": _SUPPLY_KEYWORDS,
+        "education": _EDUCATION_KEYWORDS,
+    }
+    for tag, words in groups.items():
+        for word in words:
+            tags.setdefault(word, set()).add(tag)
+    for word, item in _ITEM_MAP.items():
+        tags.setdefault(word, set()).add(f"item:{item}")
+
+    return tags
+
+
+def _build_indexes(tags: dict) -> tuple:
+    """
+    Returns (word_index, phrase_index):
+        word_index   : every single-word keyword and its suffixed forms
+                       → that word's tags ("books" → tags of "book" + "books")
+        phrase_index : first word of a multi-word keyword
+                       → [(remaining words, tags), ...]
+    """
+
+    word_index: dict = {}
+    phrase_index: dict = {}
+
+    for keyword, keyword_tags in tags.items():
+        words = keyword.split()
+        if len(words) > 1:
+            phrase_index.setdefault(words[0], []).append((tuple(words[1:]), frozenset(keyword_tags)))
+            continue
+        for form in (keyword, *(keyword + suffix for suffix in _SUFFIXES)):
+            word_index.setdefault(form, set()).update(keyword_tags)
+
+    return {w: frozenset(t) for w, t in word_index.items()}, phrase_index
+
+
+_KEYWORD_TAGS = _build_keyword_tags()
+_WORD_INDEX, _PHRASE_INDEX = _build_indexes(_KEYWORD_TAGS)
+
+# Amounts: ₹5000, Rs 5000, 5000 rupees, INR 5000
+# Markers are located with str.find (C speed), then only their
+# immediate surroundings are checked with an anchored regex
+_NUM = r'\d+(?:,\d+)*(?:\.\d+)?'
+_NUMBER_AFTER_RE  = re.compile(rf'\.?\s*({_NUM})')
+_NUMBER_BEFORE_RE = re.compile(rf'({_NUM})\s*$')
+_AMOUNT_PREFIXES  = ("₹", "rs", "inr")
+
+
+def _extract_amount(msg: str) -> Optional[float]:
+    """
+    Pulls the first donation amount out of a lowercased message.
+    Matches: ₹5000, Rs 5000, 5000 rupees, INR 5000
+    """
+
+    found = []   # (position, value) — leftmost wins
+
+    for prefix in _AMOUNT_PREFIXES:
+        i = msg.find(prefix)
+        while i != -1:
+            # "rs" / "inr" must start a word ("hours 5" is not an amount)
+            if prefix == "₹" or i == 0 or not msg[i - 1].isalpha():
+                match = _NUMBER_AFTER_RE.match(msg, i + len(prefix))
+                if match:
+                    found.append((i, match.group(1)))
+                    break
+            i = msg.find(prefix, i + 1)
+
+    i = msg.find("rupees")
+    while i != -1:
+        match = _NUMBER_BEFORE_RE.search(msg, max(0, i - 24), i)
+        if match:
+            found.append((match.start(1), match.group(1)))
+            break
+        i = msg.find("rupees", i + 1)
+
+    if not found:
+        return None
+    return float(min(found)[1].replace(",", ""))
+
+
+def _count_phrase(tokens: list, first: str, rest: tuple) -> int:
+    """
+    Counts occurrences of a multi-word keyword starting at token `first`.
+    """
+
+    count = 0
+    i = -1
+    while True:
+        try:
+            i = tokens.index(first, i + 1)
+        except ValueError:
+            return count
+        following = tuple(t.strip(_PUNCT) for t in tokens[i + 1:i + 1 + len(rest)])
+        if following == rest:
+            count += 1
+
+
+def _scan_message(msg: str) -> dict:
+    """
+    Scans a lowercased message once for every keyword category,
+    item and the amount.
+
+    Returns:
+        {
+          "hits":   { "urgent": n, "medical": n, "sponsorship": n,
+                      "supply": n, "education": n },
+          "items":  items mentioned, in order of appearance,
+          "amount": first amount mentioned or None
+        }
+    """
+
+    hits = {"urgent": 0, "medical": 0, "sponsorship": 0, "supply": 0, "education": 0}
+    items = []
+
+    tokens = msg.replace("/", " ").split()
+
+    # Distinct words in first-appearance order; repeats only
+    # counted (in C) for words that turn out to be keywords
+    for token in dict.fromkeys(tokens):
+        word = token.strip(_PUNCT)
+        matched = []
+
+        word_tags = _WORD_INDEX.get(word)
+        if word_tags:
+            matched.append((word_tags, tokens.count(token)))
+
+        # Multi-word keywords: only checked where their first word occurs
+        for rest, phrase_tags in _PHRASE_INDEX.get(word, ()):
+            found = _count_phrase(tokens, token, rest)
+            if found:
+                matched.append((phrase_tags, found))
+
+        for tags, n in matched:
+            for tag in tags:
+                if tag.startswith("item:"):
+                    if tag[5:] not in items:
+                        items.append(tag[5:])
+                else:
+                    hits[tag] += n
+
+    return {"hits": hits, "items": items, "amount": _extract_amount(msg)}
+
+
 def _fallback_intent(message: str) -> Intent:
     """
     Simple keyword-based intent classification.
     No LLM required — works offline and without any API key.
     Good enough for testing all 4 workflows during development.
 
-    Priority order (most specific first):
+    The workflow with the most keyword hits wins. Ties go by
+    priority (most specific first):
     1. emergency_medical  — highest priority
     2. child_sponsorship
     3. orphanage_supply
     4. education_donation — default fallback
+
+    If keywords from more than one workflow appear, confidence
+    drops with the runner-up's share of hits, so cascade mode
+    sends ambiguous messages on to the LLM.
     """
 
     msg = message.lower()
 
-    # ── Extract amount if mentioned ──────────────────────────
-    amount = None
-    # Matches: ₹5000, Rs 5000, 5000 rupees, INR 5000
-    amount_patterns = [
-        r'₹\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-        r'rs\.?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-        r'(\d+(?:,\d+)*(?:\.\d+)?)\s*rupees',
-        r'inr\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-    ]
-    for pattern in amount_patterns:
-        match = re.search(pattern, msg)
-        if match:
-            amount = float(match.group(1).replace(",", ""))
-            break
+    # ── One pass: keywords, urgency, items and amount ────────
+    scan = _scan_message(msg)
+    hits = scan["hits"]
+    amount = scan["amount"]
+    is_urgent = hits["urgent"] > 0
 
-    # ── Detect urgency ────────────────────────────────────────
-    urgent_keywords = ["urgent", "emergency", "critical", "immediately",
-                       "asap", "right now", "serious", "severe"]
-    is_urgent = any(word in msg for word in urgent_keywords)
+    # ── Classify workflow by keyword hits ────────────────────
+    # sorted() is stable, so equal counts keep priority order
+    ranked = sorted(_WORKFLOW_PRIORITY, key=lambda category: -hits[category])
+    top, runner_up = hits[ranked[0]], hits[ranked[1]]
 
-    # ── Classify workflow by keywords ─────────────────────────
+    # One workflow matched → confident. Several → ambiguous.
+    if runner_up == 0:
+        confidence = 0.85
+    else:
+        confidence = round(0.6 + 0.25 * (1 - runner_up / top), 2)
+
+    category = ranked[0] if top else None
 
-    # Emergency Medical — check first (highest priority)
-    medical_keywords = ["sick", "hospital", "surgery", "treatment", "medicine",
-                        "medical", "disease", "operation", "doctor", "ill",
-                        "emergency", "cancer", "injury", "health"]
-    if any(word in msg for word in medical_keywords):
+    # Emergency Medical
+    if category == "medical":
         return Intent(
             workflow="emergency_medical",
             amount=amount,
             filters={"urgent": True, "category": "medical"},
-            confidence=0.85,
+            confidence=confidence,
             needs_clarification=False,
             raw_message=message
         )
 
     # Child Sponsorship
-    sponsorship_keywords = ["sponsor", "sponsorship", "monthly", "long-term",
-                            "long term", "adopt", "support a child", "regular"]
-    if any(word in msg for word in sponsorship_keywords):
+    if category == "sponsorship":
         return Intent(
             workflow="child_sponsorship",
             amount=amount,
             filters={"urgent": is_urgent, "category": "sponsorship"},
-            confidence=0.85,
+            confidence=confidence,
             needs_clarification=False,
             raw_message=message
         )
 
     # Orphanage Supply
-    supply_keywords = ["supply", "supplies", "blanket", "blankets", "food",
-                       "clothes", "clothing", "uniform", "uniforms", "items",
-                       "material", "stationery", "toys", "mattress", "bed",
-                       "orphanage", "send", "donate items", "donate goods"]
-    if any(word in msg for word in supply_keywords):
-        # Try to detect specific item mentioned
-        item = None
-        item_map = {
-            "blanket": "blankets", "book": "books", "uniform": "uniforms",
-            "food": "food", "toy": "toys", "stationery": "stationery",
-            "clothes": "clothing", "mattress": "mattress"
-        }
-        for key, val in item_map.items():
-            if key in msg:
-                item = val
-                break
+    if category == "supply":
+        # First specific item mentioned, if any
+        item = scan["items"][0] if scan["items"] else None
 
         return Intent(
             workflow="orphanage_supply",
             amount=amount,
             filters={"urgent": is_urgent, "category": "supplies", "item": item},
-            confidence=0.85,
+            confidence=confidence,
             needs_clarification=False,
             raw_message=message
         )
 
-    # Education Donation — default
-    education_keywords = ["education", "school", "book", "books", "study",
-                          "learn", "uniform", "fee", "fees", "tuition",
-                          "scholarship", "college", "class", "stationary"]
-
-    if any(word in msg for word in education_keywords):
+    # Education Donation
+    if category == "education":
         return Intent(
             workflow="education_donation",
             amount=amount,
             filters={"urgent": is_urgent, "category": "education"},
-            confidence=0.85,
+            confidence=confidence,
             needs_clarification=False,
             raw_message=message
         )
@@ -350,14 +667,145 @@ def _fallback_intent(message: str) -> Intent:
     )
 
 
+# ============================================================
+# LOCAL MODEL CLASSIFICATION — offline, no API key
+# The model picks the workflow; amount, urgency and item still
+# come from the keyword scan.
+# ============================================================
+
+_WORKFLOW_CATEGORY = {
+    "emergency_medical": "medical",
+    "child_sponsorship": "sponsorship",
+    "orphanage_supply": "supplies",
+    "education_donation": "education",
+}
+
+
+def _scan_filters(workflow: str, scan: dict) -> dict:
+    """
+    Intent filters for a workflow, taken from a keyword scan.
+    """
+
+    filters = {
+        "urgent": workflow == "emergency_medical" or scan["hits"]["urgent"] > 0,
+        "category": _WORKFLOW_CATEGORY.get(workflow)
+    }
+    if workflow == "orphanage_supply":
+        filters["item"] = scan["items"][0] if scan["items"] else None
+    return filters
+
+
+def _local_intent(message: str) -> Optional[Intent]:
+    """
+    Classifies with the local model from agent/intent_model.py.
+    Returns None if no model has been trained yet.
+    """
+
+    model = get_intent_model()
+    if model is None:
+        return None
+
+    workflow, confidence = model.predict([message])[0]
+    scan = _scan_message(message.lower())
+
+    return Intent(
+        workflow=workflow,
+        amount=scan["amount"],
+        filters=_scan_filters(workflow, scan),
+        confidence=round(confidence, 3),
+        needs_clarification=False,
+        raw_message=message,
+        source="local"
+    )
+
+
+# ============================================================
+# KEYWORD PRE-SCORE — a cheap guess made before classify()
+# finishes, so operator.py can start fetching candidates for
+# the likeliest workflows while the LLM is still thinking.
+# ============================================================
+
+_CATEGORY_WORKFLOW = {
+    "medical": "emergency_medical",
+    "sponsorship": "child_sponsorship",
+    "supply": "orphanage_supply",
+    "education": "education_donation",
+}
+
+
+def likely_intents(message: str, limit: int = 2) -> List[Intent]:
+    """
+    Up to `limit` keyword-based guesses, most hits first (ties by
+    workflow priority). A message with no keyword hits guesses
+    education_donation, the same default as _fallback_intent.
+    """
+
+    scan = _scan_message(message.lower())
+    hits = scan["hits"]
+
+    ranked = sorted(_WORKFLOW_PRIORITY, key=lambda category: -hits[category])
+    workflows = [_CATEGORY_WORKFLOW[c] for c in ranked if hits[c]][:limit] or ["education_donation"]
+
+    return [
+        Intent(workflow=w, amount=scan["amount"], filters=_scan_filters(w, scan), raw_message=message)
+        for w in workflows
+    ]
+
+
+def _log_training_pair(message: str, intent: Intent) -> None:
+    """
+    Appends an LLM-labelled (message, workflow) pair to INTENT_LOG_PATH
+    so the local model can be retrained from real traffic.
+    """
+
+    if not INTENT_LOG_PATH or intent.needs_clarification:
+        return
+
+    try:
+        with open(INTENT_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"message": message, "workflow": intent.workflow}, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"[intent_classifier] Could not log training pair: {e}")
+
+
 # ============================================================
 # QUICK TEST — run this file directly to test classification
-# Command: python intent_classifier.py
+# Command: python -m agent.intent_classifier
+# Benchmark the keyword matcher: python -m agent.intent_classifier --bench
 # ============================================================
 
+def _benchmark_fallback(rounds: int = 20000) -> None:
+    """
+    Measures _fallback_intent throughput on short and long messages.
+    No LLM or network involved.
+    """
+
+    import time
+
+    short = "Send blankets to an orphanage that needs them urgently, ₹3000"
+    long = " ".join(["I would like to help the children at the home with whatever they need"] * 150) + " ₹5000 for books"
+
+    print("=" * 60)
+    print("Benchmark: _fallback_intent (compiled keyword matcher)")
+    print("=" * 60)
+    for label, msg, n in (("short", short, rounds), ("long", long, rounds // 100)):
+        start = time.perf_counter()
+        for _ in range(n):
+            _fallback_intent(msg)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>5} ({len(msg):>6} chars): {n / elapsed:>10,.0f} msg/s  "
+              f"{elapsed / n * 1e6:>8.1f} µs/msg")
+    print("=" * 60)
+
+
 if __name__ == "__main__":
+    import sys
     import asyncio
 
+    if "--bench" in sys.argv:
+        _benchmark_fallback()
+        sys.exit(0)
+
     test_messages = [
         "Donate ₹5000 to children who need books and uniforms",
         "Help a child who needs urgent surgery, I have ₹10000",
@@ -0,0 +1,240 @@
+# ============================================================
+# agent/intent_model.py — Local Intent Model (offline tier)
+# A small statistical classifier that sits between the keyword
+# rules and a remote LLM call. No network, no API key.
+#
+# Model: hashed word unigram + bigram counts → multinomial
+# Naive Bayes, all in NumPy. Trained from logged
+# (message, Intent.workflow) pairs and saved as one small
+# compressed .npz file that loads at startup.
+#
+# Train:  python -m agent.intent_model train pairs.jsonl [model.npz]
+# Bench:  python -m agent.intent_model bench [model.npz]
+#
+# pairs.jsonl has one {"message": ..., "workflow": ...} per line.
+# classify() writes these automatically when INTENT_LOG_PATH is set.
+# ============================================================
+
+import json
+import os
+import re
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import LOCAL_MODEL_PATH
+
+MODEL_VERSION = 1
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def _features(message: str, n_features: int) -> List[int]:
+    """
+    Hashed feature ids for one message: word unigrams and bigrams.
+    crc32 is used (not hash()) so ids are stable across processes.
+    """
+
+    words = _WORD_RE.findall(message.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return [zlib.crc32(g.encode()) % n_features for g in grams]
+
+
+def _batch_features(messages: List[str], n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sparse (row, feature) index arrays for a batch of messages.
+    """
+
+    rows, cols = [], []
+    for row, message in enumerate(messages):
+        ids = _features(message, n_features)
+        rows.extend([row] * len(ids))
+        cols.extend(ids)
+    return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+
+
+class IntentModel:
+    """
+    Multinomial Naive Bayes over hashed n-gram counts.
+
+    Usage:
+        model = IntentModel.load("models/intent_model.npz")
+        model.predict(["donate ₹500 for books"])
+        → [("education_donation", 0.97)]
+    """
+
+    def __init__(self, classes: List[str], log_prior: np.ndarray, log_prob: np.ndarray):
+        self.classes = list(classes)
+        self.log_prior = log_prior.astype(np.float32)   # (n_classes,)
+        self.log_prob = log_prob.astype(np.float32)     # (n_features, n_classes)
+        self.n_features = log_prob.shape[0]
+
+    @classmethod
+    def fit(cls, messages: List[str], labels: List[str],
+            n_features: int = 2 ** 15, alpha: float = 0.5) -> "IntentModel":
+        """
+        Trains a model from (message, workflow) pairs.
+
+        Args:
+            messages   : raw user messages
+            labels     : Intent.workflow for each message
+            n_features : hash space size
+            alpha      : Laplace smoothing
+        """
+
+        classes = sorted(set(labels))
+        class_ids = np.array([classes.index(label) for label in labels])
+
+        rows, cols = _batch_features(messages, n_features)
+        flat = cols * len(classes) + class_ids[rows]
+        counts = np.bincount(flat, minlength=n_features * len(classes))
+        counts = counts.reshape(n_features, len(classes)).astype(np.float64)
+
+        class_counts = np.bincount(class_ids, minlength=len(classes))
+        log_prior = np.log(class_counts / class_counts.sum())
+
+        smoothed = counts + alpha
+        log_prob = np.log(smoothed / smoothed.sum(axis=0, keepdims=True))
+
+        return cls(classes, log_prior, log_prob)
+
+    def predict_proba(self, messages: List[str]) -> np.ndarray:
+        """
+        Class probabilities for a batch, shape (len(messages), n_classes).
+        Scored in one vectorized pass over all messages' features.
+        """
+
+        rows, cols = _batch_features(messages, self.n_features)
+        weights = self.log_prob[cols]   # (n_grams, n_classes)
+
+        # Sum each message's feature log-probs, one bincount per class
+        scores = np.stack([
+            np.bincount(rows, weights=weights[:, c], minlength=len(messages))
+            for c in range(len(self.classes))
+        ], axis=1) + self.log_prior
+
+        scores -= scores.max(axis=1, keepdims=True)
+        probs = np.exp(scores)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def predict(self, messages: List[str]) -> List[Tuple[str, float]]:
+        """
+        Best workflow and its probability for each message.
+        """
+
+        probs = self.predict_proba(messages)
+        best = probs.argmax(axis=1)
+        return [(self.classes[i], float(probs[row, i])) for row, i in enumerate(best)]
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path,
+            version=np.array(MODEL_VERSION),
+            classes=np.array(self.classes),
+            log_prior=self.log_prior,
+            log_prob=self.log_prob.astype(np.float16)   # halves the file size
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "IntentModel":
+        data = np.load(path)
+        if int(data["version"]) != MODEL_VERSION:
+            raise ValueError(f"Unsupported intent model version {int(data['version'])}")
+        return cls(data["classes"].tolist(), data["log_prior"], data["log_prob"])
+
+
+# ============================================================
+# SHARED INSTANCE — loaded once at startup
+# ============================================================
+
+_model: Optional[IntentModel] = None
+_load_attempted = False
+
+
+def load_intent_model(path: str = LOCAL_MODEL_PATH) -> Optional[IntentModel]:
+    """
+    Loads the model file into memory. Called once from the FastAPI
+    lifespan in main.py. Returns None if the file doesn't exist yet.
+    """
+
+    global _model, _load_attempted
+
+    _load_attempted = True
+    if not os.path.exists(path):
+        print(f"[intent_model] No model at {path} — local tier disabled")
+        _model = None
+        return None
+
+    _model = IntentModel.load(path)
+    print(f"[intent_model] Loaded {path} ({len(_model.classes)} workflows)")
+    return _model
+
+
+def get_intent_model() -> Optional[IntentModel]:
+    """
+    Returns the loaded model, loading it on first use.
+    """
+
+    if not _load_attempted:
+        load_intent_model()
+    return _model
+
+
+def read_pairs(path: str) -> Tuple[List[str], List[str]]:
+    """
+    Reads logged (message, workflow) pairs from a JSONL file.
+    """
+
+    messages, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            pair = json.loads(line)
+            messages.append(pair["message"])
+            labels.append(pair["workflow"])
+    return messages, labels
+
+
+# ============================================================
+# CLI — train a model or benchmark batch latency
+# ============================================================
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+
+    if command == "train" and len(sys.argv) >= 3:
+        out_path = sys.argv[3] if len(sys.argv) > 3 else LOCAL_MODEL_PATH
+        messages, labels = read_pairs(sys.argv[2])
+
+        # Hold out every 5th pair to report accuracy
+        train = [i for i in range(len(messages)) if i % 5]
+        test = [i for i in range(len(messages)) if not i % 5]
+        model = IntentModel.fit([messages[i] for i in train], [labels[i] for i in train])
+        if test:
+            predicted = model.predict([messages[i] for i in test])
+            correct = sum(p == labels[i] for (p, _), i in zip(predicted, test))
+            print(f"Held-out accuracy: {correct / len(test):.1%} on {len(test)} messages")
+
+        model = IntentModel.fit(messages, labels)
+        model.save(out_path)
+        print(f"Trained on {len(messages)} messages → {out_path} "
+              f"({os.path.getsize(out_path) / 1024:.0f} KB)")
+
+    elif command == "bench":
+        model = IntentModel.load(sys.argv[2] if len(sys.argv) > 2 else LOCAL_MODEL_PATH)
+        batch = ["Send blankets to an orphanage that needs them urgently, ₹3000"] * 1000
+        start = time.perf_counter()
+        model.predict(batch)
+        elapsed = time.perf_counter() - start
+        print(f"{len(batch)} messages in {elapsed * 1000:.1f} ms "
+              f"({elapsed / len(batch) * 1e6:.1f} µs/message)")
+
+    else:
+        print("Usage: python -m agent.intent_model train pairs.jsonl [model.npz]")
+        print("       python -m agent.intent_model bench [model.npz]")
@@ -1,38 +1,281 @@
+# ============================================================
+# agent/llm_client.py — Async LLM Client
+# Every agent (risk, scheme, opportunity, document, chat)
+# awaits get_llm_json_response() from here.
+#
+# All providers share ONE pooled httpx.AsyncClient, so
+# connections stay warm between requests. Each provider has
+# its own concurrency limit so a burst of requests queues
+# here instead of tripping the provider's rate limits, and
+# every call has a hard timeout so a slow completion can
+# never stall the event loop.
+#
+# It also holds the registry of LangChain chat models used by
+# the intent classifier — built once at startup (fast + full
+# variants) and awaited through ainvoke().
+# ============================================================
+
 import os
-from groq import Groq
-from dotenv import load_dotenv
+import asyncio
+from typing import Optional
 
-load_dotenv()
+import httpx
+from dotenv import load_dotenv
 
-# We will use the Groq client as the user provided a GSK key
-client = Groq(
-    api_key=os.environ.get("GROQ_API_KEY"),
+from config.settings import (
+    get_llm, LLM_PROVIDER, LLM_MAX_TOKENS, LLM_TIMEOUT, LLM_MAX_CONNECTIONS,
+    GROQ_API_KEY, GROQ_MAX_CONCURRENCY,
+    ANTHROPIC_API_KEY, ANTHROPIC_MODEL, ANTHROPIC_MAX_CONCURRENCY,
+    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_MAX_CONCURRENCY,
 )
 
+load_dotenv()
+
 MODEL_NAME = os.environ.get("LLM_MODEL", "llama3-70b-8192")
 
-def get_llm_json_response(system_prompt: str, user_prompt: str) -> str:
+# Agents run on the configured provider. "fallback" has no
+# remote model, so agents keep using Groq as they always have.
+AGENT_PROVIDER = LLM_PROVIDER if LLM_PROVIDER in ("groq", "anthropic", "openai") else "groq"
+
+# Model the agents run on — part of every analysis cache key
+AGENT_MODEL = {
+    "groq": MODEL_NAME,
+    "anthropic": ANTHROPIC_MODEL,
+    "openai": OPENAI_MODEL,
+}[AGENT_PROVIDER]
+
+# Max in-flight completions per provider
+PROVIDER_CONCURRENCY = {
+    "groq": GROQ_MAX_CONCURRENCY,
+    "anthropic": ANTHROPIC_MAX_CONCURRENCY,
+    "openai": OPENAI_MAX_CONCURRENCY,
+}
+
+# ------------------------------------------------------------
+# Shared state — created lazily on first use, closed by
+# close_llm_client() from the FastAPI lifespan in main.py
+# ------------------------------------------------------------
+_http_client: Optional[httpx.AsyncClient] = None
+_clients: dict = {}
+_semaphores: dict = {}
+_chat_models: dict = {}   # { "fast" | "full": LangChain chat model or None }
+
+
+def _get_http_client() -> httpx.AsyncClient:
     """
-    Calls the Groq API and expects a JSON response.
+    Returns the shared, pooled HTTP client used by every provider SDK.
     """
-    try:
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": system_prompt
-                },
-                {
-                    "role": "user",
-                    "content": user_prompt
-                }
-            ],
-            model=MODEL_NAME,
-            temperature=0.2, # Keep low for JSON generation
-            response_format={"type": "json_object"} 
+
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_CONNECTIONS,
+            ),
         )
-        return chat_completion.choices[0].message.content
+
+    return _http_client
+
+
+def _get_client(provider: str):
+    """
+    Returns the async SDK client for a provider, building it once.
+    Provider SDKs are imported lazily so only the one in use
+    needs to be installed.
+    """
+
+    client = _clients.get(provider)
+    if client is not None:
+        return client
+
+    if provider == "groq":
+        from groq import AsyncGroq
+        client = AsyncGroq(api_key=GROQ_API_KEY, http_client=_get_http_client(), timeout=LLM_TIMEOUT)
+
+    elif provider == "anthropic":
+        from anthropic import AsyncAnthropic
+        client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY, http_client=_get_http_client(), timeout=LLM_TIMEOUT)
+
+    elif provider == "openai":
+        from openai import AsyncOpenAI
+        client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=_get_http_client(), timeout=LLM_TIMEOUT)
+
+    else:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+
+    _clients[provider] = client
+    return client
+
+
+def _get_semaphore(provider: str) -> asyncio.Semaphore:
+    """
+    Returns the concurrency limiter for a provider.
+    """
+
+    semaphore = _semaphores.get(provider)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(PROVIDER_CONCURRENCY.get(provider, 4))
+        _semaphores[provider] = semaphore
+    return semaphore
+
+
+async def _complete(provider: str, system_prompt: str, user_prompt: str,
+                    max_tokens: int = LLM_MAX_TOKENS) -> str:
+    """
+    Sends one JSON-mode completion to the given provider and
+    returns the raw text of the reply.
+    """
+
+    client = _get_client(provider)
+
+    if provider == "anthropic":
+        # Anthropic has no JSON response_format — the prompts
+        # already instruct the model to reply with JSON only
+        message = await client.messages.create(
+            model=ANTHROPIC_MODEL,
+            system=system_prompt,
+            messages=[{"role": "user", "content": user_prompt}],
+            max_tokens=max_tokens,
+            temperature=0.2,
+        )
+        return message.content[0].text
+
+    chat_completion = await client.chat.completions.create(
+        messages=[
+            {
+                "role": "system",
+                "content": system_prompt
+            },
+            {
+                "role": "user",
+                "content": user_prompt
+            }
+        ],
+        model=MODEL_NAME if provider == "groq" else OPENAI_MODEL,
+        temperature=0.2, # Keep low for JSON generation
+        response_format={"type": "json_object"}
+    )
+    return chat_completion.choices[0].message.content
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (~4 characters per token) — good enough to
+    budget prompts without loading a tokenizer.
+    """
+
+    return len(text) // 4 + 1
+
+
+async def get_llm_json_response(system_prompt: str, user_prompt: str, provider: str = AGENT_PROVIDER,
+                                max_tokens: int = LLM_MAX_TOKENS) -> str:
+    """
+    Calls the LLM and expects a JSON response.
+    Never raises — returns "{}" on error or timeout so every
+    agent falls through to its own safe default.
+
+    Args:
+        system_prompt : instructions and the JSON schema to follow
+        user_prompt   : the data to analyze
+        provider      : "groq" | "anthropic" | "openai"
+        max_tokens    : reply budget — raise it for multi-item prompts
+
+    Returns:
+        raw JSON text from the model
+    """
+
+    try:
+        async with _get_semaphore(provider):
+            return await asyncio.wait_for(
+                _complete(provider, system_prompt, user_prompt, max_tokens),
+                timeout=LLM_TIMEOUT
+            )
+    except asyncio.TimeoutError:
+        print(f"LLM Error: {provider} timed out after {LLM_TIMEOUT}s")
+        return "{}"
     except Exception as e:
         print(f"LLM Error: {e}")
         return "{}"
 
+
+# ============================================================
+# CHAT MODEL REGISTRY — used by intent_classifier.py
+# ============================================================
+
+def get_chat_model(fast: bool = False):
+    """
+    Returns the cached LangChain chat model for LLM_PROVIDER.
+    Built on first use (or by init_chat_models() at startup)
+    and reused for every request after that.
+
+    Args:
+        fast : True → the smaller/faster classification model
+
+    Returns:
+        LangChain chat model, or None in fallback mode
+    """
+
+    key = "fast" if fast else "full"
+
+    if key not in _chat_models:
+        _chat_models[key] = get_llm(fast=fast, http_async_client=_get_http_client())
+
+    return _chat_models[key]
+
+
+def init_chat_models() -> None:
+    """
+    Builds both chat model variants up front so the first
+    request pays no import or construction cost.
+    Called once from the FastAPI lifespan in main.py.
+    """
+
+    for fast in (True, False):
+        try:
+            get_chat_model(fast=fast)
+        except Exception as e:
+            # Missing provider package or bad config — requests will
+            # retry the build and fall back to keywords if it fails
+            print(f"[llm_client] Could not build {'fast' if fast else 'full'} chat model: {e}")
+
+
+async def ainvoke(prompt: str, fast: bool = False) -> str:
+    """
+    Sends a prompt to the cached chat model and returns the reply text.
+    Shares the provider's concurrency limit and timeout with
+    get_llm_json_response(). Raises on failure so the caller
+    can choose its own fallback.
+
+    Args:
+        prompt : full prompt text
+        fast   : True → use the fast model variant
+
+    Returns:
+        raw text content of the model's reply
+    """
+
+    llm = get_chat_model(fast=fast)
+    if llm is None:
+        raise RuntimeError("No LLM configured (LLM_PROVIDER=fallback)")
+
+    async with _get_semaphore(LLM_PROVIDER):
+        response = await asyncio.wait_for(llm.ainvoke(prompt), timeout=LLM_TIMEOUT)
+
+    return response.content
+
+
+async def close_llm_client() -> None:
+    """
+    Closes the shared HTTP pool. Called once on app shutdown.
+    """
+
+    global _http_client
+
+    _clients.clear()
+    _chat_models.clear()
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
@@ -12,17 +12,23 @@
 #   6. Return structured response to main.py
 # ============================================================
 
-from agent.intent_classifier import classify, Intent
+import asyncio
+
+from agent.intent_classifier import classify, likely_intents, Intent
 from agent.response_builder import build_response, build_clarification, build_error
-from config.settings import ALWAYS_CONFIRM_ABOVE, MAX_DONATION_AMOUNT, validate_settings, LLM_PROVIDER
+from config.settings import (
+    ALWAYS_CONFIRM_ABOVE, MAX_DONATION_AMOUNT, validate_settings, LLM_PROVIDER,
+    SPECULATIVE_PREFETCH, PREFETCH_MAX_WORKFLOWS,
+)
 from memory.user_context import get_session, update_session
+from memory.proposals import to_record, hydrate
 
 # Import available workflows
 # Teammate's workflows will be uncommented once they finish
-from workflows.education_donation import run as run_education
-from workflows.emergency_medical import run as run_emergency
-# from workflows.orphanage_supply import run as run_supply
-# from workflows.child_sponsorship import run as run_sponsorship
+from workflows.education_donation import run as run_education, candidate_query as education_query
+from workflows.emergency_medical import run as run_emergency, candidate_query as emergency_query
+# from workflows.orphanage_supply import run as run_supply, candidate_query as supply_query
+# from workflows.child_sponsorship import run as run_sponsorship, candidate_query as sponsorship_query
 
 # ============================================================
 # STARTUP CHECK
@@ -80,6 +86,14 @@ WORKFLOW_REGISTRY = {
     # "child_sponsorship":  run_sponsorship, # uncomment when teammate finishes
 }
 
+# Each workflow's propose-mode search, for speculative prefetch
+CANDIDATE_QUERIES = {
+    "education_donation": education_query,
+    "emergency_medical":  emergency_query,
+    # "orphanage_supply":   supply_query,
+    # "child_sponsorship":  sponsorship_query,
+}
+
 # ============================================================
 # MAIN FUNCTION — called by main.py for every request
 # ============================================================
@@ -136,11 +150,30 @@ async def _classify_and_propose(request: UserRequest) -> dict:
     Does NOT write anything to the database.
     """
 
+    # Step 0: Start fetching candidates for the likeliest workflows
+    # while the classifier runs — losers are cancelled below
+    prefetches = _start_prefetch(request.message) if SPECULATIVE_PREFETCH else {}
+    try:
+        return await _propose(request, prefetches)
+    finally:
+        for task in prefetches.values():
+            if not task.done():
+                task.cancel()
+                _prefetch_stats["cancelled"] += 1
+            elif not task.cancelled():
+                task.exception()   # retrieved, so asyncio doesn't warn about it
+
+
+async def _propose(request: UserRequest, prefetches: dict) -> dict:
+    """
+    Steps 1-7 of Pass 1. Uses a matching prefetch if one exists.
+    """
+
     # Step 1: Classify the intent
     intent: Intent = await classify(request.message, request.session_id)
 
     print(f"[operator] Intent classified: {intent.workflow} "
-          f"(confidence={intent.confidence}, amount=₹{intent.amount})")
+          f"(confidence={intent.confidence}, amount=₹{intent.amount}, tier={intent.source})")
 
     # Step 2: If message is too vague, ask for clarification
     if intent.needs_clarification:
@@ -166,13 +199,14 @@ async def _classify_and_propose(request: UserRequest) -> dict:
     proposal = await workflow_fn(
         intent=intent,
         user_id=request.user_id,
-        mode="propose"              # propose = search + rank only, no execution
+        mode="propose",             # propose = search + rank only, no execution
+        candidates=await _take_prefetch(prefetches, intent)
     )
 
     # Step 6: Save proposal to session so Pass 2 can execute it
+    # Stored by reference (ids + version stamps), not full documents
     await update_session(request.session_id, {
-        "pending_proposal": proposal,
-        "pending_intent": intent.dict(),
+        "pending_proposal": to_record(proposal, intent.dict()),
         "user_id": request.user_id
     })
 
@@ -192,6 +226,62 @@ async def _classify_and_propose(request: UserRequest) -> dict:
     )
 
 
+# ============================================================
+# SPECULATIVE PREFETCH
+# Candidate searches keyed by (workflow, search kwargs). The
+# one matching the final intent is used; the rest are cancelled.
+# ============================================================
+
+_prefetch_stats = {"started": 0, "used": 0, "missed": 0, "cancelled": 0, "failed": 0}
+
+
+def _query_key(intent: Intent):
+    query = CANDIDATE_QUERIES.get(intent.workflow)
+    if query is None:
+        return None
+    search, kwargs = query(intent)
+    return intent.workflow, search, tuple(sorted(kwargs.items()))
+
+
+def _start_prefetch(message: str) -> dict:
+    prefetches = {}
+    for guess in likely_intents(message, limit=PREFETCH_MAX_WORKFLOWS):
+        key = _query_key(guess)
+        if key is None or key in prefetches:
+            continue
+        _, search, kwargs = key
+        prefetches[key] = asyncio.create_task(search(**dict(kwargs)))
+        _prefetch_stats["started"] += 1
+    return prefetches
+
+
+async def _take_prefetch(prefetches: dict, intent: Intent):
+    """
+    Result of the prefetch that matches the final intent, or None
+    (the workflow then searches itself).
+    """
+
+    task = prefetches.pop(_query_key(intent), None)
+    if task is None:
+        if prefetches:
+            _prefetch_stats["missed"] += 1
+        return None
+
+    try:
+        candidates = await task
+    except Exception as e:
+        print(f"[operator] Prefetch failed ({e}), searching again")
+        _prefetch_stats["failed"] += 1
+        return None
+
+    _prefetch_stats["used"] += 1
+    return candidates
+
+
+def prefetch_stats() -> dict:
+    return {"enabled": SPECULATIVE_PREFETCH, **_prefetch_stats}
+
+
 # ============================================================
 # PASS 2 — Execute the confirmed proposal
 # ============================================================
@@ -205,7 +295,10 @@ async def _execute_confirmed(request: UserRequest) -> dict:
     # Step 1: Retrieve saved proposal from session
     session = await get_session(request.session_id)
 
-    if not session or "pending_proposal" not in session:
+    record = session.get("pending_proposal") if session else None
+    proposal, intent_data, staleness = await hydrate(record) if record else (None, None, None)
+
+    if not proposal:
         # No pending proposal found — user may have waited too long
         # or session expired
         return build_error(
@@ -214,8 +307,16 @@ async def _execute_confirmed(request: UserRequest) -> dict:
                     "Please describe what you'd like to do again."
         )
 
-    proposal = session["pending_proposal"]
-    intent_data = session["pending_intent"]
+    # Re-hydrated from current data — refuse if anything the user
+    # agreed to no longer exists, note it if something changed
+    if staleness["missing"]:
+        print(f"[operator] Proposal references removed records: {staleness['missing']}")
+        return build_error(
+            message="Some of the children in this proposal are no longer available. "
+                    "Please describe what you'd like to do again for an updated plan."
+        )
+    if staleness["changed"]:
+        print(f"[operator] Proposal records changed since Pass 1: {staleness['changed']}")
 
     # Reconstruct intent from saved dict
     intent = Intent(**intent_data)
@@ -234,11 +335,25 @@ async def _execute_confirmed(request: UserRequest) -> dict:
         mode="execute",             # execute = actually write to DB
         proposal=proposal           # pass saved proposal so workflow knows what to execute
     )
+    if staleness["changed"]:
+        result["refreshed_records"] = staleness["changed"]
+
+    # Some items were not written — keep the proposal so confirming
+    # again retries them (same idempotency keys, so nothing written
+    # twice)
+    if not result.get("success", True):
+        return build_response(
+            status="error",
+            message=result.get("impact_summary", "Your donation could not be completed. Please try again."),
+            workflow=intent.workflow,
+            proposal=None,
+            result=result,
+            requires_confirmation=True
+        )
 
     # Step 4: Clear the pending proposal from session
     await update_session(request.session_id, {
         "pending_proposal": None,
-        "pending_intent": None,
         "last_completed": intent.workflow
     })
 
@@ -1,12 +1,49 @@
 import json
-from .llm_client import get_llm_json_response
+from config.settings import OPPORTUNITY_TOP_N, PROMPT_PROFILE_MAX_TOKENS
+from memory.analysis_cache import get_analysis_cache
+from .llm_client import get_llm_json_response, AGENT_MODEL
+from .opportunity_index import get_opportunity_index
+from .prompt_builder import serialize, legend, record_prompt
 
-def match_opportunities(child_data: dict, available_opportunities: list) -> dict:
+# Bump whenever the prompt below changes — retires cached results
+PROMPT_VERSION = 3
+
+def _no_matches() -> dict:
+    # Returned whenever there is nothing usable to show
+    return {
+        "readinessScore": 0,
+        "topMatches": []
+    }
+
+async def match_opportunities(child_data: dict, available_opportunities: list) -> dict:
     """
     Agent 4: Transition Success Predictor & Opportunity Matcher.
     Predicts long-term success and matches with jobs/vocational training.
+    Repeat requests with the same child and opportunities come from cache.
+
+    Only the OPPORTUNITY_TOP_N opportunities ranked highest by local
+    BM25 retrieval (agent/opportunity_index.py) reach the LLM, so
+    the prompt stays the same size however big the board grows.
     """
-    
+
+    cache = get_analysis_cache()
+    cache_key = cache.key("opportunities", PROMPT_VERSION, AGENT_MODEL, child_data, available_opportunities)
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    shortlist = get_opportunity_index(available_opportunities).top(child_data, OPPORTUNITY_TOP_N)
+    candidates = {str(o.get("_id")): o for o, _ in shortlist}
+    if not candidates:
+        # Empty board — nothing for the model to rank
+        return _no_matches()
+
+    opportunities_json = serialize(
+        "opportunities", "opportunity",
+        [{**o, "opportunityId": opportunity_id} for opportunity_id, o in candidates.items()]
+    )
+    child_json = serialize("opportunities", "child", child_data, max_tokens=PROMPT_PROFILE_MAX_TOKENS)
+
     system_prompt = """
     You are an expert career counselor AI and transition planner for at-risk youth.
     Analyze the youth's skills, age, and education against the available opportunities.
@@ -28,18 +65,28 @@ def match_opportunities(child_data: dict, available_opportunities: list) -> dict
     
     user_prompt = f"""
     Youth Profile:
-    {json.dumps(child_data, indent=2)}
-    
-    Active Opportunities Database:
-    {json.dumps(available_opportunities, indent=2)}
+    {child_json}
+
+    Best-Fitting Active Opportunities:
+    {opportunities_json}
+    {legend(child_json, opportunities_json)}
     """
+    record_prompt("opportunities", system_prompt, user_prompt, child_data, *candidates.values())
     
-    llm_response_text = get_llm_json_response(system_prompt, user_prompt)
+    llm_response_text = await get_llm_json_response(system_prompt, user_prompt)
     
     try:
-        return json.loads(llm_response_text)
+        result = json.loads(llm_response_text)
     except json.JSONDecodeError:
-        return {
-            "readinessScore": 0,
-            "topMatches": []
-        }
+        return _no_matches()
+    if not isinstance(result, dict) or not isinstance(result.get("topMatches"), list):
+        print("[opportunity_agent] LLM reply has no topMatches list")
+        return _no_matches()
+
+    # Only opportunities we actually offered the model
+    result["topMatches"] = [
+        m for m in result["topMatches"]
+        if isinstance(m, dict) and str(m.get("opportunityId")) in candidates
+    ]
+    await cache.set(cache_key, result, child_id=child_data.get("_id"))
+    return result
@@ -0,0 +1,183 @@
+# ============================================================
+# agent/opportunity_index.py — Opportunity Retrieval (BM25)
+# First stage of opportunity matching: picks the N active
+# opportunities most relevant to a child locally, so only those
+# go to the LLM for probabilityOfSuccess and skillGaps.
+#
+# Index: an inverted index (term → posting arrays of document
+# positions and precomputed BM25 weights) over each
+# Opportunity's requirements, title, type and location.
+# type and location are indexed as single tokens
+# ("type:job", "location:pune") so they only match exactly.
+#
+# Query: the child's skills and education, plus the opportunity
+# types that fit their age (AGE_TYPES). Scoring scatter-adds
+# the posting weights of the query terms into one score array —
+# cost depends on the postings touched, not the board's text.
+# ============================================================
+
+import hashlib
+import json
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Requirements describe what the child needs — they count double
+FIELD_WEIGHTS = {"requirements": 2, "title": 1}
+
+# Opportunity types worth surfacing at each age: (min age, types)
+AGE_TYPES = [
+    (0, ["education", "mentor"]),
+    (14, ["vocational"]),
+    (16, ["job"]),
+    (17, ["housing"]),
+]
+
+_STOPWORDS = {
+    "a", "an", "and", "or", "the", "of", "in", "on", "for", "to", "with", "at", "by",
+    "is", "are", "be", "must", "should", "have", "has", "any", "basic", "level",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = re.findall(r"[a-z0-9+#]+", str(text).lower())
+    # Light plural stemming so "skills" matches "skill"
+    stems = (t[:-1] if len(t) > 3 and t.endswith("s") and not t.endswith("ss") else t for t in tokens)
+    return [t for t in stems if t not in _STOPWORDS]
+
+
+def _document_terms(opportunity: dict) -> Counter:
+    terms = Counter()
+    for requirement in opportunity.get("requirements") or ():
+        for token in tokenize(requirement):
+            terms[token] += FIELD_WEIGHTS["requirements"]
+    for token in tokenize(opportunity.get("title") or ""):
+        terms[token] += FIELD_WEIGHTS["title"]
+    if opportunity.get("type"):
+        terms[f"type:{opportunity['type']}"] += 1
+    if opportunity.get("location"):
+        terms[f"location:{_location_key(opportunity['location'])}"] += 1
+    return terms
+
+
+def _location_key(location: str) -> str:
+    # "Pune, Maharashtra" → "pune"
+    return str(location).split(",")[0].strip().lower()
+
+
+def child_query(child: dict) -> Counter:
+    """
+    Query terms for a child: skills, education and the
+    opportunity types (and location, if known) that fit them.
+    """
+
+    terms = Counter()
+    for skill in child.get("skills") or ():
+        terms.update(tokenize(skill))
+    terms.update(tokenize(child.get("education") or ""))
+    terms.update(tokenize((child.get("academicRecord") or {}).get("currentGrade") or ""))
+
+    age = child.get("age")
+    for min_age, types in AGE_TYPES:
+        if age is None or age >= min_age:
+            terms.update(f"type:{t}" for t in types)
+
+    orphanage = child.get("orphanage")
+    location = child.get("location") or (orphanage.get("location") if isinstance(orphanage, dict) else None)
+    if location:
+        terms[f"location:{_location_key(location)}"] += 1
+    return terms
+
+
+class OpportunityIndex:
+    """
+    BM25 inverted index over one opportunity list.
+    """
+
+    def __init__(self, opportunities: List[dict]):
+        self.opportunities = opportunities
+        self.size = len(opportunities)
+
+        documents = [_document_terms(o) for o in opportunities]
+        lengths = np.array([sum(d.values()) for d in documents], dtype=np.float64)
+        average = lengths.mean() if self.size and lengths.mean() > 0 else 1.0
+
+        # term → (document positions, term frequencies)
+        postings: Dict[str, Tuple[list, list]] = {}
+        for position, terms in enumerate(documents):
+            for term, tf in terms.items():
+                docs, tfs = postings.setdefault(term, ([], []))
+                docs.append(position)
+                tfs.append(tf)
+
+        # Precompute each posting's BM25 weight once
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, (docs, tfs) in postings.items():
+            docs = np.array(docs, dtype=np.int64)
+            tf = np.array(tfs, dtype=np.float64)
+            idf = math.log(1 + (self.size - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = K1 * (1 - B + B * lengths[docs] / average)
+            self._postings[term] = (docs, idf * tf * (K1 + 1) / (tf + norm))
+
+    def scores(self, query: Counter) -> np.ndarray:
+        """
+        BM25 score of every opportunity for the query terms.
+        """
+
+        scores = np.zeros(self.size)
+        for term, count in query.items():
+            posting = self._postings.get(term)
+            if posting is not None:
+                # a term lists each document once, so no index repeats
+                scores[posting[0]] += count * posting[1]
+        return scores
+
+    def term_matrix(self, terms: List[str]) -> np.ndarray:
+        """
+        (len(terms), size) matrix of BM25 posting weights — the
+        opportunity side of a cohort similarity product. Only the
+        given terms are materialized, so it stays small however
+        large the vocabulary is.
+        """
+
+        matrix = np.zeros((len(terms), self.size), dtype=np.float32)
+        for row, term in enumerate(terms):
+            posting = self._postings.get(term)
+            if posting is not None:
+                matrix[row, posting[0]] = posting[1]
+        return matrix
+
+    def top(self, child: dict, n: int) -> List[Tuple[dict, float]]:
+        """
+        The n best (opportunity, score) for a child, best first
+        (ties keep board order).
+        """
+
+        if self.size == 0:
+            return []
+
+        scores = self.scores(child_query(child))
+        n = min(n, self.size)
+        best = np.argpartition(-scores, n - 1)[:n] if n < self.size else np.arange(self.size)
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self.opportunities[i], round(float(scores[i]), 3)) for i in best]
+
+
+# The board rarely changes between requests — keep the index
+# for the last one seen
+_last: Tuple[Optional[str], Optional[OpportunityIndex]] = (None, None)
+
+
+def get_opportunity_index(opportunities: List[dict]) -> OpportunityIndex:
+    global _last
+    signature = hashlib.sha256(json.dumps(opportunities, sort_keys=True, default=str).encode()).hexdigest()
+    if _last[0] != signature:
+        _last = (signature, OpportunityIndex(opportunities))
+    return _last[1]
@@ -0,0 +1,239 @@
+# ============================================================
+# agent/prompt_builder.py — Compact Prompt Serialization
+# Every analysis agent serializes its records through here
+# instead of json.dumps(indent=2) over raw mongoose documents:
+#
+#   1. projection  — only the fields each agent reads
+#                    (PROJECTIONS); _id, __v, timestamps,
+#                    documentUrls… never reach the model
+#   2. shortening  — long keys become short aliases
+#                    (KEY_ALIASES), explained once in a legend
+#   3. compaction  — no whitespace, ISO timestamps cut to the
+#                    date, long strings clipped
+#   4. budget      — a section over its token budget loses the
+#                    oldest items of its longest list first,
+#                    leaving an "omitted" count in their place
+#
+# record_prompt() estimates each prompt's tokens (and what the
+# old indent=2 dump of the same input would have cost) per
+# agent — reported on GET /metrics as "prompts".
+# ============================================================
+
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from .llm_client import estimate_tokens
+
+# Fields each agent sends, per record kind. "a.b" reaches into a
+# sub-document; for a list of sub-documents it applies per item.
+PROJECTIONS = {
+    "risk": {
+        "child": [
+            "name", "age", "education",
+            "attendanceStats.percentage",
+            "academicRecord.currentGrade", "academicRecord.performanceScore", "academicRecord.notes",
+            "behaviorSummary",
+        ],
+    },
+    "schemes": {
+        "child": [
+            "age", "education", "academicRecord.currentGrade",
+            "documents.type", "documents.status",
+            "transitionTimeline.expectedExitDate",
+        ],
+        "scheme": [
+            "schemeId", "name", "description", "eligibilityRules", "estimatedBenefit", "missingDocuments",
+        ],
+    },
+    "opportunities": {
+        "child": [
+            "age", "education", "skills",
+            "academicRecord.currentGrade", "academicRecord.performanceScore",
+            "transitionTimeline.expectedExitDate", "transitionTimeline.readinessScore",
+            "transitionTimeline.recommendedPathways",
+        ],
+        "opportunity": [
+            "opportunityId", "title", "type", "description", "requirements", "location", "provider.name",
+        ],
+    },
+}
+
+KEY_ALIASES = {
+    "attendanceStats": "att",
+    "percentage": "pct",
+    "academicRecord": "acad",
+    "currentGrade": "grade",
+    "performanceScore": "perf",
+    "behavioralNotes": "behav",
+    "severity": "sev",
+    "transitionTimeline": "trans",
+    "expectedExitDate": "exit",
+    "readinessScore": "ready",
+    "recommendedPathways": "paths",
+    "eligibilityRules": "rules",
+    "requiredDocuments": "reqDocs",
+    "targetGroup": "groups",
+    "estimatedBenefit": "benefit",
+    "missingDocuments": "missingDocs",
+    "description": "desc",
+    "requirements": "reqs",
+}
+
+# Free-text fields longer than this are clipped
+MAX_STRING_CHARS = 300
+
+_ISO_DATETIME = re.compile(r"^(\d{4}-\d{2}-\d{2})T[\d:.]+(Z|[+-]\d{2}:?\d{2})?$")
+
+
+def project(record: Any, fields: Iterable[str]) -> Any:
+    """
+    Keeps only the given field paths of a record.
+    """
+
+    if isinstance(record, list):
+        return [project(item, fields) for item in record]
+    if not isinstance(record, dict):
+        return record
+
+    nested: Dict[str, List[str]] = {}
+    for path in fields:
+        head, _, rest = path.partition(".")
+        nested.setdefault(head, [])
+        if rest:
+            nested[head].append(rest)
+
+    out = {}
+    for key, rest in nested.items():
+        value = record.get(key)
+        if value is None or value == [] or value == {}:
+            continue
+        out[key] = project(value, rest) if rest else value
+    return out
+
+
+def _compact_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {KEY_ALIASES.get(key, key): _compact_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_compact_value(item) for item in value]
+    if isinstance(value, str):
+        match = _ISO_DATETIME.match(value)
+        if match:
+            return match.group(1)
+        if len(value) > MAX_STRING_CHARS:
+            return value[:MAX_STRING_CHARS] + "…"
+    return value
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _trim_longest_list(value: Any, excess_tokens: int) -> bool:
+    """
+    Drops the oldest (first) items of the longest list inside
+    value — about enough to shed excess_tokens — counting them in
+    an "omitted" entry at its head. False if nothing is left.
+    """
+
+    longest, longest_items = None, 0
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            items = len(node) - (1 if node and _is_marker(node[0]) else 0)
+            if items > longest_items:
+                longest, longest_items = node, items
+            stack.extend(node)
+        elif isinstance(node, dict):
+            stack.extend(node.values())
+
+    if longest is None:
+        return False
+
+    if not _is_marker(longest[0]):
+        longest.insert(0, {"omitted": 0})
+    item_tokens = estimate_tokens(_dumps(longest[-1]))
+    drop = min(max(1, excess_tokens // item_tokens), longest_items)
+    del longest[1:1 + drop]
+    longest[0]["omitted"] += drop
+    return True
+
+
+def _is_marker(item: Any) -> bool:
+    return isinstance(item, dict) and set(item) == {"omitted"}
+
+
+def serialize(agent: str, kind: str, value: Any, max_tokens: Optional[int] = None) -> str:
+    """
+    Compact JSON of a record (or list of records) for one agent's
+    prompt: projected, key-shortened, and trimmed to max_tokens.
+
+    Args:
+        agent      : "risk" | "schemes" | "opportunities"
+        kind       : record kind in PROJECTIONS[agent]
+        value      : the record or list of records
+        max_tokens : budget for this section (None = unlimited)
+    """
+
+    compacted = _compact_value(project(value, PROJECTIONS[agent][kind]))
+    text = _dumps(compacted)
+
+    while max_tokens is not None and estimate_tokens(text) > max_tokens:
+        if not _trim_longest_list(compacted, estimate_tokens(text) - max_tokens):
+            break
+        text = _dumps(compacted)
+    return text
+
+
+def legend(*texts: str) -> str:
+    """
+    One line explaining the short keys that appear in the given
+    serialized sections ("" if none do).
+    """
+
+    used = [
+        f"{short}={key}" for key, short in sorted(KEY_ALIASES.items(), key=lambda kv: kv[1])
+        if any(f'"{short}":' in text for text in texts)
+    ]
+    return f"Key legend: {', '.join(used)}" if used else ""
+
+
+# ============================================================
+# TOKEN ACCOUNTING
+# ============================================================
+
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def record_prompt(agent: str, system_prompt: str, user_prompt: str, *raw_inputs: Any) -> int:
+    """
+    Counts a prompt's estimated tokens for this agent, alongside
+    what json.dumps(indent=2) of the raw inputs would have cost.
+    Returns the prompt's token estimate.
+    """
+
+    tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+    baseline = estimate_tokens(system_prompt) + sum(
+        estimate_tokens(json.dumps(raw, indent=2, default=str)) for raw in raw_inputs
+    )
+
+    stats = _stats.setdefault(agent, {"calls": 0, "prompt_tokens": 0, "baseline_tokens": 0, "last_prompt_tokens": 0})
+    stats["calls"] += 1
+    stats["prompt_tokens"] += tokens
+    stats["baseline_tokens"] += baseline
+    stats["last_prompt_tokens"] = tokens
+
+    print(f"[prompt] {agent}: ~{tokens} tokens (indent=2 raw input ~{baseline})")
+    return tokens
+
+
+def prompt_stats() -> dict:
+    return {
+        agent: {
+            **s,
+            "reduction": round(1 - s["prompt_tokens"] / s["baseline_tokens"], 3) if s["baseline_tokens"] else 0.0
+        }
+        for agent, s in _stats.items()
+    }
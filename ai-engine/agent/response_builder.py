@@ -106,6 +106,56 @@ def build_error(message: str, detail: str = "") -> dict:
     }
 
 
+# ============================================================
+# ALLOCATION SPLIT
+# Shown in a proposal so the user confirms exactly who gets
+# what — a minimum or a cap can leave some children out
+# ============================================================
+
+def describe_split(allocations: list, unallocated: float = 0) -> str:
+    """
+    "Your donation would be split: Asha ₹600, Ravi ₹400." plus a
+    note for any amount that could not be placed.
+    """
+
+    if not allocations and unallocated > 0:
+        return f"₹{unallocated:,.0f} is below the minimum any of these children can receive, so nothing would be donated."
+    if not allocations:
+        return "There is no amount to split yet — tell me how much you'd like to give."
+    parts = ", ".join(f"{a.get('name') or 'a child'} ₹{a['amount']:,}" for a in allocations)
+    text = f"Your donation would be split: {parts}."
+    if unallocated > 0:
+        text += f" ₹{unallocated:,.2f} could not be placed and will not be charged."
+    return text
+
+
+def _amount_and_names(allocations: list):
+    amount = sum(a["amount"] for a in allocations)
+    names = ", ".join(a.get("name") or "a child" for a in allocations)
+    return f"₹{amount:,.0f}", names
+
+
+def describe_outcome(outcome: dict, thanks: str) -> str:
+    """
+    Impact text from what was actually written (see
+    tools/write_tools.execution_outcome). thanks is the
+    workflow's message for the written part, with {amount} and
+    {names} placeholders.
+    """
+
+    parts = []
+    if outcome["created"]:
+        amount, names = _amount_and_names(outcome["created"])
+        parts.append(thanks.format(amount=amount, names=names))
+    if outcome["duplicate"]:
+        amount, names = _amount_and_names(outcome["duplicate"])
+        parts.append(f"{amount} for {names} was already recorded from an earlier confirmation.")
+    if outcome["failed"]:
+        amount, names = _amount_and_names(outcome["failed"])
+        parts.append(f"{amount} for {names} could not be recorded — please try again.")
+    return " ".join(parts) or "Nothing was recorded. Please try again."
+
+
 # ============================================================
 # IMPACT SUMMARY BUILDER
 # Workflows call this to format their final impact message
@@ -1,46 +1,258 @@
+import asyncio
 import json
-from .llm_client import get_llm_json_response
+from typing import AsyncIterator, List
 
-def analyze_risk(child_data: dict) -> dict:
-    """
-    Agent 1: Predictive Risk & Distress Agent.
-    Analyzes historical attendance, grades, and behavioral notes.
-    """
-    
-    system_prompt = """
-    You are an expert child psychologist and social worker AI. 
-    You are analyzing the profile of a child in an orphanage.
-    Based on their age, education, attendance, academic record, and behavioral notes, 
-    calculate a risk score from 0-100 indicating their likelihood of distress, dropout, or needing immediate intervention. (100 is highest risk).
-    
-    You MUST return your analysis in ONLY valid JSON format, matching this exact schema:
-    {
-      "riskScore": number,
-      "riskLevel": string ("Low", "Medium", "High", or "Critical"),
+from config.settings import (
+    LLM_MAX_TOKENS, RISK_LLM_THRESHOLD, PROMPT_PROFILE_MAX_TOKENS,
+    RISK_BATCH_GROUP_SIZE, RISK_BATCH_MAX_CHARS, RISK_BATCH_CONCURRENCY
+)
+from memory.analysis_cache import get_analysis_cache
+from memory.note_summaries import get_note_summaries
+from .llm_client import get_llm_json_response, AGENT_MODEL
+from .prompt_builder import serialize, legend, record_prompt
+from .risk_scorer import score_children, narrative
+
+# Bump whenever the prompts below change — retires cached results
+PROMPT_VERSION = 4
+
+# riskScore and riskLevel come from agent/risk_scorer.py — the
+# LLM is told the score and only explains it
+NARRATIVE_SCHEMA = """{
       "distressIndicators": array of strings (e.g. "Dropping attendance", "Aggressive behavior"),
       "recommendations": array of strings (actionable steps for caretakers)
+    }"""
+
+# Profiles carry memory/note_summaries.py output, not the raw notes
+BEHAVIOR_SUMMARY_NOTE = (
+    "Behavioral notes are summarized in behaviorSummary: note counts by severity over the whole stay "
+    "and the last 30/90/365 days, the weekly trend, and the most recent notes verbatim."
+)
+
+SYSTEM_PROMPT = f"""
+    You are an expert child psychologist and social worker AI.
+    You are analyzing the profile of a child in an orphanage.
+    Their risk score (0-100, 100 is highest risk of distress, dropout, or needing immediate intervention)
+    has already been computed from their attendance, academic record, and behavioral notes.
+    Based on their profile, explain what is driving that risk and what caretakers should do.
+    {BEHAVIOR_SUMMARY_NOTE}
+
+    You MUST return your analysis in ONLY valid JSON format, matching this exact schema:
+    {NARRATIVE_SCHEMA}
+    """
+
+# Several children in one prompt. Each is assessed on their own
+# profile only — the id ties every assessment back to its child.
+BATCH_SYSTEM_PROMPT = f"""
+    You are an expert child psychologist and social worker AI.
+    You are analyzing the profiles of several children in an orphanage, each one independently.
+    Each child's risk score (0-100, 100 is highest risk) has already been computed from their
+    attendance, academic record, and behavioral notes. For each child, explain what is driving
+    that risk and what caretakers should do. Never let one child's profile influence another's.
+    {BEHAVIOR_SUMMARY_NOTE}
+
+    You MUST return ONLY valid JSON of the form {{"results": [...]}} with exactly one entry per child,
+    each matching this schema plus the child's "id" exactly as given:
+    {NARRATIVE_SCHEMA}
+    """
+
+
+def _result(scored: dict, reply: dict = None) -> dict:
+    """
+    The computed score plus the LLM's narrative — or the rule-based
+    one wherever the reply is missing a field.
+    """
+
+    fallback = narrative(scored)
+    reply = reply if isinstance(reply, dict) else {}
+    return {
+        "riskScore": scored["riskScore"],
+        "riskLevel": scored["riskLevel"],
+        "distressIndicators": reply.get("distressIndicators") or fallback["distressIndicators"],
+        "recommendations": reply.get("recommendations") or fallback["recommendations"]
     }
+
+
+def _needs_llm(scored: dict) -> bool:
+    return scored["riskScore"] >= RISK_LLM_THRESHOLD
+
+
+def _cache_key(child_data: dict, scored: dict) -> str:
+    # The score is part of the key: the narrative explains it
+    return get_analysis_cache().key("risk", PROMPT_VERSION, AGENT_MODEL, child_data, scored["riskScore"])
+
+
+async def _remember(child_data: dict, scored: dict, reply: dict) -> None:
     """
-    
-    user_prompt = f"Please analyze this child's profile and return the JSON risk assessment:\n\n{json.dumps(child_data, indent=2)}"
-    
+    Caches a usable LLM narrative — never an empty or fallback one.
+    """
+    if isinstance(reply, dict) and reply.get("distressIndicators") and reply.get("recommendations"):
+        narrative_only = {k: reply[k] for k in ("distressIndicators", "recommendations")}
+        await get_analysis_cache().set(_cache_key(child_data, scored), narrative_only, child_id=child_data.get("_id"))
+
+
+def _profile(child_data: dict) -> str:
+    summary = get_note_summaries().summarize(child_data)
+    return serialize("risk", "child", {**child_data, "behaviorSummary": summary}, max_tokens=PROMPT_PROFILE_MAX_TOKENS)
+
+
+async def _explain(child_data: dict, scored: dict) -> dict:
+    cached = await get_analysis_cache().get(_cache_key(child_data, scored))
+    if cached is not None:
+        return _result(scored, cached)
+
+    profile = _profile(child_data)
+    user_prompt = (
+        f"Risk score: {scored['riskScore']} ({scored['riskLevel']}).\n"
+        f"Please analyze this child's profile and return the JSON assessment:\n\n"
+        f"{profile}\n{legend(profile)}"
+    )
+    record_prompt("risk", SYSTEM_PROMPT, user_prompt, child_data)
+
     # Call the Groq LLM
-    llm_response_text = get_llm_json_response(system_prompt, user_prompt)
-    
+    llm_response_text = await get_llm_json_response(SYSTEM_PROMPT, user_prompt)
+
     try:
-        result = json.loads(llm_response_text)
-        # Ensure it has the required fields even if the LLM hallucinated
-        return {
-            "riskScore": result.get("riskScore", 50),
-            "riskLevel": result.get("riskLevel", "Medium"),
-            "distressIndicators": result.get("distressIndicators", ["Analysis pending"]),
-            "recommendations": result.get("recommendations", ["Monitor closely"])
-        }
+        reply = json.loads(llm_response_text)
+        await _remember(child_data, scored, reply)
+        return _result(scored, reply)
     except json.JSONDecodeError:
         print("Failed to parse LLM Response for Risk Agent.")
-        return {
-            "riskScore": -1,
-            "riskLevel": "Error",
-            "distressIndicators": ["Failed to parse AI response"],
-            "recommendations": ["Try again later"]
-        }
+        return _result(scored)
+
+
+async def analyze_risk(child_data: dict) -> dict:
+    """
+    Agent 1: Predictive Risk & Distress Agent.
+    Scores attendance, grades, and behavioral notes locally;
+    asks the LLM for the narrative only above RISK_LLM_THRESHOLD.
+    """
+
+    scored = score_children([child_data])[0]
+    if not _needs_llm(scored):
+        return _result(scored)
+    return await _explain(child_data, scored)
+
+
+# ============================================================
+# BATCH SCREENING — POST /ai/risk/batch
+# Every child is scored in one pass first. Those below
+# RISK_LLM_THRESHOLD, or with a cached narrative, are yielded
+# straight away; the rest are split into groups of up to
+# RISK_BATCH_GROUP_SIZE whose profiles fit in
+# RISK_BATCH_MAX_CHARS, one prompt per group.
+# Groups run RISK_BATCH_CONCURRENCY at a time and each result
+# is yielded as soon as its group finishes. A child the model
+# left out of (or garbled in) a group reply is re-asked alone.
+# ============================================================
+
+def _child_id(child: dict, index: int) -> str:
+    return str(child.get("_id") or child.get("id") or index)
+
+
+def _pack(entries: List[tuple]) -> List[List[tuple]]:
+    """
+    Groups (id, child, scored) so no prompt exceeds the size or
+    count limit. A profile bigger than the limit goes alone.
+    Each entry gains its compact profile JSON.
+    """
+
+    groups, current, size = [], [], 0
+    for child_id, child, scored in entries:
+        profile = _profile(child)
+        if current and (len(current) >= RISK_BATCH_GROUP_SIZE or size + len(profile) > RISK_BATCH_MAX_CHARS):
+            groups.append(current)
+            current, size = [], 0
+        current.append((child_id, child, scored, profile))
+        size += len(profile)
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def _explain_group(group: List[tuple]) -> List[dict]:
+    if len(group) == 1:
+        child_id, child, scored, _ = group[0]
+        return [{"childId": child_id, **await _explain(child, scored)}]
+
+    profiles = ",\n".join(
+        f'{{"id":{json.dumps(child_id)},"riskScore":{scored["riskScore"]},"profile":{profile}}}'
+        for child_id, _, scored, profile in group
+    )
+    user_prompt = (
+        f"Please analyze each child's profile and return the JSON assessments:\n\n"
+        f"[{profiles}]\n{legend(profiles)}"
+    )
+    record_prompt("risk", BATCH_SYSTEM_PROMPT, user_prompt, *(child for _, child, _, _ in group))
+    llm_response_text = await get_llm_json_response(
+        BATCH_SYSTEM_PROMPT, user_prompt, max_tokens=LLM_MAX_TOKENS * len(group)
+    )
+
+    try:
+        replies = json.loads(llm_response_text).get("results", [])
+        by_id = {str(r.get("id")): r for r in replies if isinstance(r, dict)}
+    except (json.JSONDecodeError, AttributeError):
+        print("Failed to parse LLM Response for Risk Agent (batch).")
+        by_id = {}
+
+    results, missing = [], []
+    for child_id, child, scored, _ in group:
+        if child_id in by_id:
+            await _remember(child, scored, by_id[child_id])
+            results.append({"childId": child_id, **_result(scored, by_id[child_id])})
+        else:
+            missing.append((child_id, child, scored))
+
+    # Never guess for a child the model skipped — ask again alone
+    retried = await asyncio.gather(*(_explain(child, scored) for _, child, scored in missing))
+    results += [{"childId": child_id, **r} for (child_id, _, _), r in zip(missing, retried)]
+    return results
+
+
+async def analyze_risk_batch(children: List[dict]) -> AsyncIterator[dict]:
+    """
+    Scores many children, yielding {"childId", riskScore, …} for
+    each one in completion order (not input order) — children
+    below the LLM threshold first.
+    """
+
+    entries = [
+        (_child_id(child, i), child, scored)
+        for i, (child, scored) in enumerate(zip(children, score_children(children)))
+    ]
+
+    # Below the threshold, or explained before — no LLM call
+    pending = []
+    cache = get_analysis_cache()
+    for entry in entries:
+        child_id, child, scored = entry
+        if not _needs_llm(scored):
+            yield {"childId": child_id, **_result(scored)}
+            continue
+        cached = await cache.get(_cache_key(child, scored))
+        if cached is not None:
+            yield {"childId": child_id, **_result(scored, cached)}
+        else:
+            pending.append(entry)
+
+    semaphore = asyncio.Semaphore(RISK_BATCH_CONCURRENCY)
+
+    async def run(group):
+        async with semaphore:
+            try:
+                return await _explain_group(group)
+            except Exception as e:
+                print(f"[risk_agent] Batch group failed: {e}")
+                return [{"childId": child_id, **_result(scored)} for child_id, _, scored, _ in group]
+
+    tasks = [
+        asyncio.create_task(run(group))
+        for group in _pack(pending)
+    ]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            for result in await finished:
+                yield result
+    finally:
+        # Client went away mid-stream — stop the remaining groups
+        for task in tasks:
+            task.cancel()
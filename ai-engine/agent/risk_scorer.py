@@ -0,0 +1,162 @@
+# ============================================================
+# agent/risk_scorer.py — Deterministic Risk Pre-Scorer
+# Computes riskScore (0-100) and riskLevel locally from the
+# numeric signals every Child already carries, for a whole
+# batch of children in one NumPy pass:
+#
+#   attendance  how far attendanceStats.percentage has dropped
+#   academic    how far academicRecord.performanceScore is below
+#               a passing level
+#   behavior    behavioralNotes severities, each decaying with
+#               age (half-life BEHAVIOR_HALF_LIFE_DAYS), so a
+#               recent high-severity note weighs most
+#
+# The same profile always gets the same score. The LLM only
+# writes the narrative (distressIndicators / recommendations),
+# and only for children at or above RISK_LLM_THRESHOLD — the
+# rest get the rule-based narrative from narrative() below.
+# ============================================================
+
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import numpy as np
+
+# How much each signal contributes (sums to 1.0)
+RISK_WEIGHTS = np.array([
+    0.35,   # attendance
+    0.25,   # academic
+    0.40,   # behavior
+])
+
+# Attendance at or below (100 - this) scores the full weight
+ATTENDANCE_SPAN = 50
+
+# performanceScore at or above PASSING_SCORE scores nothing,
+# PASSING_SCORE - ACADEMIC_SPAN or below scores the full weight
+PASSING_SCORE = 60
+ACADEMIC_SPAN = 40
+
+SEVERITY_WEIGHTS = {"low": 0.15, "medium": 0.4, "high": 1.0}
+BEHAVIOR_HALF_LIFE_DAYS = 90
+
+# (upper bound exclusive, level)
+RISK_LEVELS = [(25, "Low"), (50, "Medium"), (75, "High"), (float("inf"), "Critical")]
+
+# A signal at or above this (0-1) is reported as a distress indicator
+INDICATOR_THRESHOLD = 0.4
+
+
+def parse_date(value) -> Optional[float]:
+    """
+    Unix timestamp of a note date (datetime or ISO string), or None.
+    """
+
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, str):
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    else:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def features(children: List[dict], now: Optional[float] = None) -> np.ndarray:
+    """
+    (n, 3) matrix of signals in [0, 1]: attendance, academic, behavior.
+    """
+
+    n = len(children)
+    now = datetime.now(timezone.utc).timestamp() if now is None else now
+
+    attendance = np.array(
+        [(c.get("attendanceStats") or {}).get("percentage", 100) for c in children], dtype=np.float64
+    )
+    performance = np.array(
+        [(c.get("academicRecord") or {}).get("performanceScore", np.nan) for c in children], dtype=np.float64
+    )
+
+    # Every note of every child flattened into parallel arrays
+    owner, severity, stamp = [], [], []
+    for i, child in enumerate(children):
+        for note in child.get("behavioralNotes") or ():
+            owner.append(i)
+            severity.append(SEVERITY_WEIGHTS.get(note.get("severity"), SEVERITY_WEIGHTS["low"]))
+            ts = parse_date(note.get("date"))
+            stamp.append(now if ts is None else ts)
+
+    age_days = np.maximum(now - np.array(stamp, dtype=np.float64), 0) / 86400
+    decayed = np.array(severity, dtype=np.float64) * 0.5 ** (age_days / BEHAVIOR_HALF_LIFE_DAYS)
+    load = np.bincount(np.array(owner, dtype=np.int64), weights=decayed, minlength=n)
+
+    signals = np.empty((n, 3))
+    signals[:, 0] = np.clip((100 - np.nan_to_num(attendance, nan=100)) / ATTENDANCE_SPAN, 0, 1)
+    signals[:, 1] = np.clip((PASSING_SCORE - np.nan_to_num(performance, nan=100)) / ACADEMIC_SPAN, 0, 1)
+    signals[:, 2] = 1 - np.exp(-load)   # one fresh high note ≈ 0.63, saturates towards 1
+    return signals
+
+
+def risk_level(score: int) -> str:
+    return next(level for upper, level in RISK_LEVELS if score < upper)
+
+
+def score_children(children: List[dict], now: Optional[float] = None) -> List[dict]:
+    """
+    Scores a batch of children in one pass.
+
+    Returns:
+        one {"riskScore", "riskLevel", "signals"} per child, in order.
+        signals = {"attendance", "academic", "behavior"} in [0, 1]
+    """
+
+    if not children:
+        return []
+
+    signals = features(children, now)
+    scores = np.rint(100 * signals @ RISK_WEIGHTS).astype(int)
+    return [
+        {
+            "riskScore": int(score),
+            "riskLevel": risk_level(score),
+            "signals": {
+                "attendance": round(float(row[0]), 3),
+                "academic": round(float(row[1]), 3),
+                "behavior": round(float(row[2]), 3)
+            }
+        }
+        for score, row in zip(scores, signals)
+    ]
+
+
+def narrative(scored: dict) -> dict:
+    """
+    Rule-based distressIndicators / recommendations from the
+    signals — used below the LLM threshold, and whenever the
+    LLM reply is unusable.
+    """
+
+    signals = scored["signals"]
+    indicators, recommendations = [], []
+
+    if signals["attendance"] >= INDICATOR_THRESHOLD:
+        indicators.append("Dropping attendance")
+        recommendations.append("Follow up with the school on missed days")
+    if signals["academic"] >= INDICATOR_THRESHOLD:
+        indicators.append("Falling academic performance")
+        recommendations.append("Arrange tutoring or extra study support")
+    if signals["behavior"] >= INDICATOR_THRESHOLD:
+        indicators.append("Recent behavioral concerns")
+        recommendations.append("Schedule a counselling session")
+
+    if not indicators:
+        indicators.append("No significant distress signals")
+        recommendations.append("Continue routine monitoring")
+    elif scored["riskLevel"] in ("High", "Critical"):
+        recommendations.insert(0, "Assign a caretaker for close follow-up this week")
+
+    return {"distressIndicators": indicators, "recommendations": recommendations}
@@ -1,16 +1,26 @@
+import asyncio
 import json
-from .llm_client import get_llm_json_response
+from typing import List, Optional, Tuple
 
-def match_schemes(child_data: dict, available_schemes: list) -> dict:
-    """
-    Agent 2: Smart Government Scheme Matching Agent.
-    Evaluates a child's eligibility against a list of active schemes.
-    """
-    
-    system_prompt = """
+from config.settings import (
+    SCHEME_CHUNK_TOKENS, SCHEME_CHUNK_MAX_SCHEMES, SCHEME_CHUNK_CONCURRENCY, PROMPT_PROFILE_MAX_TOKENS
+)
+from memory.analysis_cache import get_analysis_cache
+from .llm_client import get_llm_json_response, estimate_tokens, AGENT_MODEL
+from .prompt_builder import serialize, legend, record_prompt
+from .scheme_index import get_scheme_index
+
+# Bump whenever the prompt below changes — retires cached results
+PROMPT_VERSION = 3
+
+# Only schemes above this confidence are returned
+MIN_MATCH_CONFIDENCE = 50
+
+SYSTEM_PROMPT = """
     You are an expert welfare policy AI. You must match an orphaned child's profile with available government schemes.
-    Evaluate the child against EACH scheme. 
-    
+    Every scheme below already passes its age and target-group rules, and its missingDocuments are already known.
+    Evaluate how well the child fits EACH scheme.
+
     You MUST return your analysis in ONLY valid JSON format, matching this exact schema:
     {
       "matches": [
@@ -18,27 +28,137 @@ def match_schemes(child_data: dict, available_schemes: list) -> dict:
            "schemeId": "ID of the matched scheme",
            "schemeName": "Name of the scheme",
            "matchConfidence": number (0-100),
-           "reasoning": "A 1-sentence explanation of why they qualify",
-           "missingDocuments": array of strings (e.g. ["Aadhaar", "Birth Certificate"])
+           "reasoning": "A 1-sentence explanation of why they qualify"
          }
       ]
     }
     Only include schemes where the matchConfidence is > 50.
     """
-    
+
+
+# ============================================================
+# MAP-REDUCE
+# A long shortlist is split into chunks that each fit the
+# token budget, every chunk is evaluated by its own LLM call
+# (SCHEME_CHUNK_CONCURRENCY at a time), and the per-chunk
+# matches are merged — so a large catalogue takes about as long
+# as its slowest chunk, and no reply outgrows LLM_MAX_TOKENS.
+# ============================================================
+
+def _chunk(schemes: List[Tuple[str, dict]]) -> List[List[Tuple[str, dict]]]:
+    """
+    Splits (serialized scheme, scheme) pairs into chunks.
+    """
+
+    chunks, current, tokens = [], [], 0
+    for scheme in schemes:
+        cost = estimate_tokens(scheme[0])
+        if current and (len(current) >= SCHEME_CHUNK_MAX_SCHEMES or tokens + cost > SCHEME_CHUNK_TOKENS):
+            chunks.append(current)
+            current, tokens = [], 0
+        current.append(scheme)
+        tokens += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def _evaluate_chunk(child_data: dict, child_json: str, chunk: List[Tuple[str, dict]]) -> Optional[List[dict]]:
+    """
+    The LLM's matches for one chunk — None if the call fails.
+    """
+
+    schemes_json = "[" + ",".join(text for text, _ in chunk) + "]"
     user_prompt = f"""
     Child Profile:
-    {json.dumps(child_data, indent=2)}
-    
-    Available Schemes to Evaluate Against:
-    {json.dumps(available_schemes, indent=2)}
-    """
-    
-    llm_response_text = get_llm_json_response(system_prompt, user_prompt)
-    
+    {child_json}
+
+    Schemes to Evaluate Against:
+    {schemes_json}
+    {legend(child_json, schemes_json)}
+    """
+    record_prompt("schemes", SYSTEM_PROMPT, user_prompt, child_data, *(scheme for _, scheme in chunk))
+
+    llm_response_text = await get_llm_json_response(SYSTEM_PROMPT, user_prompt)
+
     try:
-        return json.loads(llm_response_text)
-    except json.JSONDecodeError:
-        return {
-            "matches": []
-        }
+        matches = json.loads(llm_response_text).get("matches")
+    except (json.JSONDecodeError, AttributeError):
+        matches = None
+    if not isinstance(matches, list):
+        print(f"[scheme_agent] Chunk of {len(chunk)} schemes returned no usable matches")
+        return None
+    return [m for m in matches if isinstance(m, dict)]
+
+
+async def match_schemes(child_data: dict, available_schemes: list) -> dict:
+    """
+    Agent 2: Smart Government Scheme Matching Agent.
+    Evaluates a child's eligibility against a list of active schemes.
+    Repeat requests with the same child and schemes come from cache.
+
+    Schemes the child fails on age or target group are dropped
+    locally (agent/scheme_index.py) and missingDocuments is
+    computed from the child's documents — the LLM only reasons
+    about the plausible shortlist.
+    """
+
+    cache = get_analysis_cache()
+    cache_key = cache.key("schemes", PROMPT_VERSION, AGENT_MODEL, child_data, available_schemes)
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    shortlist = get_scheme_index(available_schemes).shortlist(child_data)
+    print(f"[scheme_agent] {len(shortlist)} of {len(available_schemes)} schemes pass the eligibility rules")
+    if not shortlist:
+        result = {"matches": []}
+        await cache.set(cache_key, result, child_id=child_data.get("_id"))
+        return result
+
+    candidates = {str(scheme.get("_id")): (scheme, missing) for scheme, missing in shortlist}
+    schemes_for_prompt = [
+        (serialize("schemes", "scheme", {**scheme, "schemeId": scheme_id, "missingDocuments": missing}), scheme)
+        for scheme_id, (scheme, missing) in candidates.items()
+    ]
+
+    child_json = serialize("schemes", "child", child_data, max_tokens=PROMPT_PROFILE_MAX_TOKENS)
+    chunks = _chunk(schemes_for_prompt)
+    semaphore = asyncio.Semaphore(SCHEME_CHUNK_CONCURRENCY)
+
+    async def evaluate(chunk):
+        async with semaphore:
+            return await _evaluate_chunk(child_data, child_json, chunk)
+
+    chunk_matches = await asyncio.gather(*(evaluate(chunk) for chunk in chunks))
+
+    # Reduce: shortlisted schemes only, best confidence per scheme,
+    # with the documents we computed
+    best = {}
+    for match in (m for matches in chunk_matches if matches for m in matches):
+        scheme_id = str(match.get("schemeId"))
+        try:
+            # The model sometimes sends the number as a string ("85")
+            confidence = float(match.get("matchConfidence"))
+        except (TypeError, ValueError):
+            print(f"[scheme_agent] Skipping match with unreadable confidence: {match.get('matchConfidence')!r}")
+            continue
+        if scheme_id not in candidates or not confidence > MIN_MATCH_CONFIDENCE:
+            continue
+        if scheme_id not in best or confidence > best[scheme_id]["matchConfidence"]:
+            scheme, missing = candidates[scheme_id]
+            best[scheme_id] = {
+                **match,
+                "matchConfidence": confidence,
+                "schemeId": scheme_id,
+                "schemeName": match.get("schemeName") or scheme.get("name"),
+                "missingDocuments": missing
+            }
+    matches = sorted(best.values(), key=lambda m: m["matchConfidence"], reverse=True)
+
+    result = {"matches": matches}
+
+    # A failed chunk means the answer is incomplete — don't cache it
+    if all(m is not None for m in chunk_matches):
+        await cache.set(cache_key, result, child_id=child_data.get("_id"))
+    return result
@@ -0,0 +1,154 @@
+# ============================================================
+# agent/scheme_index.py — Scheme Eligibility Prefilter
+# Rejects schemes a child cannot qualify for before anything
+# reaches the LLM, using each Scheme's eligibilityRules:
+#
+#   minAge / maxAge   interval index — schemes sorted by minAge,
+#                     so one bisect finds those starting at or
+#                     below the child's age, then one NumPy
+#                     comparison keeps those ending at or above it
+#   targetGroup       group → schemes set lookups against the
+#                     groups the child belongs to
+#   requiredDocuments compared with Child.documents to
+#                     precompute missingDocuments
+#
+# Rules are only applied when they can be checked: a child with
+# no age passes the age rule, and a scheme naming a target group
+# we cannot derive from the profile stays on the shortlist for
+# the LLM to judge. The index is rebuilt only when the scheme
+# list changes.
+# ============================================================
+
+import bisect
+import hashlib
+import json
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Groups derivable from a Child profile, with the spellings
+# schemes use for them
+GROUP_ALIASES = {
+    "orphan": "orphan", "orphans": "orphan", "orphaned": "orphan",
+    "vulnerable": "vulnerable", "child in need of care": "vulnerable", "cnsp": "vulnerable",
+    "student": "student", "students": "student",
+    "child": "minor", "children": "minor", "minor": "minor", "minors": "minor",
+    "youth": "youth", "adolescent": "youth", "adolescents": "youth",
+    "care leaver": "care_leaver", "care leavers": "care_leaver", "care_leaver": "care_leaver",
+}
+ADULT_AGE = 18
+YOUTH_AGE = 14
+
+# requiredDocuments spellings → Child.documents[].type
+DOCUMENT_ALIASES = {
+    "aadhaar": "aadhaar", "aadhaar card": "aadhaar", "aadhar": "aadhaar", "aadhar card": "aadhaar",
+    "birth certificate": "birth_certificate", "birth_certificate": "birth_certificate",
+    "school id": "education", "school certificate": "education", "marksheet": "education",
+    "education certificate": "education", "education": "education",
+}
+
+
+def _norm(text: str) -> str:
+    return re.sub(r"[\s_\-]+", " ", str(text).strip().lower())
+
+
+def child_groups(child: dict) -> Set[str]:
+    """
+    Target groups the child belongs to. Every child on the
+    platform lives in an orphanage, so is orphan + vulnerable.
+    """
+
+    groups = {"orphan", "vulnerable"}
+    age = child.get("age")
+    if child.get("education") or child.get("academicRecord"):
+        groups.add("student")
+    if age is not None and age < ADULT_AGE:
+        groups.add("minor")
+    if age is not None and age >= YOUTH_AGE:
+        groups.add("youth")
+    if (child.get("transitionTimeline") or {}).get("expectedExitDate") or (age is not None and age >= ADULT_AGE - 1):
+        groups.add("care_leaver")
+    return groups
+
+
+def _held_documents(child: dict) -> Set[str]:
+    """
+    Document types the child has uploaded (pending or verified).
+    """
+
+    return {
+        d.get("type") for d in child.get("documents") or ()
+        if d.get("status", "missing") != "missing"
+    }
+
+
+def missing_documents(scheme: dict, child: dict) -> List[str]:
+    held = _held_documents(child)
+    required = (scheme.get("eligibilityRules") or {}).get("requiredDocuments") or []
+    return [doc for doc in required if DOCUMENT_ALIASES.get(_norm(doc)) not in held]
+
+
+class SchemeIndex:
+    """
+    Eligibility index over one scheme list.
+    """
+
+    def __init__(self, schemes: List[dict]):
+        self.schemes = schemes
+        n = len(schemes)
+
+        rules = [s.get("eligibilityRules") or {} for s in schemes]
+        mins = np.array([r.get("minAge") if r.get("minAge") is not None else -np.inf for r in rules], dtype=np.float64)
+        maxs = np.array([r.get("maxAge") if r.get("maxAge") is not None else np.inf for r in rules], dtype=np.float64)
+
+        # Interval index: positions sorted by minAge
+        self._by_min = np.argsort(mins, kind="stable")
+        self._sorted_mins = mins[self._by_min].tolist()
+        self._maxs = maxs
+
+        # group → scheme positions; schemes open to anyone, or naming
+        # a group we can't check, are always eligible on this rule
+        self._by_group: Dict[str, Set[int]] = {}
+        self._open_groups: Set[int] = set()
+        for i, r in enumerate(rules):
+            targets = {GROUP_ALIASES.get(_norm(g)) for g in r.get("targetGroup") or ()}
+            if not targets or None in targets:
+                self._open_groups.add(i)
+                continue
+            for group in targets:
+                self._by_group.setdefault(group, set()).add(i)
+
+        self.size = n
+
+    def _age_eligible(self, age: Optional[float]) -> Set[int]:
+        if age is None:
+            return set(range(self.size))
+        cut = bisect.bisect_right(self._sorted_mins, age)
+        starts = self._by_min[:cut]
+        return set(starts[self._maxs[starts] >= age].tolist())
+
+    def _group_eligible(self, groups: Set[str]) -> Set[int]:
+        return self._open_groups.union(*(self._by_group.get(g, set()) for g in groups))
+
+    def shortlist(self, child: dict) -> List[Tuple[dict, List[str]]]:
+        """
+        (scheme, missingDocuments) for every scheme the child may
+        qualify for, in catalogue order.
+        """
+
+        eligible = self._age_eligible(child.get("age")) & self._group_eligible(child_groups(child))
+        return [(self.schemes[i], missing_documents(self.schemes[i], child)) for i in sorted(eligible)]
+
+
+# The scheme list rarely changes between requests — keep the
+# index for the last one seen
+_last: Tuple[Optional[str], Optional[SchemeIndex]] = (None, None)
+
+
+def get_scheme_index(schemes: List[dict]) -> SchemeIndex:
+    global _last
+    signature = hashlib.sha256(json.dumps(schemes, sort_keys=True, default=str).encode()).hexdigest()
+    if _last[0] != signature:
+        _last = (signature, SchemeIndex(schemes))
+    return _last[1]
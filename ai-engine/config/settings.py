@@ -26,24 +26,51 @@ LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")
 # ── GROQ (FREE — Recommended) ────────────────────────────────
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 GROQ_MODEL   = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "8"))  # max in-flight completions
 # llama-3.3-70b-versatile  → best reasoning  (recommended for workflows)
 # llama-3.1-8b-instant     → fastest         (good for intent classification)
 
 # ── Anthropic (Claude) settings ──────────────────────────────
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 ANTHROPIC_MODEL   = os.getenv("ANTHROPIC_MODEL", "claude-3-5-haiku-20241022")
+ANTHROPIC_MAX_CONCURRENCY = int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", "8"))  # max in-flight completions
 # claude-3-5-haiku-20241022  → fast + cheap  (recommended for classification)
 # claude-opus-4-6            → most powerful  (use for complex reasoning)
 
 # ── OpenAI (GPT-4) settings ──────────────────────────────────
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL   = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))  # max in-flight completions
 # gpt-4o-mini  → fast + cheap  (recommended for classification)
 # gpt-4o       → most powerful (use for complex reasoning)
 
+# How the intent classifier uses the LLM:
+# "llm"     = every message goes to the LLM (keywords only if it fails)
+# "cascade" = keyword matching first; the LLM is only called when
+#             keyword confidence is below CASCADE_CONFIDENCE_THRESHOLD
+# "local"   = local trained model (agent/intent_model.py) first; same
+#             threshold, then the LLM (or keywords if LLM_PROVIDER=fallback)
+CLASSIFIER_MODE = os.getenv("CLASSIFIER_MODE", "llm")
+CASCADE_CONFIDENCE_THRESHOLD = float(os.getenv("CASCADE_CONFIDENCE_THRESHOLD", "0.8"))
+
+# Local intent model file — train with: python -m agent.intent_model train
+LOCAL_MODEL_PATH = os.getenv("LOCAL_MODEL_PATH", "models/intent_model.npz")
+
+# If set, every LLM classification is appended here as a JSONL
+# (message, workflow) pair — training data for the local model
+INTENT_LOG_PATH = os.getenv("INTENT_LOG_PATH", "")
+
 # Maximum tokens the LLM can return per response
 LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "500"))
 
+# How long to wait for a single LLM completion (seconds)
+# A slow provider fails fast instead of holding the request open
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+
+# Size of the shared HTTP connection pool used for all LLM calls
+# Connections are kept alive and reused across requests
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+
 # ============================================================
 # SAFETY LIMITS
 # Hard limits that protect against accidental large donations
@@ -68,7 +95,7 @@ ALWAYS_CONFIRM_ABOVE = float(os.getenv("ALWAYS_CONFIRM_ABOVE", "1000"))
 # ============================================================
 
 # Base URL of your Node.js backend API
-BACKEND_API_URL = os.getenv("BACKEND_API_URL", "http://localhost:3000/api")
+BACKEND_API_URL = os.getenv("BACKEND_API_URL", "http://localhost:5000/api")
 
 # Secret key shared between AI engine and Node.js backend
 # Node.js checks this header to verify requests came from the AI engine
@@ -77,6 +104,31 @@ BACKEND_API_SECRET = os.getenv("BACKEND_API_SECRET", "dev-secret-change-in-produ
 # How long to wait for a backend API response (seconds)
 BACKEND_TIMEOUT = int(os.getenv("BACKEND_TIMEOUT", "10"))
 
+# Size of the shared backend connection pool (tools/backend_client.py)
+BACKEND_MAX_CONNECTIONS = int(os.getenv("BACKEND_MAX_CONNECTIONS", "20"))
+
+# Use HTTP/2 to the backend — only helps behind a TLS proxy that
+# speaks it (Express itself is HTTP/1.1). Needs: pip install h2
+BACKEND_HTTP2 = os.getenv("BACKEND_HTTP2", "false").lower() == "true"
+
+# Multi-recipient donations are written with POST /donations/batch:
+# items per request, and how many of those requests run at once
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "500"))
+WRITE_CONCURRENCY = int(os.getenv("WRITE_CONCURRENCY", "4"))
+
+# Retries for idempotent reads (GET) after a connection error or a
+# 502/503/504, with jittered exponential backoff. Writes only retry
+# when every item carries an idempotency key (batch donations).
+BACKEND_RETRIES = int(os.getenv("BACKEND_RETRIES", "2"))
+BACKEND_RETRY_BACKOFF = float(os.getenv("BACKEND_RETRY_BACKOFF", "0.2"))  # seconds, doubles per attempt
+
+# Children catalog (tools/children_catalog.py) — how often (seconds)
+# to pull changed children, and how often to reload everything
+# (a full reload is the only way a hard-deleted child disappears
+# if the delta's total count happens to still match)
+CATALOG_SYNC_INTERVAL = float(os.getenv("CATALOG_SYNC_INTERVAL", "30"))
+CATALOG_FULL_SYNC_INTERVAL = float(os.getenv("CATALOG_FULL_SYNC_INTERVAL", "3600"))
+
 # ============================================================
 # AI ENGINE SERVER
 # FastAPI server settings
@@ -101,11 +153,92 @@ MAX_MEMORY_MESSAGES = int(os.getenv("MAX_MEMORY_MESSAGES", "10"))
 # How long (seconds) before a session expires
 SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))  # 1 hour default
 
+# Hard cap on sessions held in memory — the least recently used
+# session is evicted once this is reached
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "10000"))
+
+# How often (seconds) the background sweeper drops expired sessions
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "60"))
+
+# Where sessions live: "memory" | "sqlite" | "redis"
+# "memory" = this process only — run uvicorn with ONE worker
+# "sqlite" = embedded file shared by every worker on this machine,
+#            survives restarts (SESSION_DB_PATH)
+# "redis"  = shared across machines (uses REDIS_URL)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "data/sessions.db")
+
+# ============================================================
+# CACHE SETTINGS
+# Repeated requests are answered from cache instead of the LLM
+# ============================================================
+
+# Optional shared cache (e.g. redis://localhost:6379/0)
+# Leave empty to cache in-process only
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+# Intent classification cache — max entries and lifetime (seconds)
+INTENT_CACHE_SIZE = int(os.getenv("INTENT_CACHE_SIZE", "2048"))
+INTENT_CACHE_TTL = int(os.getenv("INTENT_CACHE_TTL", "86400"))  # 1 day default
+
+# Risk / scheme / opportunity results (memory/analysis_cache.py),
+# keyed by a hash of the child profile and candidate lists
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "4096"))
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", "86400"))  # 1 day default
+
+# Rolling behavioral-note summaries (memory/note_summaries.py) —
+# children kept, and how many newest notes each keeps verbatim
+NOTE_SUMMARY_CACHE_SIZE = int(os.getenv("NOTE_SUMMARY_CACHE_SIZE", "4096"))
+NOTE_SUMMARY_RECENT = int(os.getenv("NOTE_SUMMARY_RECENT", "5"))
+
+# ============================================================
+# AGENT SETTINGS
+# Batch screening with the analysis agents (risk, schemes…)
+# ============================================================
+
+# riskScore/riskLevel are computed locally (agent/risk_scorer.py);
+# the LLM writes the narrative only for children scoring at least
+# this (0-100). Set to 0 to send every child, 101 to never call it.
+RISK_LLM_THRESHOLD = int(os.getenv("RISK_LLM_THRESHOLD", "50"))
+
+# POST /ai/risk/batch — children packed into one LLM prompt
+# (only while their profiles fit in RISK_BATCH_MAX_CHARS), and
+# how many of those prompts are scored at once
+RISK_BATCH_GROUP_SIZE = int(os.getenv("RISK_BATCH_GROUP_SIZE", "5"))
+RISK_BATCH_MAX_CHARS = int(os.getenv("RISK_BATCH_MAX_CHARS", "12000"))
+RISK_BATCH_CONCURRENCY = int(os.getenv("RISK_BATCH_CONCURRENCY", "4"))
+
+# Largest orphanage (or list of children) one batch request screens
+RISK_BATCH_MAX_CHILDREN = int(os.getenv("RISK_BATCH_MAX_CHILDREN", "1000"))
+
+# Opportunity matching — only the top N opportunities from local
+# BM25 retrieval (agent/opportunity_index.py) go to the LLM
+OPPORTUNITY_TOP_N = int(os.getenv("OPPORTUNITY_TOP_N", "8"))
+
+# Scheme matching splits a long shortlist into chunks of at most
+# SCHEME_CHUNK_TOKENS (estimated) and SCHEME_CHUNK_MAX_SCHEMES —
+# so each reply fits in LLM_MAX_TOKENS — and evaluates up to
+# SCHEME_CHUNK_CONCURRENCY chunks at once
+SCHEME_CHUNK_TOKENS = int(os.getenv("SCHEME_CHUNK_TOKENS", "2000"))
+SCHEME_CHUNK_MAX_SCHEMES = int(os.getenv("SCHEME_CHUNK_MAX_SCHEMES", "6"))
+SCHEME_CHUNK_CONCURRENCY = int(os.getenv("SCHEME_CHUNK_CONCURRENCY", "4"))
+
+# Token budget for one child profile in any agent prompt
+# (agent/prompt_builder.py) — over it, the oldest entries of the
+# profile's longest list are dropped
+PROMPT_PROFILE_MAX_TOKENS = int(os.getenv("PROMPT_PROFILE_MAX_TOKENS", "600"))
+
 # ============================================================
 # WORKFLOW SETTINGS
 # Fine-tune individual workflow behavior
 # ============================================================
 
+# Speculative prefetch — start the candidate search for the
+# likeliest workflow(s) (keyword guess) while the LLM classifies,
+# so a proposal takes max(classify, search) instead of the sum
+SPECULATIVE_PREFETCH = os.getenv("SPECULATIVE_PREFETCH", "true").lower() == "true"
+PREFETCH_MAX_WORKFLOWS = int(os.getenv("PREFETCH_MAX_WORKFLOWS", "2"))
+
 # Education donation — max children to show in allocation plan
 EDUCATION_MAX_RESULTS = int(os.getenv("EDUCATION_MAX_RESULTS", "5"))
 
@@ -125,14 +258,19 @@ SPONSORSHIP_MIN_AMOUNT = float(os.getenv("SPONSORSHIP_MIN_AMOUNT", "500"))
 # Automatically picks the right provider from LLM_PROVIDER.
 # ============================================================
 
-def get_llm(fast: bool = False):
+def get_llm(fast: bool = False, http_async_client=None):
     """
     Returns a ready-to-use LLM instance based on LLM_PROVIDER.
+    Builds a NEW instance on every call — request handlers should
+    use the cached instances from agent.llm_client.get_chat_model().
 
     Args:
         fast (bool): If True and using Groq, returns the faster
                      8B model instead of 70B. Good for intent
                      classification where speed matters more.
+        http_async_client: optional shared httpx.AsyncClient so the
+                     model reuses pooled keep-alive connections
+                     (used by Groq and OpenAI)
 
     Returns:
         LLM instance or None if fallback mode
@@ -145,7 +283,8 @@ def get_llm(fast: bool = False):
             api_key=GROQ_API_KEY,
             model_name=model,
             temperature=0.1,
-            max_tokens=LLM_MAX_TOKENS
+            max_tokens=LLM_MAX_TOKENS,
+            http_async_client=http_async_client
         )
 
     elif LLM_PROVIDER == "anthropic":
@@ -161,7 +300,8 @@ def get_llm(fast: bool = False):
         return ChatOpenAI(
             api_key=OPENAI_API_KEY,
             model=OPENAI_MODEL,
-            max_tokens=LLM_MAX_TOKENS
+            max_tokens=LLM_MAX_TOKENS,
+            http_async_client=http_async_client
         )
 
     else:
@@ -6,22 +6,56 @@
 # ============================================================
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
+import asyncio
+import json
 import uvicorn
 
-from agent.risk_agent import analyze_risk
+from agent.risk_agent import analyze_risk, analyze_risk_batch
 from agent.scheme_agent import match_schemes
 from agent.opportunity_agent import match_opportunities
+from agent.cohort_matcher import transition_cohort, match_cohort, MAX_K as COHORT_MAX_K
+from agent.prompt_builder import prompt_stats
 from agent.document_agent import process_document
 from agent.chat_agent import chat_with_data
+from agent.intent_classifier import classifier_stats
+from agent.llm_client import init_chat_models, close_llm_client
+from agent.intent_model import load_intent_model
+from tools.children_catalog import get_catalog
+from tools.read_tools import get_orphanage_children
+from config.settings import RISK_BATCH_MAX_CHILDREN
+from tools.backend_client import init_backend_client, close_backend_client, backend_client_stats
+from memory.user_context import get_session_store, run_session_sweeper, close_session_store
+from memory.analysis_cache import get_analysis_cache
+from memory.note_summaries import get_note_summaries
 
 # We will build this file in Step 3
 # For now it is imported but operator.py does not exist yet
 # Uncomment this once operator.py is ready:
-from agent.operator import handle_request
+from agent.operator import handle_request, prefetch_stats
+
+# ------------------------------------------------------------
+# Lifespan
+# Runs once when the server starts and once when it stops.
+# Shared clients (connection pools) are cleaned up here.
+# ------------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_chat_models()
+    load_intent_model()
+    init_backend_client()
+    catalog_sync = asyncio.create_task(get_catalog().run_sync_loop())
+    session_sweeper = asyncio.create_task(run_session_sweeper())
+    yield
+    session_sweeper.cancel()
+    catalog_sync.cancel()
+    await close_backend_client()
+    await close_session_store()
+    await close_llm_client()
 
 # ------------------------------------------------------------
 # App Setup
@@ -29,7 +63,8 @@ from agent.operator import handle_request
 app = FastAPI(
     title="HopeLink AI Engine",
     description="AI agent that connects donors with orphanages and children in need",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # ------------------------------------------------------------
@@ -79,7 +114,32 @@ class RiskRequest(BaseModel):
 
 @app.post("/ai/risk")
 async def get_risk_analysis(req: RiskRequest):
-    return analyze_risk(req.childData)
+    return await analyze_risk(req.childData)
+
+class RiskBatchRequest(BaseModel):
+    children: Optional[List[dict]] = None
+    orphanageId: Optional[str] = None
+
+@app.post("/ai/risk/batch")
+async def get_risk_batch(req: RiskBatchRequest):
+    """
+    Screens many children — the given profiles, or every child
+    of orphanageId. Streams one JSON line per child (NDJSON) as
+    soon as it is scored, then a final {"done": true, "count": n}.
+    """
+    children = req.children
+    if children is None and req.orphanageId:
+        children = await get_orphanage_children(req.orphanageId, RISK_BATCH_MAX_CHILDREN)
+    if not children:
+        return JSONResponse(status_code=400, content={"error": "Provide children or an orphanageId with children"})
+    children = children[:RISK_BATCH_MAX_CHILDREN]
+
+    async def stream():
+        async for result in analyze_risk_batch(children):
+            yield json.dumps(result) + "\n"
+        yield json.dumps({"done": True, "count": len(children)}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 class SchemeRequest(BaseModel):
@@ -88,7 +148,7 @@ class SchemeRequest(BaseModel):
 
 @app.post("/ai/schemes")
 async def get_scheme_matches(req: SchemeRequest):
-    return match_schemes(req.childData, req.availableSchemes)
+    return await match_schemes(req.childData, req.availableSchemes)
 
 
 class OpportunityRequest(BaseModel):
@@ -97,7 +157,50 @@ class OpportunityRequest(BaseModel):
 
 @app.post("/ai/opportunities")
 async def get_opportunity_matches(req: OpportunityRequest):
-    return match_opportunities(req.childData, req.availableOpportunities)
+    return await match_opportunities(req.childData, req.availableOpportunities)
+
+
+class CohortRequest(BaseModel):
+    opportunities: List[Dict[str, Any]]
+    children: Optional[List[Dict[str, Any]]] = None
+    withinDays: int = 365
+    k: int = Field(5, ge=1, le=COHORT_MAX_K)
+    assign: bool = False
+    capacity: Optional[Dict[str, int]] = None
+
+@app.post("/ai/opportunities/cohort")
+async def get_cohort_matches(req: CohortRequest):
+    """
+    Matches every youth leaving care within withinDays (from the
+    given children, or the children catalog) against all the
+    opportunities at once — see agent/cohort_matcher.py.
+    """
+    children = req.children
+    if children is None:
+        catalog = get_catalog()
+        children = catalog.search(max_results=len(catalog))
+    cohort = transition_cohort(children, req.withinDays)
+
+    # CPU-bound — keep the event loop free while it runs
+    result = await asyncio.to_thread(
+        match_cohort, cohort, req.opportunities, k=req.k, assign=req.assign, capacity=req.capacity
+    )
+    return {"cohortSize": len(cohort), **result}
+
+
+class CacheInvalidateRequest(BaseModel):
+    childId: str
+
+@app.post("/ai/cache/invalidate")
+async def invalidate_child_analyses(req: CacheInvalidateRequest):
+    """
+    Called by the backend when a child is updated or deleted —
+    drops their cached risk, scheme and opportunity results and
+    their behavioral-note summary.
+    """
+    dropped = await get_analysis_cache().invalidate_child(req.childId)
+    get_note_summaries().invalidate(req.childId)
+    return {"childId": req.childId, "invalidated": dropped}
 
 
 class DocumentRequest(BaseModel):
@@ -106,7 +209,7 @@ class DocumentRequest(BaseModel):
 
 @app.post("/ai/document")
 async def extract_document(req: DocumentRequest):
-    return process_document(req.imageUrl, req.documentType)
+    return await process_document(req.imageUrl, req.documentType)
 
 class ChatRequest(BaseModel):
     message: str
@@ -114,7 +217,7 @@ class ChatRequest(BaseModel):
 
 @app.post("/ai/chat")
 async def ai_chat(req: ChatRequest):
-    return chat_with_data(req.message, req.userRole)
+    return await chat_with_data(req.message, req.userRole)
 
 # ------------------------------------------------------------
 # LEGACY CHATBOT ENDPOINT (Placeholder)
@@ -138,6 +241,31 @@ def health_check():
         "version": "1.0.0"
     }
 
+# ------------------------------------------------------------
+# GET /metrics
+# Classifier and cache counters for monitoring.
+# Read-only, no side effects.
+# ------------------------------------------------------------
+@app.get("/metrics")
+def get_metrics():
+    """
+    Returns per-tier classifier counts, hit/miss counters and
+    sizes of the engine's caches, children catalog sync state,
+    backend connection pool usage, session store size,
+    speculative prefetch hit counts, estimated prompt tokens
+    per analysis agent and behavioral-note summary counters.
+    """
+    return {
+        "intent_classifier": classifier_stats(),
+        "children_catalog": get_catalog().stats(),
+        "backend_client": backend_client_stats(),
+        "sessions": get_session_store().stats(),
+        "analysis_cache": get_analysis_cache().stats(),
+        "prompts": prompt_stats(),
+        "note_summaries": get_note_summaries().stats(),
+        "prefetch": prefetch_stats()
+    }
+
 @app.post("/agent")
 async def process_agent_request(req: UserRequest):
     """
@@ -0,0 +1,93 @@
+# ============================================================
+# memory/analysis_cache.py — Analysis Result Cache
+# Risk, scheme and opportunity analyses are cached by what went
+# into them, so re-opening the same child on a dashboard skips
+# the LLM entirely.
+#
+# Key = sha256 of the canonical JSON of:
+#   agent name + prompt version + model + input records
+# with volatile bookkeeping fields (updatedAt, __v…) dropped,
+# so only a real change to the profile or candidate list is a
+# miss. Bumping an agent's PROMPT_VERSION or switching models
+# retires its old entries the same way.
+#
+# Storage is a TieredCache (memory/cache.py): size-bounded LRU
+# with TTL, plus Redis when REDIS_URL is set.
+#
+# invalidate_child() drops everything cached for one child —
+# called by POST /ai/cache/invalidate when the backend updates
+# a child. Only keys this worker wrote are known to it; other
+# workers' copies miss anyway once the profile has changed.
+# ============================================================
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Optional
+
+from config.settings import ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_TTL
+from memory.cache import TieredCache
+
+# Fields that change without changing what an agent would say
+VOLATILE_FIELDS = ("updatedAt", "createdAt", "__v", "urgencyScore")
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _canonical(v) for k, v in value.items() if k not in VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [_canonical(v) for v in value]
+    return value
+
+
+class AnalysisCache:
+
+    def __init__(self, max_entries: int = ANALYSIS_CACHE_SIZE, ttl: float = ANALYSIS_CACHE_TTL):
+        self._cache = TieredCache("analysis", max_entries=max_entries, ttl=ttl)
+        self._by_child: OrderedDict = OrderedDict()   # child id → set of keys
+        self.max_children = max_entries
+        self.invalidations = 0
+
+    @staticmethod
+    def key(agent: str, prompt_version: int, model: str, *inputs: Any) -> str:
+        body = json.dumps(
+            [agent, prompt_version, model, _canonical(list(inputs))],
+            sort_keys=True, separators=(",", ":"), default=str
+        )
+        return hashlib.sha256(body.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[Any]:
+        return await self._cache.get(key)
+
+    async def set(self, key: str, value: Any, child_id: Optional[str] = None) -> None:
+        await self._cache.set(key, value)
+        if child_id:
+            self._by_child.setdefault(str(child_id), set()).add(key)
+            self._by_child.move_to_end(str(child_id))
+            while len(self._by_child) > self.max_children:
+                self._by_child.popitem(last=False)
+
+    async def invalidate_child(self, child_id: str) -> int:
+        """
+        Drops every cached analysis of this child. Returns how many.
+        """
+
+        keys = self._by_child.pop(str(child_id), set())
+        for key in keys:
+            await self._cache.delete(key)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def stats(self) -> dict:
+        return {
+            **self._cache.stats(),
+            "children_indexed": len(self._by_child),
+            "invalidations": self.invalidations
+        }
+
+
+_analysis_cache = AnalysisCache()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    return _analysis_cache
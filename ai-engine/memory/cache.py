@@ -0,0 +1,180 @@
+# ============================================================
+# memory/cache.py — Two-level Result Cache
+# Caches expensive results (e.g. LLM intent classifications)
+# so repeated requests skip the round-trip entirely.
+#
+# Level 1: in-process LRU with per-entry TTL (microseconds)
+# Level 2: optional shared Redis store (set REDIS_URL in .env)
+#          so every worker benefits from every other's misses
+#
+# The cache never raises — a broken Redis just means a miss.
+# ============================================================
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from config.settings import REDIS_URL
+
+
+class LRUCache:
+    """
+    In-process LRU cache with a TTL on every entry.
+    Oldest entries are evicted once max_entries is reached.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()   # key → (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if time.monotonic() > expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+class TieredCache:
+    """
+    LRUCache in front of an optional shared Redis store.
+    Values must be JSON-serializable.
+
+    Usage:
+        cache = TieredCache("intent", max_entries=2048, ttl=3600)
+        value = await cache.get(key)
+        await cache.set(key, value)
+    """
+
+    def __init__(self, namespace: str, max_entries: int, ttl: float, redis_url: str = REDIS_URL):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = LRUCache(max_entries, ttl)
+        self.redis_url = redis_url
+        self._redis = None
+        self.shared_hits = 0
+        self.shared_errors = 0
+
+    def _shared(self):
+        """
+        Returns the Redis client, connecting on first use.
+        None if REDIS_URL is not set or redis is not installed.
+        """
+
+        if not self.redis_url:
+            return None
+
+        if self._redis is None:
+            try:
+                import redis.asyncio as redis
+                self._redis = redis.from_url(self.redis_url)
+            except ImportError:
+                print("[cache] REDIS_URL is set but the 'redis' package is not installed")
+                self.redis_url = ""
+                return None
+
+        return self._redis
+
+    def _shared_key(self, key: str) -> str:
+        return f"nextnest:{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        shared = self._shared()
+        if shared is None:
+            return None
+
+        try:
+            raw = await shared.get(self._shared_key(key))
+        except Exception as e:
+            self.shared_errors += 1
+            print(f"[cache] Shared get failed ({e})")
+            return None
+
+        if raw is None:
+            return None
+
+        value = json.loads(raw)
+        self.shared_hits += 1
+        self.local.set(key, value)   # promote to level 1
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+
+        shared = self._shared()
+        if shared is None:
+            return
+
+        try:
+            await shared.set(self._shared_key(key), json.dumps(value), ex=int(self.ttl))
+        except Exception as e:
+            self.shared_errors += 1
+            print(f"[cache] Shared set failed ({e})")
+
+    async def delete(self, key: str) -> None:
+        self.local.delete(key)
+
+        shared = self._shared()
+        if shared is None:
+            return
+
+        try:
+            await shared.delete(self._shared_key(key))
+        except Exception as e:
+            self.shared_errors += 1
+            print(f"[cache] Shared delete failed ({e})")
+
+    def stats(self) -> dict:
+        return {
+            **self.local.stats(),
+            "shared_enabled": bool(self.redis_url),
+            "shared_hits": self.shared_hits,
+            "shared_errors": self.shared_errors
+        }
@@ -0,0 +1,189 @@
+# ============================================================
+# memory/note_summaries.py — Rolling Behavioral-Note Summaries
+# Child.behavioralNotes only ever grows, so the risk prompt
+# sends a fixed-size summary of it instead of the raw list:
+#
+#   counts     notes by severity over the last 30 / 90 / 365
+#              days (NOTE_WINDOWS_DAYS), plus all-time totals
+#   trend      least-squares slope of the severity-weighted
+#              weekly note load over the last TREND_WEEKS weeks
+#   recent     the NOTE_SUMMARY_RECENT newest notes verbatim
+#
+# Each child's summary is kept between requests and only
+# consumes the notes appended since it last saw the child —
+# O(new notes). Per severity it holds the sorted timestamps of
+# the last year only, so windows and weekly buckets are bisects.
+# If the notes it already consumed have changed (edited or
+# deleted), it rebuilds from scratch; the backend's
+# POST /ai/cache/invalidate also drops it.
+# ============================================================
+
+import bisect
+import hashlib
+import json
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config.settings import NOTE_SUMMARY_RECENT, NOTE_SUMMARY_CACHE_SIZE
+from agent.risk_scorer import SEVERITY_WEIGHTS, parse_date
+
+NOTE_WINDOWS_DAYS = (30, 90, 365)
+TREND_WEEKS = 12
+
+# |slope| below this (weighted notes / week, per week) is "stable"
+TREND_FLAT_SLOPE = 0.02
+
+_DAY = 86400
+_HORIZON = max(NOTE_WINDOWS_DAYS[-1], TREND_WEEKS * 7) * _DAY
+
+
+def _fingerprint(note: dict) -> str:
+    if note.get("_id"):
+        return str(note["_id"])
+    body = json.dumps([note.get("date"), note.get("note"), note.get("severity")], default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _severity(note: dict) -> str:
+    severity = note.get("severity")
+    return severity if severity in SEVERITY_WEIGHTS else "low"
+
+
+class NoteSummary:
+    """
+    Rolling aggregates over one child's behavioral notes.
+    """
+
+    def __init__(self):
+        self.consumed = 0
+        self.last_fingerprint: Optional[str] = None
+        self.totals = {s: 0 for s in SEVERITY_WEIGHTS}
+        self.stamps: Dict[str, List[float]] = {s: [] for s in SEVERITY_WEIGHTS}
+        self.recent = deque(maxlen=NOTE_SUMMARY_RECENT)
+
+    def matches(self, notes: List[dict]) -> bool:
+        """
+        True if the notes this summary consumed are still the
+        start of the list (checked on the last one).
+        """
+
+        if self.consumed == 0:
+            return True
+        return len(notes) >= self.consumed and _fingerprint(notes[self.consumed - 1]) == self.last_fingerprint
+
+    def update(self, notes: List[dict], now: float) -> int:
+        """
+        Consumes the notes appended since the last update.
+        Returns how many were new.
+        """
+
+        new = notes[self.consumed:]
+        for note in new:
+            severity = _severity(note)
+            self.totals[severity] += 1
+            ts = parse_date(note.get("date"))
+            stamp = now if ts is None else ts
+            if stamp >= now - _HORIZON:
+                bisect.insort(self.stamps[severity], stamp)
+            self.recent.append({"date": note.get("date"), "note": note.get("note"), "severity": severity})
+
+        if new:
+            self.consumed = len(notes)
+            self.last_fingerprint = _fingerprint(notes[-1])
+
+        # Notes older than the longest window will never count again
+        for stamps in self.stamps.values():
+            del stamps[:bisect.bisect_left(stamps, now - _HORIZON)]
+        return len(new)
+
+    def _count(self, severity: str, start: float, end: float) -> int:
+        stamps = self.stamps[severity]
+        return bisect.bisect_left(stamps, end) - bisect.bisect_left(stamps, start)
+
+    def trend(self, now: float) -> float:
+        """
+        Slope of the severity-weighted weekly note load, oldest
+        week first — positive when notes are getting more frequent
+        or more severe.
+        """
+
+        edges = (now - _DAY * 7 * np.arange(TREND_WEEKS, -1, -1)).tolist()
+        load = np.zeros(TREND_WEEKS)
+        for severity, weight in SEVERITY_WEIGHTS.items():
+            stamps = self.stamps[severity]
+            load += weight * np.diff([bisect.bisect_left(stamps, edge) for edge in edges])
+        weeks = np.arange(TREND_WEEKS) - (TREND_WEEKS - 1) / 2
+        return float(weeks @ (load - load.mean()) / (weeks @ weeks))
+
+    def summary(self, now: float) -> dict:
+        windows = {
+            f"last{days}d": {s: self._count(s, now - days * _DAY, float("inf")) for s in SEVERITY_WEIGHTS}
+            for days in NOTE_WINDOWS_DAYS
+        }
+        slope = self.trend(now)
+        direction = "stable" if abs(slope) < TREND_FLAT_SLOPE else ("rising" if slope > 0 else "falling")
+        return {
+            "total": dict(self.totals),
+            **windows,
+            "trend": {"weeklySlope": round(slope, 3), "direction": direction},
+            "recent": list(self.recent)
+        }
+
+
+class NoteSummaryStore:
+    """
+    Per-child NoteSummary objects, least recently used dropped
+    beyond max_children.
+    """
+
+    def __init__(self, max_children: int = NOTE_SUMMARY_CACHE_SIZE):
+        self._summaries: OrderedDict = OrderedDict()
+        self.max_children = max_children
+        self.notes_consumed = 0
+        self.rebuilds = 0
+
+    def summarize(self, child: dict, now: Optional[float] = None) -> dict:
+        """
+        The behavioral-note summary for a child, bringing their
+        stored aggregates up to date first.
+        """
+
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        notes = child.get("behavioralNotes") or []
+        child_id = child.get("_id") or child.get("id")
+
+        if child_id is None:
+            state = NoteSummary()
+        else:
+            state = self._summaries.get(str(child_id))
+            if state is None or not state.matches(notes):
+                if state is not None:
+                    self.rebuilds += 1
+                state = NoteSummary()
+            self._summaries[str(child_id)] = state
+            self._summaries.move_to_end(str(child_id))
+            while len(self._summaries) > self.max_children:
+                self._summaries.popitem(last=False)
+
+        self.notes_consumed += state.update(notes, now)
+        return state.summary(now)
+
+    def invalidate(self, child_id: str) -> bool:
+        return self._summaries.pop(str(child_id), None) is not None
+
+    def stats(self) -> dict:
+        return {
+            "children": len(self._summaries),
+            "notes_consumed": self.notes_consumed,
+            "rebuilds": self.rebuilds
+        }
+
+
+_note_summaries = NoteSummaryStore()
+
+
+def get_note_summaries() -> NoteSummaryStore:
+    return _note_summaries
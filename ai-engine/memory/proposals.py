@@ -0,0 +1,127 @@
+# ============================================================
+# memory/proposals.py — Proposals Stored by Reference
+# Pass 1 used to copy the whole proposal into the session:
+# full child documents (notes, documents, populated orphanage)
+# plus the complete intent with the raw message.
+#
+# Now the session holds a compact record instead:
+#   • backend records → {_id, updatedAt} references
+#   • everything else (amount, summary, type…) → inline
+#   • the intent fields needed to rebuild it at execute time
+#   • nonce = random, drawn once per proposal — the donation
+#     idempotency keys are built from it, so two identical
+#     proposals are still two donations
+#   • id = content hash of the record (detects corruption)
+#
+# At execute time (Pass 2) hydrate() re-reads every referenced
+# record from the children catalog (or the backend if the
+# catalog is cold) and reports which ones changed or vanished
+# since the user saw the proposal.
+# ============================================================
+
+import asyncio
+import hashlib
+import json
+import uuid
+from typing import Optional, Tuple
+
+from tools.backend_client import backend_get
+from tools.children_catalog import get_catalog
+
+RECORD_VERSION = 2
+
+# Intent fields execute mode needs — raw_message and the
+# clarification fields are dropped
+_INTENT_FIELDS = ("workflow", "amount", "filters", "confidence", "source")
+
+
+def _is_backend_records(value) -> bool:
+    return (
+        isinstance(value, list) and value
+        and all(isinstance(item, dict) and "_id" in item for item in value)
+    )
+
+
+def _content_id(record: dict) -> str:
+    body = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(body.encode()).hexdigest()[:16]
+
+
+def to_record(proposal: dict, intent: dict) -> dict:
+    """
+    Compacts a proposal + intent into a session record.
+
+    Args:
+        proposal : dict returned by a workflow in propose mode
+        intent   : Intent.dict()
+
+    Returns:
+        dict with version, intent, inline fields, refs, nonce and id
+    """
+
+    inline, refs = {}, {}
+    for key, value in proposal.items():
+        if _is_backend_records(value):
+            refs[key] = [{"_id": item["_id"], "updatedAt": item.get("updatedAt")} for item in value]
+        else:
+            inline[key] = value
+
+    record = {
+        "v": RECORD_VERSION,
+        "intent": {k: intent[k] for k in _INTENT_FIELDS if intent.get(k) is not None},
+        "inline": inline,
+        "refs": refs,
+        "nonce": uuid.uuid4().hex
+    }
+    record["id"] = _content_id(record)
+    return record
+
+
+async def _load_child(child_id: str) -> Optional[dict]:
+    """
+    Current version of a child — catalog first, backend if cold.
+    """
+
+    catalog = get_catalog()
+    if catalog.loaded:
+        return catalog.get(child_id)
+
+    try:
+        response = await backend_get(f"children/{child_id}")
+        if response.status_code == 200:
+            return response.json().get("data")
+    except Exception as e:
+        print(f"[proposals] Error loading child {child_id}: {e}")
+    return None
+
+
+async def hydrate(record: dict) -> Tuple[Optional[dict], Optional[dict], dict]:
+    """
+    Rebuilds the full proposal from a session record.
+
+    Returns:
+        (proposal, intent_data, staleness) — proposal and intent are
+        None if the record is corrupt or from another version.
+        staleness = {"changed": [ids], "missing": [ids]}
+    """
+
+    staleness = {"changed": [], "missing": []}
+
+    body = {k: v for k, v in record.items() if k != "id"}
+    if record.get("v") != RECORD_VERSION or record.get("id") != _content_id(body):
+        print("[proposals] Session record failed its integrity check")
+        return None, None, staleness
+
+    proposal = dict(record["inline"], proposal_id=record["id"], proposal_nonce=record["nonce"])
+    for key, refs in record["refs"].items():
+        current = await asyncio.gather(*(_load_child(ref["_id"]) for ref in refs))
+        proposal[key] = []
+        for ref, item in zip(refs, current):
+            if item is None:
+                staleness["missing"].append(ref["_id"])
+                continue
+            if ref["updatedAt"] and item.get("updatedAt") != ref["updatedAt"]:
+                staleness["changed"].append(ref["_id"])
+            proposal[key].append(item)
+
+    return proposal, dict(record["intent"]), staleness
@@ -0,0 +1,211 @@
+# ============================================================
+# memory/session_backends.py — Shared Session Backends
+# Session stores that every uvicorn worker can see, so Pass 2
+# (confirm) works no matter which worker it lands on, and
+# pending proposals survive a restart.
+#
+#   SQLiteSessionBackend → one WAL-mode file on this machine
+#   RedisSessionBackend  → any Redis-compatible server
+#
+# Both implement the same async interface as the in-memory
+# SessionStore in memory/user_context.py:
+#   get / update / delete / sweep / stats / close
+# update() merges into the stored session atomically, so two
+# workers touching the same session never lose each other's keys.
+# Selected with SESSION_BACKEND in config/settings.py.
+#
+# Like memory/cache.py, a backend never raises — a failed read
+# is a missing session, a failed write is logged.
+# ============================================================
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from config.settings import SESSION_TTL, MAX_SESSIONS, SESSION_DB_PATH, REDIS_URL
+
+
+class SQLiteSessionBackend:
+    """
+    Sessions in an embedded SQLite database.
+
+    WAL mode lets every worker read while one writes, and
+    busy_timeout makes concurrent writers wait instead of failing.
+    Expiry uses wall-clock time so all processes agree on it.
+    Queries run in a worker thread so the event loop never blocks
+    on disk.
+    """
+
+    def __init__(self, path: str = SESSION_DB_PATH, ttl: float = SESSION_TTL,
+                 max_sessions: int = MAX_SESSIONS):
+        self.path = path
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.errors = 0
+        self.expired = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)")
+
+    def _run(self, sql: str, params: tuple = ()):
+        """
+        Rows for a SELECT, number of rows changed for anything else.
+        """
+
+        with self._lock:
+            cursor = self._db.execute(sql, params)
+            return cursor.fetchall() if sql.startswith("SELECT") else cursor.rowcount
+
+    async def _query(self, sql: str, params: tuple = (), default=None):
+        try:
+            return await asyncio.to_thread(self._run, sql, params)
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"[memory] SQLite session query failed ({e})")
+            return default
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        rows = await self._query(
+            "SELECT data FROM sessions WHERE id = ? AND expires_at > ?",
+            (session_id, time.time())
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def _merge(self, session_id: str, data: dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")   # take the write lock before reading
+            try:
+                row = self._db.execute(
+                    "SELECT data FROM sessions WHERE id = ? AND expires_at > ?", (session_id, now)
+                ).fetchone()
+                merged = {**(json.loads(row[0]) if row else {}), **data}
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sessions (id, data, expires_at) VALUES (?, ?, ?)",
+                    (session_id, json.dumps(merged), now + self.ttl)
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    async def update(self, session_id: str, data: dict) -> None:
+        try:
+            await asyncio.to_thread(self._merge, session_id, data)
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"[memory] SQLite session update failed ({e})")
+
+    async def delete(self, session_id: str) -> bool:
+        return bool(await self._query("DELETE FROM sessions WHERE id = ?", (session_id,), default=0))
+
+    async def sweep(self) -> int:
+        """
+        Drops expired sessions, then the oldest ones beyond
+        max_sessions. Returns how many expired sessions were dropped.
+        """
+
+        expired = await self._query("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),), default=0)
+        evicted = await self._query(
+            "DELETE FROM sessions WHERE id IN ("
+            " SELECT id FROM sessions ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,), default=0
+        )
+        self.expired += expired
+        self.evictions += evicted
+        return expired
+
+    def stats(self) -> dict:
+        try:
+            count = self._run("SELECT COUNT(*) FROM sessions")[0][0]
+        except sqlite3.Error:
+            count = None
+        return {
+            "backend": "sqlite",
+            "sessions": count,
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "errors": self.errors
+        }
+
+    async def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class RedisSessionBackend:
+    """
+    Sessions in Redis (or any server speaking its protocol).
+    Each session is a hash of JSON-encoded fields, so update() is
+    one HSET + EXPIRE transaction — no read-modify-write.
+    Redis expires keys itself, so sweep() is a no-op; size is
+    bounded by the server's maxmemory policy.
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL, ttl: float = SESSION_TTL):
+        import redis.asyncio as redis   # only needed when this backend is chosen
+
+        if not redis_url:
+            raise ValueError("SESSION_BACKEND is 'redis' but REDIS_URL is not set")
+
+        self.ttl = ttl
+        self.errors = 0
+        self._redis = redis.from_url(redis_url)
+
+    def _key(self, session_id: str) -> str:
+        return f"nextnest:session:{session_id}"
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        try:
+            raw = await self._redis.hgetall(self._key(session_id))
+        except Exception as e:
+            self.errors += 1
+            print(f"[memory] Redis session get failed ({e})")
+            return None
+        if not raw:
+            return None
+        return {k.decode() if isinstance(k, bytes) else k: json.loads(v) for k, v in raw.items()}
+
+    async def update(self, session_id: str, data: dict) -> None:
+        key = self._key(session_id)
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={k: json.dumps(v) for k, v in data.items()})
+                pipe.expire(key, int(self.ttl))
+                await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            print(f"[memory] Redis session update failed ({e})")
+
+    async def delete(self, session_id: str) -> bool:
+        try:
+            return bool(await self._redis.delete(self._key(session_id)))
+        except Exception as e:
+            self.errors += 1
+            print(f"[memory] Redis session delete failed ({e})")
+            return False
+
+    async def sweep(self) -> int:
+        return 0
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "errors": self.errors}
+
+    async def close(self) -> None:
+        close = getattr(self._redis, "aclose", None) or self._redis.close
+        await close()
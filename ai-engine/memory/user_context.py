@@ -4,17 +4,152 @@
 # Most importantly: saves the pending proposal so operator.py
 # can retrieve and execute it when the user confirms.
 #
-# Currently uses in-memory storage (dict).
-# For production: replace with Redis or a database.
+# The store is chosen by SESSION_BACKEND:
+#   "memory" → SessionStore below (single worker only)
+#   "sqlite" / "redis" → memory/session_backends.py, shared by
+#              every worker and surviving restarts
+#
+# The in-memory store is bounded so it stays flat over days
+# of uptime:
+#   • at most MAX_SESSIONS entries — least recently used evicted
+#   • a background sweeper drops expired sessions every
+#     SESSION_SWEEP_INTERVAL, even ones nobody reads again
 # ============================================================
 
+import asyncio
 import time
+from collections import OrderedDict
 from typing import Optional
-from config.settings import SESSION_TTL
+from config.settings import SESSION_TTL, MAX_SESSIONS, SESSION_SWEEP_INTERVAL, SESSION_BACKEND
+
+
+class _Session:
+    """
+    One stored session. __slots__ keeps the per-entry overhead
+    to two references instead of a full instance dict.
+    """
+
+    __slots__ = ("data", "expires_at")
+
+    def __init__(self, data: dict, expires_at: float):
+        self.data = data
+        self.expires_at = expires_at
+
+
+class SessionStore:
+    """
+    LRU-ordered session map with a TTL on every entry.
+    Sessions move to the end on every read or write, so the
+    front is always the least recently used.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, ttl: float = SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: OrderedDict = OrderedDict()   # session_id → _Session
+        self.evictions = 0
+        self.expired = 0
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+
+        if time.monotonic() > session.expires_at:
+            del self._sessions[session_id]
+            self.expired += 1
+            print(f"[memory] Session {session_id} expired and removed")
+            return None
+
+        self._sessions.move_to_end(session_id)
+        return session.data
+
+    async def update(self, session_id: str, data: dict) -> None:
+        """
+        Merges data into the session and resets its expiry.
+        """
+
+        existing = await self.get(session_id) or {}
+        self._sessions[session_id] = _Session({**existing, **data}, time.monotonic() + self.ttl)
+        self._sessions.move_to_end(session_id)
+
+        while len(self._sessions) > self.max_sessions:
+            evicted, _ = self._sessions.popitem(last=False)
+            self.evictions += 1
+            print(f"[memory] Session store full — evicted {evicted}")
+
+    async def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    async def sweep(self) -> int:
+        """
+        Removes every expired session. Returns how many were dropped.
+        """
+
+        now = time.monotonic()
+        expired = [sid for sid, s in self._sessions.items() if now > s.expires_at]
+        for session_id in expired:
+            del self._sessions[session_id]
+        self.expired += len(expired)
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+            "expired": self.expired
+        }
+
+    async def close(self) -> None:
+        self._sessions.clear()
+
+
+def _make_store():
+    """
+    Builds the store named by SESSION_BACKEND.
+    """
+
+    if SESSION_BACKEND == "sqlite":
+        from memory.session_backends import SQLiteSessionBackend
+        return SQLiteSessionBackend()
+
+    if SESSION_BACKEND == "redis":
+        from memory.session_backends import RedisSessionBackend
+        return RedisSessionBackend()
+
+    return SessionStore()
+
 
-# In-memory session store
-# Format: { session_id: { data..., _expires_at: timestamp } }
-_sessions: dict = {}
+_sessions = _make_store()
+
+
+def get_session_store():
+    return _sessions
+
+
+async def run_session_sweeper(interval: float = SESSION_SWEEP_INTERVAL) -> None:
+    """
+    Background task started from the FastAPI lifespan in main.py.
+    """
+
+    while True:
+        await asyncio.sleep(interval)
+        dropped = await _sessions.sweep()
+        if dropped:
+            print(f"[memory] Swept {dropped} expired sessions")
+
+
+async def close_session_store() -> None:
+    """
+    Closes the store's connection. Called on FastAPI shutdown.
+    """
+
+    await _sessions.close()
 
 
 async def get_session(session_id: str) -> Optional[dict]:
@@ -29,18 +164,7 @@ async def get_session(session_id: str) -> Optional[dict]:
         dict of session data or None
     """
 
-    session = _sessions.get(session_id)
-
-    if not session:
-        return None
-
-    # Check if session has expired
-    if time.time() > session.get("_expires_at", 0):
-        del _sessions[session_id]
-        print(f"[memory] Session {session_id} expired and removed")
-        return None
-
-    return session
+    return await _sessions.get(session_id)
 
 
 async def update_session(session_id: str, data: dict) -> None:
@@ -54,15 +178,8 @@ async def update_session(session_id: str, data: dict) -> None:
         data       : dict of values to store/update
     """
 
-    existing = _sessions.get(session_id, {})
-
-    # Merge new data into existing session
-    updated = {**existing, **data}
-
-    # Reset expiry timer
-    updated["_expires_at"] = time.time() + SESSION_TTL
-
-    _sessions[session_id] = updated
+    # Merge new data into existing session (resets expiry)
+    await _sessions.update(session_id, data)
 
     print(f"[memory] Session {session_id} updated with keys: {list(data.keys())}")
 
@@ -76,8 +193,7 @@ async def clear_session(session_id: str) -> None:
         session_id : session to remove
     """
 
-    if session_id in _sessions:
-        del _sessions[session_id]
+    if await _sessions.delete(session_id):
         print(f"[memory] Session {session_id} cleared")
 
 
@@ -99,4 +215,4 @@ async def get_user_preferences(user_id: str) -> dict:
     # TODO: In production, fetch from database
     # Example: SELECT preferences FROM users WHERE id = user_id
 
-    return {}
\ No newline at end of file
+    return {}
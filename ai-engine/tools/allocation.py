@@ -0,0 +1,181 @@
+# ============================================================
+# tools/allocation.py — Multi-Recipient Allocation Engine
+# Splits one donation across many recipients by need instead
+# of equally. Everything is computed on NumPy arrays, so a bulk
+# or corporate donation over thousands of candidates is planned
+# in a few milliseconds.
+#
+# Rules, in order:
+#   1. at most max_count recipients (MAX_ALLOCATION_COUNT) —
+#      the most urgent ones, and never more than the amount can
+#      give each their minimum
+#   2. everyone chosen gets the minimum first
+#      (SPONSORSHIP_MIN_AMOUNT for sponsorships)
+#   3. the rest is shared in proportion to urgency, never above
+#      a recipient's cap — the caller's cap, or the remaining
+#      targetAmount - amountRaised on their open MedicalCases.
+#      Whatever a capped recipient can't take is re-shared among
+#      the others (water-filling).
+#   4. amounts are whole rupees: floored, then the leftover
+#      rupees go to the largest fractional parts.
+#
+# Whatever can't be placed — every recipient capped, no one
+# able to take the minimum, or paise below a whole rupee — is
+# returned as "unallocated" rather than over-funding anyone, so
+# the workflow can report it or refuse.
+# ============================================================
+
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from config.settings import MAX_ALLOCATION_COUNT
+from tools.children_catalog import get_catalog
+from tools.ranking import urgency_of
+
+# Every selected recipient keeps a little weight, so a child with
+# a zero urgency score still gets a share of the remainder
+_MIN_WEIGHT = 0.01
+
+
+def remaining_need(recipient: dict) -> float:
+    """
+    Unfunded amount (₹) still needed by a recipient: their open
+    MedicalCases for a child, or the case itself for a case.
+    0 when nothing is known to be outstanding.
+    """
+
+    if "targetAmount" in recipient:
+        cases = [recipient]
+    else:
+        cases = get_catalog().open_cases(recipient.get("_id"))
+    return float(sum(
+        max((c.get("targetAmount") or 0) - (c.get("amountRaised") or 0), 0) for c in cases
+    ))
+
+
+def _water_fill(amount: float, weights: np.ndarray, caps: np.ndarray) -> np.ndarray:
+    """
+    Shares amount in proportion to weights without exceeding caps.
+    Each pass fills everyone still below their cap; it ends once
+    nothing is left or everyone is capped (at most n passes).
+    """
+
+    shares = np.zeros_like(weights)
+    remaining = amount
+    open_ = caps > 0
+    while remaining > 1e-9 and open_.any():
+        proposal = remaining * weights * open_ / weights[open_].sum()
+        room = caps - shares
+        capped = open_ & (proposal >= room)
+        if not capped.any():
+            shares += proposal
+            break
+        # Fill the capped recipients, then re-share the rest
+        shares[capped] = caps[capped]
+        remaining -= room[capped].sum()
+        open_ &= ~capped
+    return shares
+
+
+def _round_rupees(shares: np.ndarray, caps: np.ndarray, total: int) -> np.ndarray:
+    """
+    Whole-rupee amounts that sum to `total` (largest remainder
+    method), never above a recipient's floored cap.
+    """
+
+    floors = np.floor(shares + 1e-9)
+    leftover = int(total - floors.sum())
+    if leftover > 0:
+        fractions = np.where(floors < np.floor(caps), shares - floors, -1.0)
+        eligible = int((fractions >= 0).sum())
+        order = np.argsort(-fractions, kind="stable")[:min(leftover, eligible)]
+        floors[order] += 1
+    return floors.astype(np.int64)
+
+
+def allocate(amount: float, recipients: Sequence[dict], minimum: float = 0,
+             caps: Optional[Union[float, Sequence[Optional[float]]]] = None,
+             max_count: int = MAX_ALLOCATION_COUNT) -> dict:
+    """
+    Need-weighted split of a donation.
+
+    Args:
+        amount     : total donation (₹)
+        recipients : children (or MedicalCases / orphanages) to consider
+        minimum    : least each chosen recipient receives (₹)
+        caps       : most each recipient may receive — one number for
+                     all, or one per recipient (None = no cap)
+        max_count  : most recipients one donation is split across
+
+    Returns:
+        {"allocations": [{"recipient": dict, "amount": int}] — most
+                        urgent first, zero-amount entries dropped,
+         "unallocated": float — the part of amount not placed}
+    """
+
+    amount = float(amount or 0)
+    total = int(amount)
+    if total <= 0 or not recipients:
+        return _result([], amount)
+
+    n = len(recipients)
+    weights = np.fromiter((urgency_of(r) for r in recipients), dtype=np.float64, count=n)
+    need = np.fromiter((remaining_need(r) for r in recipients), dtype=np.float64, count=n)
+
+    if caps is None:
+        cap = np.full(n, np.inf)
+    elif np.isscalar(caps):
+        cap = np.full(n, float(caps))
+    else:
+        cap = np.array([np.inf if c is None else c for c in caps], dtype=np.float64)
+    # Children with an open medical gap are never funded past it
+    cap = np.where(need > 0, np.minimum(cap, need), cap)
+
+    # Not enough for even one minimum — nothing is allocated
+    minimum = float(minimum)
+    if total < minimum:
+        return _result([], amount)
+
+    # A recipient who can't take the minimum is left out
+    candidates = np.flatnonzero(cap >= max(minimum, 1))
+    if candidates.size == 0:
+        return _result([], amount)
+
+    # Most urgent first; argpartition keeps this O(n) for big pools
+    count = min(max_count, candidates.size, int(total // minimum) if minimum > 0 else total)
+    count = max(count, 1)
+    if count < candidates.size:
+        top = np.argpartition(-weights[candidates], count - 1)[:count]
+        candidates = candidates[top]
+    chosen = candidates[np.argsort(-weights[candidates], kind="stable")]
+
+    w = np.maximum(weights[chosen], _MIN_WEIGHT)
+    c = cap[chosen]
+    shares = minimum + _water_fill(total - minimum * chosen.size, w, c - minimum)
+
+    # Less than the total only when every recipient is capped
+    amounts = _round_rupees(shares, c, int(np.floor(shares.sum() + 1e-6)))
+
+    return _result([
+        {"recipient": recipients[i], "amount": int(a)}
+        for i, a in zip(chosen, amounts) if a > 0
+    ], amount)
+
+
+def _result(allocations: List[dict], amount: float) -> dict:
+    placed = sum(a["amount"] for a in allocations)
+    return {"allocations": allocations, "unallocated": round(max(amount - placed, 0.0), 2)}
+
+
+def to_plan(result: dict) -> List[dict]:
+    """
+    allocate() output as plain {"childId", "name", "amount"}
+    entries — what a proposal stores, shows the user and later
+    writes, so execute donates exactly the confirmed split.
+    """
+
+    return [
+        {"childId": str(a["recipient"].get("_id")), "name": a["recipient"].get("name"), "amount": a["amount"]}
+        for a in result["allocations"]
+    ]
@@ -0,0 +1,154 @@
+# ============================================================
+# tools/backend_client.py — Shared Backend HTTP Client
+# Every call the AI engine makes to the Node.js backend goes
+# through ONE pooled httpx.AsyncClient, created in the FastAPI
+# lifespan (main.py) and closed on shutdown.
+#
+#   • keep-alive pool    → no TCP setup per workflow call
+#   • BACKEND_TIMEOUT    → a stuck backend fails fast
+#   • GET retries        → connection errors / 502-504 are retried
+#                          with jittered exponential backoff
+#   • POST never retries → a donation must not be written twice
+#                          (unless it carries idempotency keys)
+#   • stats()            → request/retry/error counts and pool
+#                          usage, reported on GET /metrics
+# ============================================================
+
+import asyncio
+import random
+from typing import Optional
+
+import httpx
+
+from config.settings import (
+    BACKEND_API_URL, BACKEND_TIMEOUT, BACKEND_MAX_CONNECTIONS,
+    BACKEND_HTTP2, BACKEND_RETRIES, BACKEND_RETRY_BACKOFF,
+)
+
+# Gateway errors worth retrying — the backend never saw the request
+# or is restarting. Anything else is returned to the caller as is.
+RETRY_STATUSES = {502, 503, 504}
+
+_client: Optional[httpx.AsyncClient] = None
+_http2 = False
+_stats = {"requests": 0, "retries": 0, "errors": 0, "in_flight": 0}
+
+
+def _http2_available() -> bool:
+    if not BACKEND_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        print("[backend_client] BACKEND_HTTP2 is set but 'h2' is not installed — using HTTP/1.1")
+        return False
+
+
+def init_backend_client() -> httpx.AsyncClient:
+    """
+    Builds the shared client. Called once from the FastAPI lifespan.
+    """
+
+    global _client, _http2
+
+    if _client is None or _client.is_closed:
+        _http2 = _http2_available()
+        _client = httpx.AsyncClient(
+            base_url=BACKEND_API_URL.rstrip("/") + "/",
+            timeout=httpx.Timeout(BACKEND_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=BACKEND_MAX_CONNECTIONS,
+                max_keepalive_connections=BACKEND_MAX_CONNECTIONS,
+            ),
+            http2=_http2,
+        )
+
+    return _client
+
+
+def get_backend_client() -> httpx.AsyncClient:
+    """
+    Returns the shared client, building it on first use
+    (scripts and tests that run without the lifespan).
+    """
+
+    return init_backend_client()
+
+
+async def _send(method: str, path: str, retries: int, **kwargs) -> httpx.Response:
+    client = get_backend_client()
+    path = path.lstrip("/")
+
+    for attempt in range(retries + 1):
+        _stats["requests"] += 1
+        _stats["in_flight"] += 1
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.TransportError:
+            if attempt == retries:
+                _stats["errors"] += 1
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                if response.status_code >= 500:
+                    _stats["errors"] += 1
+                return response
+        finally:
+            _stats["in_flight"] -= 1
+
+        # Full jitter: spreads retries out so many workers don't
+        # hammer a recovering backend in lockstep
+        _stats["retries"] += 1
+        await asyncio.sleep(random.uniform(0, BACKEND_RETRY_BACKOFF * 2 ** attempt))
+
+
+async def backend_get(path: str, params: Optional[dict] = None) -> httpx.Response:
+    """
+    GET {BACKEND_API_URL}/{path}, retried up to BACKEND_RETRIES times.
+    Raises httpx.TransportError if every attempt fails to connect.
+    """
+
+    return await _send("GET", path, BACKEND_RETRIES, params=params)
+
+
+async def backend_post(path: str, json: Optional[dict] = None, idempotent: bool = False) -> httpx.Response:
+    """
+    POST {BACKEND_API_URL}/{path}. Never retried unless the caller
+    marks it idempotent (e.g. every item carries an idempotency key).
+    """
+
+    return await _send("POST", path, BACKEND_RETRIES if idempotent else 0, json=json)
+
+
+def backend_client_stats() -> dict:
+    """
+    Request counters plus live pool usage.
+    """
+
+    pool = {"max_connections": BACKEND_MAX_CONNECTIONS, "open": 0, "idle": 0}
+
+    # httpx doesn't expose its pool publicly; read httpcore's view
+    # of it when available and report zeros otherwise
+    transport = getattr(_client, "_transport", None)
+    connections = getattr(getattr(transport, "_pool", None), "connections", [])
+    pool["open"] = len(connections)
+    pool["idle"] = sum(1 for c in connections if c.is_idle())
+
+    return {
+        **_stats,
+        "http2": _http2,
+        "pool": pool
+    }
+
+
+async def close_backend_client() -> None:
+    """
+    Closes the shared client. Called on FastAPI shutdown.
+    """
+
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
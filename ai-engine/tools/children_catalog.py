@@ -0,0 +1,364 @@
+# ============================================================
+# tools/children_catalog.py — In-memory Children Catalog
+# A local copy of the backend's children collection so
+# search_children() can answer without a backend round-trip.
+#
+# Sync:
+#   1. Bulk load    GET /children                  (startup)
+#   2. Delta sync   GET /children?updatedSince=…   (every CATALOG_SYNC_INTERVAL)
+#   3. Full reload  when the backend's total no longer matches
+#                   ours (a child was deleted), or every
+#                   CATALOG_FULL_SYNC_INTERVAL as a safety net
+#
+# Open medical cases (GET /medical) are synced the same way,
+# by their own updatedAt watermark — but only after the children
+# are committed, and separately: a failed or slow /medical call
+# leaves the last good cases (and their watermark) in place, so
+# only the medical part of the urgency score goes stale.
+#
+# Secondary indexes (child id sets) and each child's urgency
+# score (tools/ranking.py) are kept in step with every upsert
+# of the child or one of their cases: category, attendance band
+# and orphanage.
+# ============================================================
+
+import asyncio
+import heapq
+import time
+from typing import Dict, List, Optional, Set
+
+from config.settings import CATALOG_SYNC_INTERVAL, CATALOG_FULL_SYNC_INTERVAL
+from tools.backend_client import backend_get
+from tools.ranking import urgency_score, case_child_id
+
+# Children below this attendance % count as urgent
+URGENT_ATTENDANCE = 80
+
+# Attendance bands: (name, lower bound inclusive, upper bound exclusive)
+ATTENDANCE_BANDS = [
+    ("critical", 0, 60),
+    ("low", 60, URGENT_ATTENDANCE),
+    ("fair", URGENT_ATTENDANCE, 90),
+    ("good", 90, float("inf")),
+]
+URGENT_BANDS = [name for name, _, upper in ATTENDANCE_BANDS if upper <= URGENT_ATTENDANCE]
+
+# Which search categories a child belongs to.
+# The Child model has no category field, so they are derived:
+#   sponsorship → any child
+#   education   → school age, or has an education / academic record
+#   medical     → has an open medical case, or is showing distress
+#                 (low attendance or a high-severity note)
+CATEGORIES = ("sponsorship", "education", "medical")
+SCHOOL_LEAVING_AGE = 18
+
+
+def _attendance(child: dict) -> float:
+    return (child.get("attendanceStats") or {}).get("percentage", 100)
+
+
+def _child_categories(child: dict, has_open_case: bool = False) -> Set[str]:
+    categories = {"sponsorship"}
+
+    age = child.get("age")
+    if age is None or age <= SCHOOL_LEAVING_AGE or child.get("education") or child.get("academicRecord"):
+        categories.add("education")
+
+    notes = child.get("behavioralNotes") or []
+    if has_open_case or _attendance(child) < URGENT_ATTENDANCE or any(n.get("severity") == "high" for n in notes):
+        categories.add("medical")
+
+    return categories
+
+
+def _attendance_band(child: dict) -> str:
+    percentage = _attendance(child)
+    for name, lower, upper in ATTENDANCE_BANDS:
+        if lower <= percentage < upper:
+            return name
+    return ATTENDANCE_BANDS[0][0]   # negative / malformed values
+
+
+def _orphanage_id(child: dict) -> Optional[str]:
+    orphanage = child.get("orphanage")
+    if isinstance(orphanage, dict):   # populated {_id, name, email}
+        return orphanage.get("_id")
+    return orphanage
+
+
+class ChildrenCatalog:
+    """
+    Children keyed by _id, plus id-set indexes for fast filtering
+    and a precomputed urgency score per child for ranking.
+
+    Usage:
+        catalog = get_catalog()
+        await catalog.sync()
+        catalog.search(category="medical", urgent_only=True, max_results=3)
+    """
+
+    def __init__(self):
+        self._children: Dict[str, dict] = {}
+        self._order: Dict[str, int] = {}        # id → first-seen position (backend order)
+        self._keys: Dict[str, tuple] = {}       # id → (categories, band, orphanage) last indexed
+        self._by_category: Dict[str, Set[str]] = {}
+        self._by_band: Dict[str, Set[str]] = {}
+        self._by_orphanage: Dict[str, Set[str]] = {}
+        self._urgency: Dict[str, float] = {}    # id → ranking.urgency_score
+        self._next_position = 0
+
+        self._cases: Dict[str, dict] = {}               # open MedicalCases by _id
+        self._cases_by_child: Dict[str, Set[str]] = {}
+
+        self.loaded = False
+        self.watermark: Optional[str] = None        # newest child updatedAt seen (backend clock)
+        self.case_watermark: Optional[str] = None   # same, for medical cases
+        self.last_full_sync = 0.0
+        self.full_syncs = 0
+        self.delta_syncs = 0
+        self.sync_errors = 0
+        self.case_sync_errors = 0
+        self._lock = asyncio.Lock()
+
+    # ── indexes ──────────────────────────────────────────────
+
+    def _unindex(self, child_id: str) -> None:
+        keys = self._keys.pop(child_id, None)
+        if keys is None:
+            return
+        categories, band, orphanage = keys
+        for category in categories:
+            self._by_category[category].discard(child_id)
+        self._by_band[band].discard(child_id)
+        if orphanage:
+            self._by_orphanage[orphanage].discard(child_id)
+
+    def _reindex(self, child_id: str) -> None:
+        """
+        Recomputes one child's index entries and urgency score from
+        the stored child and their open cases.
+        """
+
+        child = self._children.get(child_id)
+        if child is None:
+            return
+
+        self._unindex(child_id)
+
+        cases = [self._cases[c] for c in self._cases_by_child.get(child_id, ())]
+        categories = _child_categories(child, has_open_case=bool(cases))
+        band = _attendance_band(child)
+        orphanage = _orphanage_id(child)
+
+        for category in categories:
+            self._by_category.setdefault(category, set()).add(child_id)
+        self._by_band.setdefault(band, set()).add(child_id)
+        if orphanage:
+            self._by_orphanage.setdefault(orphanage, set()).add(child_id)
+
+        self._keys[child_id] = (categories, band, orphanage)
+        self._urgency[child_id] = child["urgencyScore"] = urgency_score(child, cases)
+
+    def _upsert(self, child: dict) -> None:
+        child_id = child.get("_id")
+        if not child_id:
+            return
+
+        self._children[child_id] = child
+        if child_id not in self._order:
+            self._order[child_id] = self._next_position
+            self._next_position += 1
+        self._reindex(child_id)
+
+        updated_at = child.get("updatedAt")
+        if updated_at and (self.watermark is None or updated_at > self.watermark):
+            self.watermark = updated_at
+
+    def _upsert_case(self, case: dict) -> None:
+        case_id = case.get("_id")
+        if not case_id:
+            return
+
+        # Drop the old version (its child may have changed too)
+        old = self._cases.pop(case_id, None)
+        if old is not None:
+            old_child = case_child_id(old)
+            self._cases_by_child.get(old_child, set()).discard(case_id)
+            self._reindex(old_child)
+
+        if case.get("status", "open") == "open":
+            child_id = case_child_id(case)
+            self._cases[case_id] = case
+            self._cases_by_child.setdefault(child_id, set()).add(case_id)
+            self._reindex(child_id)
+
+        updated_at = case.get("updatedAt")
+        if updated_at and (self.case_watermark is None or updated_at > self.case_watermark):
+            self.case_watermark = updated_at
+
+    def _reset(self) -> None:
+        # Cases are kept — _sync_cases() replaces them on its own
+        self._children.clear()
+        self._order.clear()
+        self._keys.clear()
+        self._by_category.clear()
+        self._by_band.clear()
+        self._by_orphanage.clear()
+        self._urgency.clear()
+        self._next_position = 0
+        self.watermark = None
+
+    def _reset_cases(self) -> None:
+        affected = list(self._cases_by_child)
+        self._cases.clear()
+        self._cases_by_child.clear()
+        self.case_watermark = None
+        for child_id in affected:
+            self._reindex(child_id)
+
+    # ── sync ─────────────────────────────────────────────────
+
+    async def _fetch(self, path: str, params: Optional[dict] = None) -> dict:
+        response = await backend_get(path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def _sync_cases(self, full: bool = False) -> None:
+        """
+        Full or delta sync of open medical cases. Never raises — on
+        failure the last good cases and case_watermark are kept.
+        """
+
+        params = None if full or self.case_watermark is None else {"updatedSince": self.case_watermark}
+        try:
+            cases = await self._fetch("medical", params)
+        except Exception as e:
+            self.case_sync_errors += 1
+            print(f"[children_catalog] Medical case sync failed, keeping last good cases: {e}")
+            return
+
+        if full:
+            self._reset_cases()
+        for case in cases.get("data", []):
+            self._upsert_case(case)
+
+    async def full_sync(self) -> None:
+        children = await self._fetch("children")
+        self._reset()
+        for child in children.get("data", []):
+            self._upsert(child)
+        self.loaded = True
+        self.last_full_sync = time.monotonic()
+        self.full_syncs += 1
+
+        await self._sync_cases(full=True)
+        print(f"[children_catalog] Loaded {len(self._children)} children, {len(self._cases)} open medical cases")
+
+    async def delta_sync(self) -> None:
+        # updatedSince is inclusive, so records saved in the same
+        # millisecond as the watermark are fetched again, never missed
+        children = await self._fetch("children", {"updatedSince": self.watermark})
+        for child in children.get("data", []):
+            self._upsert(child)
+        self.delta_syncs += 1
+
+        total = children.get("total")
+        if total is not None and total != len(self._children):
+            print(f"[children_catalog] Backend has {total} children, catalog {len(self._children)} — reloading")
+            await self.full_sync()
+            return
+
+        await self._sync_cases()
+
+    async def sync(self) -> None:
+        """
+        Brings the catalog up to date. Never raises — on failure the
+        catalog keeps serving its last good copy.
+        """
+
+        async with self._lock:
+            try:
+                stale = time.monotonic() - self.last_full_sync > CATALOG_FULL_SYNC_INTERVAL
+                if not self.loaded or self.watermark is None or stale:
+                    await self.full_sync()
+                else:
+                    await self.delta_sync()
+            except Exception as e:
+                self.sync_errors += 1
+                print(f"[children_catalog] Sync failed: {e}")
+
+    async def run_sync_loop(self, interval: float = CATALOG_SYNC_INTERVAL) -> None:
+        """
+        Background task started from the FastAPI lifespan in main.py.
+        """
+
+        while True:
+            await self.sync()
+            await asyncio.sleep(interval)
+
+    # ── queries ──────────────────────────────────────────────
+
+    def search(self, category: Optional[str] = None, urgent_only: bool = False,
+               orphanage: Optional[str] = None, max_results: int = 3) -> List[dict]:
+        """
+        The max_results most urgent children matching every given
+        filter (ties keep backend order). An unknown category (or
+        None) does not filter. Each result carries its urgencyScore.
+
+        Cost is set intersections over the indexes plus a
+        max_results-sized heap over precomputed scores —
+        O(n log k), no per-request scoring or full sort.
+        """
+
+        candidates: List[Set[str]] = []
+        if category in CATEGORIES:
+            candidates.append(self._by_category.get(category, set()))
+        if urgent_only:
+            candidates.append(set().union(*(self._by_band.get(b, set()) for b in URGENT_BANDS)))
+        if orphanage is not None:
+            candidates.append(self._by_orphanage.get(orphanage, set()))
+
+        if not candidates:
+            ids = self._children.keys()
+        else:
+            candidates.sort(key=len)
+            ids = candidates[0].intersection(*candidates[1:])
+
+        top = heapq.nsmallest(max_results, ids, key=lambda i: (-self._urgency[i], self._order[i]))
+        return [self._children[child_id] for child_id in top]
+
+    def get(self, child_id: str) -> Optional[dict]:
+        return self._children.get(child_id)
+
+    def open_cases(self, child_id: str) -> List[dict]:
+        return [self._cases[c] for c in self._cases_by_child.get(child_id, ())]
+
+    def __len__(self) -> int:
+        return len(self._children)
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "children": len(self._children),
+            "open_medical_cases": len(self._cases),
+            "watermark": self.watermark,
+            "case_watermark": self.case_watermark,
+            "full_syncs": self.full_syncs,
+            "delta_syncs": self.delta_syncs,
+            "sync_errors": self.sync_errors,
+            "case_sync_errors": self.case_sync_errors,
+            "categories": {k: len(v) for k, v in self._by_category.items()},
+            "attendance_bands": {k: len(v) for k, v in self._by_band.items()},
+            "orphanages": len(self._by_orphanage)
+        }
+
+
+# ============================================================
+# SHARED INSTANCE
+# ============================================================
+
+_catalog = ChildrenCatalog()
+
+
+def get_catalog() -> ChildrenCatalog:
+    return _catalog
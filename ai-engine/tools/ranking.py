@@ -0,0 +1,108 @@
+# ============================================================
+# tools/ranking.py — Composite Urgency Score
+# One number per child (0.0 → 1.0, higher = more urgent) built
+# from everything the backend knows about them:
+#
+#   attendance   how far attendanceStats.percentage has dropped
+#   behavior     worst severity among the most recent behavioralNotes
+#   medical      highest urgencyLevel among the child's open MedicalCases
+#   funding      remaining targetAmount - amountRaised on those cases
+#
+# The children catalog stores the score per child and recomputes
+# it only when that child or one of their cases changes, so
+# ranking is a heap over precomputed floats — O(n log k), never
+# a full sort per request.
+# ============================================================
+
+import heapq
+from typing import Iterable, List, Optional
+
+# How much each signal contributes (sums to 1.0)
+URGENCY_WEIGHTS = {
+    "attendance": 0.30,
+    "behavior": 0.20,
+    "medical": 0.35,
+    "funding": 0.15,
+}
+
+SEVERITY_SCORES = {"low": 0.2, "medium": 0.5, "high": 1.0}
+MEDICAL_URGENCY_SCORES = {"low": 0.25, "medium": 0.5, "high": 0.75, "critical": 1.0}
+
+# Attendance at or below (100 - this) scores the full weight
+ATTENDANCE_SPAN = 50
+
+# Only the latest notes count — an old incident shouldn't rank forever
+RECENT_NOTES = 5
+
+# Remaining funding (₹) that scores half the funding weight;
+# the score approaches the full weight as the gap grows
+FUNDING_GAP_SCALE = 50000
+
+
+def case_child_id(case: dict) -> Optional[str]:
+    """
+    Id of the child a MedicalCase belongs to.
+    """
+
+    child = case.get("child")
+    if isinstance(child, dict):   # populated
+        return child.get("_id")
+    return child
+
+
+def urgency_score(child: dict, cases: Iterable[dict] = ()) -> float:
+    """
+    Composite urgency for one child.
+
+    Args:
+        child : Child document from the backend
+        cases : the child's OPEN MedicalCase documents
+
+    Returns:
+        float in [0, 1]
+    """
+
+    percentage = (child.get("attendanceStats") or {}).get("percentage", 100)
+    attendance = min(max((100 - percentage) / ATTENDANCE_SPAN, 0.0), 1.0)
+
+    notes = (child.get("behavioralNotes") or [])[-RECENT_NOTES:]
+    behavior = max((SEVERITY_SCORES.get(n.get("severity"), 0.0) for n in notes), default=0.0)
+
+    medical, gap = 0.0, 0.0
+    for case in cases:
+        medical = max(medical, MEDICAL_URGENCY_SCORES.get(case.get("urgencyLevel"), 0.0))
+        gap += max((case.get("targetAmount") or 0) - (case.get("amountRaised") or 0), 0)
+    funding = gap / (gap + FUNDING_GAP_SCALE)
+
+    score = (
+        URGENCY_WEIGHTS["attendance"] * attendance
+        + URGENCY_WEIGHTS["behavior"] * behavior
+        + URGENCY_WEIGHTS["medical"] * medical
+        + URGENCY_WEIGHTS["funding"] * funding
+    )
+    return round(score, 4)
+
+
+def urgency_of(item: dict) -> float:
+    """
+    Ranking key for any search result: the catalog's precomputed
+    urgencyScore, an explicit "urgency" (orphanages), or a score
+    computed on the spot (children fetched straight from the backend).
+    """
+
+    if "urgencyScore" in item:
+        return item["urgencyScore"]
+    if "urgency" in item:
+        return item["urgency"]
+    return urgency_score(item)
+
+
+def top_k(items: List[dict], k: Optional[int] = None) -> List[dict]:
+    """
+    Most urgent first. With k, only the top k are kept — a heap
+    of size k instead of sorting everything.
+    """
+
+    if k is None:
+        return sorted(items, key=urgency_of, reverse=True)
+    return heapq.nlargest(k, items, key=urgency_of)
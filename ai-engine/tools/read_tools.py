@@ -1,25 +1,63 @@
-import httpx
-import os
-from dotenv import load_dotenv
+from tools.backend_client import backend_get
+from tools.children_catalog import get_catalog
+from tools.ranking import top_k
+from tools.allocation import allocate
 
-load_dotenv()
-BACKEND_API_URL = os.getenv("BACKEND_API_URL", "http://localhost:5000/api")
+# Fields a proposal needs, plus everything urgency_score reads
+# (attendanceStats, behavioralNotes) so backend results rank the same
+# as catalog ones — documents are left out, they are the bulk of each
+# child document
+CHILD_SEARCH_FIELDS = [
+    "name", "age", "education", "orphanage", "attendanceStats", "academicRecord", "behavioralNotes", "updatedAt"
+]
+
+# Cold-path searches fetch this many candidates (the backend's
+# MAX_LIMIT), lowest attendance first, and rank them here — a plain
+# limit=max_results would be an arbitrary page, not the most urgent
+COLD_SEARCH_POOL = 100
 
 async def search_children(category=None, max_results=3, urgent_only=False):
     """
     Search database for matching children.
+    Answered from the in-memory catalog once it has loaded;
+    until then the backend filters and projects a pool of
+    COLD_SEARCH_POOL candidates, ranked here by urgency_score.
     """
     print(f"[read_tools] Searching children: category={category}, urgent={urgent_only}")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{BACKEND_API_URL}/children")
-            if response.status_code == 200:
-                children = response.json().get("data", [])
-                if urgent_only:
-                    children = [c for c in children if c.get("attendanceStats", {}).get("percentage", 100) < 80]
-                return children[:max_results]
-        except Exception as e:
-            print(f"[read_tools] Error searching children: {e}")
+
+    catalog = get_catalog()
+    if catalog.loaded:
+        return catalog.search(category=category, urgent_only=urgent_only, max_results=max_results)
+
+    params = {"limit": COLD_SEARCH_POOL, "sort": "attendance", "fields": ",".join(CHILD_SEARCH_FIELDS)}
+    if category:
+        params["category"] = category
+    if urgent_only:
+        params["urgentOnly"] = "true"
+
+    try:
+        response = await backend_get("children", params=params)
+        if response.status_code == 200:
+            return top_k(response.json().get("data", []), max_results)
+    except Exception as e:
+        print(f"[read_tools] Error searching children: {e}")
+    return []
+
+async def get_orphanage_children(orphanage_id, max_results):
+    """
+    Full profiles of an orphanage's children, most urgent first.
+    From the catalog once loaded, otherwise from the backend.
+    """
+    catalog = get_catalog()
+    if catalog.loaded:
+        return catalog.search(orphanage=orphanage_id, max_results=max_results)
+
+    try:
+        response = await backend_get("children", params={"orphanage": orphanage_id})
+        if response.status_code == 200:
+            return response.json().get("data", [])[:max_results]
+    except Exception as e:
+        print(f"[read_tools] Error loading children of orphanage {orphanage_id}: {e}")
     return []
 
 async def search_orphanages(supply_type=None, urgent_only=False, max_results=3):
@@ -33,17 +71,18 @@ async def search_orphanages(supply_type=None, urgent_only=False, max_results=3):
         {"id": "orp2", "name": "Bala Kalyan", "needs": supply_type or "Food & blankets", "urgency": 7}
     ][:max_results]
 
-def rank_by_urgency(items):
+def rank_by_urgency(items, k=None):
     """
-    Sort list by urgency_score descending.
+    Most urgent first, by the composite score in tools/ranking.py.
+    Pass k to keep only the top k (heap, not a full sort).
     """
-    return sorted(items, key=lambda x: x.get("urgency", 0), reverse=True)
+    return top_k(items, k)
 
-def calculate_allocation(amount, recipients):
+def calculate_allocation(amount, recipients, minimum=0, caps=None):
     """
-    Splits donation amount across recipients proportionally.
+    Splits donation amount across recipients by need — urgency,
+    open medical gaps, minimums and caps (see tools/allocation.py).
+    Returns {"allocations": [{"recipient", "amount"}] in whole
+    rupees, "unallocated": ₹ that could not be placed}.
     """
-    if not recipients:
-        return []
-    share = amount / len(recipients)
-    return [{"recipient": r, "amount": share} for r in recipients]
+    return allocate(amount, recipients, minimum=minimum, caps=caps)
@@ -1,34 +1,106 @@
-import httpx
-import os
-from dotenv import load_dotenv
+import asyncio
+import hashlib
+import uuid
 
-load_dotenv()
-BACKEND_API_URL = os.getenv("BACKEND_API_URL", "http://localhost:5000/api")
+from config.settings import WRITE_BATCH_SIZE, WRITE_CONCURRENCY
+from tools.backend_client import backend_post
 
-async def execute_donation(plan, user_id, confirmed):
+def _idempotency_key(nonce, user_id, index, recipient_id):
     """
-    Writes donation to DB via Node.js backend API.
+    Same proposal + same recipient → same key, so a retried or
+    re-confirmed write is recognised by the backend. The nonce is
+    random per proposal (memory/proposals.py), so a new proposal
+    with identical contents is a new donation.
+    """
+    raw = f"{nonce}:{user_id}:{index}:{recipient_id or 'general'}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+def build_donation_items(plan, user_id, allocations=None):
+    """
+    One backend donation item per allocation (or one for the whole
+    plan when there are none), each with an idempotency key.
+    """
+    nonce = plan.get("proposal_nonce") or uuid.uuid4().hex
+    if not allocations:
+        allocations = [{
+            "amount": plan.get("total_amount"),
+            "childId": plan.get("child_id"),
+            "orphanageId": plan.get("orphanage_id")
+        }]
+
+    items = []
+    for i, allocation in enumerate(allocations):
+        recipient = allocation.get("recipient") or {}
+        child_id = allocation.get("childId") or recipient.get("_id")
+        items.append({
+            "amount": allocation["amount"],
+            "message": plan.get("summary"),
+            "childId": child_id,
+            "orphanageId": allocation.get("orphanageId"),
+            "medicalCaseId": allocation.get("medicalCaseId"),
+            "idempotencyKey": _idempotency_key(nonce, user_id, i, child_id)
+        })
+    return items
+
+async def execute_donation(plan, user_id, confirmed, allocations=None):
+    """
+    Writes donations to DB via Node.js backend API.
+
+    All items go out as POST /donations/batch requests of up to
+    WRITE_BATCH_SIZE, at most WRITE_CONCURRENCY at a time — so a
+    plan split across many children costs about one round-trip.
+    Every item has an idempotency key, which makes retries safe.
+
+    Returns:
+        {"success", "results": [per-item {idempotencyKey, status, ...}]}
     """
     if not confirmed:
         raise ValueError("Donation must be confirmed before execution.")
 
-    print(f"[write_tools] Executing donation for user {user_id}")
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{BACKEND_API_URL}/donations",
-                json={
-                    "amount": plan.get("total_amount"),
-                    "message": plan.get("summary"),
-                    "childId": plan.get("child_id"),
-                    "orphanageId": plan.get("orphanage_id")
-                }
-            )
-            return response.json()
-        except Exception as e:
-            print(f"[write_tools] Error executing donation: {e}")
-            return {"success": False, "message": str(e)}
+    items = build_donation_items(plan, user_id, allocations)
+    print(f"[write_tools] Executing {len(items)} donation(s) for user {user_id}")
+
+    semaphore = asyncio.Semaphore(WRITE_CONCURRENCY)
+
+    async def send(batch):
+        async with semaphore:
+            try:
+                response = await backend_post("donations/batch", json={"items": batch}, idempotent=True)
+                body = response.json()
+                if response.status_code < 300 and body.get("success"):
+                    return body["data"]
+                message = body.get("message", f"HTTP {response.status_code}")
+            except Exception as e:
+                message = str(e)
+            print(f"[write_tools] Error executing donation batch: {message}")
+            return [{"idempotencyKey": item["idempotencyKey"], "status": "failed", "message": message}
+                    for item in batch]
+
+    batches = [items[i:i + WRITE_BATCH_SIZE] for i in range(0, len(items), WRITE_BATCH_SIZE)]
+    results = [r for batch_results in await asyncio.gather(*(send(b) for b in batches)) for r in batch_results]
+
+    return {
+        "success": all(r["status"] != "failed" for r in results),
+        "results": results
+    }
+
+def execution_outcome(allocations, execution_result):
+    """
+    Pairs each allocation with what the backend did with it.
+    execute_donation's results are in item order, one per
+    allocation.
+
+    Returns:
+        {"created": [...], "duplicate": [...], "failed": [...]} —
+        allocations; duplicates were already written by an earlier
+        attempt at the same proposal
+    """
+    outcome = {"created": [], "duplicate": [], "failed": []}
+    results = execution_result.get("results") or []
+    for i, allocation in enumerate(allocations):
+        status = results[i].get("status") if i < len(results) else "failed"
+        outcome[status if status in outcome else "failed"].append(allocation)
+    return outcome
 
 async def update_funding_status(child_id, amount):
     """
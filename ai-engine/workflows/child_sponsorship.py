@@ -1,22 +1,39 @@
-from tools.read_tools import search_children, rank_by_urgency
-from tools.write_tools import execute_donation, update_funding_status
+from tools.read_tools import search_children, rank_by_urgency, calculate_allocation
+from tools.write_tools import execute_donation, execution_outcome
+from tools.allocation import to_plan
+from agent.response_builder import describe_split, describe_outcome
+from config.settings import SPONSORSHIP_MIN_AMOUNT
 
-async def run(intent, user_id, mode="propose", proposal=None):
+def candidate_query(intent):
+    """
+    The search run in propose mode, as (function, kwargs).
+    operator.py starts it early to overlap with classification.
+    """
+    return search_children, {"category": "sponsorship"}
+
+async def run(intent, user_id, mode="propose", proposal=None, candidates=None):
     """
     Child Sponsorship Workflow.
     """
     print(f"[child_sponsorship] Mode: {mode}, Amount: ₹{intent.amount}")
 
     if mode == "propose":
-        results = await search_children(category="sponsorship")
-        ranked_results = rank_by_urgency(results)
-        top_matches = ranked_results[:3]
+        if candidates is None:
+            search, kwargs = candidate_query(intent)
+            candidates = await search(**kwargs)
+        top_matches = rank_by_urgency(candidates, k=3)
+        # Split now, so the user confirms who actually gets funded
+        split = calculate_allocation(intent.amount, top_matches, minimum=SPONSORSHIP_MIN_AMOUNT)
+        allocations = to_plan(split)
         summary = f"I've found {len(top_matches)} children who are looking for sponsorship. "
         summary += " ".join([f"{c['name']} (Age {c.get('age', 'N/A')})" for c in top_matches])
-        
+        summary += " " + describe_split(allocations, split["unallocated"])
+
         return {
             "summary": summary,
             "children": top_matches,
+            "allocations": allocations,
+            "unallocated": split["unallocated"],
             "total_amount": intent.amount,
             "type": "monthly_sponsorship",
             "has_write_action": True
@@ -25,12 +42,17 @@ async def run(intent, user_id, mode="propose", proposal=None):
     elif mode == "execute":
         if not proposal:
             raise ValueError("Proposal missing for execution")
-        execution_result = await execute_donation(proposal, user_id, confirmed=True)
-        for child in proposal.get("children", []):
-            await update_funding_status(child.get("_id"), proposal["total_amount"] / len(proposal["children"]))
-        impact = f"Thank you! You have started a monthly sponsorship of ₹{proposal['total_amount']} for these children."
+        # The split the user confirmed, in one batched write
+        allocations = proposal.get("allocations") or []
+        if not allocations:
+            return {"success": False, "impact_summary": describe_split(allocations), "details": None}
+        execution_result = await execute_donation(proposal, user_id, confirmed=True, allocations=allocations)
+        impact = describe_outcome(
+            execution_outcome(allocations, execution_result),
+            "Thank you! You have started a monthly sponsorship of {amount} for {names}."
+        )
         return {
-            "success": True,
+            "success": execution_result["success"],
             "impact_summary": impact,
             "details": execution_result
         }
@@ -1,29 +1,51 @@
-from tools.read_tools import search_children, rank_by_urgency
-from tools.write_tools import execute_donation
+from tools.read_tools import search_children, rank_by_urgency, calculate_allocation
+from tools.write_tools import execute_donation, execution_outcome
+from tools.allocation import to_plan
+from agent.response_builder import describe_split, describe_outcome
 
-async def run(intent, user_id, mode="propose", proposal=None):
+def candidate_query(intent):
+    """
+    The search run in propose mode, as (function, kwargs).
+    operator.py starts it early to overlap with classification.
+    """
+    return search_children, {"category": "education"}
+
+async def run(intent, user_id, mode="propose", proposal=None, candidates=None):
     """
     Education Donation Workflow.
     """
     print(f"[education_donation] Mode: {mode}, Amount: ₹{intent.amount}")
 
     if mode == "propose":
-        results = await search_children(category="education")
-        ranked_results = rank_by_urgency(results)
-        top_matches = ranked_results[:3]
+        if candidates is None:
+            search, kwargs = candidate_query(intent)
+            candidates = await search(**kwargs)
+        top_matches = rank_by_urgency(candidates, k=3)
+        split = calculate_allocation(intent.amount, top_matches)
+        allocations = to_plan(split)
         summary = f"I've found {len(top_matches)} children needing help with education costs. "
+        summary += describe_split(allocations, split["unallocated"])
         return {
             "summary": summary,
             "children": top_matches,
+            "allocations": allocations,
+            "unallocated": split["unallocated"],
             "total_amount": intent.amount,
             "has_write_action": True
         }
 
     elif mode == "execute":
         if not proposal: raise ValueError("Proposal missing")
-        execution_result = await execute_donation(proposal, user_id, confirmed=True)
+        allocations = proposal.get("allocations") or []
+        if not allocations:
+            return {"success": False, "impact_summary": describe_split(allocations), "details": None}
+        execution_result = await execute_donation(proposal, user_id, confirmed=True, allocations=allocations)
+        impact = describe_outcome(
+            execution_outcome(allocations, execution_result),
+            "Your {amount} donation for the education of {names} is complete!"
+        )
         return {
-            "success": True,
-            "impact_summary": f"Your ₹{proposal['total_amount']} donation for education is complete!",
+            "success": execution_result["success"],
+            "impact_summary": impact,
             "details": execution_result
         }
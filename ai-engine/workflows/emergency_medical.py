@@ -1,29 +1,66 @@
-from tools.read_tools import search_children, rank_by_urgency
-from tools.write_tools import execute_donation
+from tools.read_tools import search_children, rank_by_urgency, calculate_allocation
+from tools.write_tools import execute_donation, execution_outcome
+from tools.allocation import to_plan
+from agent.response_builder import describe_split, describe_outcome
+from tools.children_catalog import get_catalog
+from tools.ranking import MEDICAL_URGENCY_SCORES
 
-async def run(intent, user_id, mode="propose", proposal=None):
+def _most_urgent_case_id(child_id):
+    """
+    The child's most urgent open MedicalCase, so the donation is
+    credited to it. None if the catalog knows of no open case.
+    """
+    cases = get_catalog().open_cases(child_id)
+    if not cases:
+        return None
+    case = max(cases, key=lambda c: MEDICAL_URGENCY_SCORES.get(c.get("urgencyLevel"), 0.0))
+    return case["_id"]
+
+def candidate_query(intent):
+    """
+    The search run in propose mode, as (function, kwargs).
+    operator.py starts it early to overlap with classification.
+    """
+    return search_children, {"category": "medical", "urgent_only": True}
+
+async def run(intent, user_id, mode="propose", proposal=None, candidates=None):
     """
     Emergency Medical Workflow.
     """
     print(f"[emergency_medical] Mode: {mode}, Amount: ₹{intent.amount}")
 
     if mode == "propose":
-        results = await search_children(category="medical", urgent_only=True)
-        ranked_results = rank_by_urgency(results)
-        top_matches = ranked_results[:2]
-        summary = "I have identified the most urgent medical cases requiring immediate assistance."
+        if candidates is None:
+            search, kwargs = candidate_query(intent)
+            candidates = await search(**kwargs)
+        top_matches = rank_by_urgency(candidates, k=2)
+        split = calculate_allocation(intent.amount, top_matches)
+        allocations = to_plan(split)
+        for allocation in allocations:
+            allocation["medicalCaseId"] = _most_urgent_case_id(allocation["childId"])
+        summary = "I have identified the most urgent medical cases requiring immediate assistance. "
+        summary += describe_split(allocations, split["unallocated"])
         return {
             "summary": summary,
             "children": top_matches,
+            "allocations": allocations,
+            "unallocated": split["unallocated"],
             "total_amount": intent.amount,
             "has_write_action": True
         }
 
     elif mode == "execute":
         if not proposal: raise ValueError("Proposal missing")
-        execution_result = await execute_donation(proposal, user_id, confirmed=True)
+        allocations = proposal.get("allocations") or []
+        if not allocations:
+            return {"success": False, "impact_summary": describe_split(allocations), "details": None}
+        execution_result = await execute_donation(proposal, user_id, confirmed=True, allocations=allocations)
+        impact = describe_outcome(
+            execution_outcome(allocations, execution_result),
+            "Emergency medical aid of {amount} has been dispatched for {names}. Thank you for your fast action!"
+        )
         return {
-            "success": True,
-            "impact_summary": "Emergency medical aid has been dispatched. Thank you for your fast action!",
+            "success": execution_result["success"],
+            "impact_summary": impact,
             "details": execution_result
         }
@@ -1,8 +1,18 @@
 from tools.read_tools import search_orphanages, rank_by_urgency
-from tools.write_tools import execute_donation
-from agent.response_builder import build_impact_summary
+from tools.write_tools import execute_donation, execution_outcome
+from agent.response_builder import build_impact_summary, describe_outcome
 
-async def run(intent, user_id, mode="propose", proposal=None):
+def candidate_query(intent):
+    """
+    The search run in propose mode, as (function, kwargs).
+    operator.py starts it early to overlap with classification.
+    """
+    return search_orphanages, {
+        "supply_type": intent.filters.get("item", "General supplies"),
+        "urgent_only": intent.filters.get("urgent", False)
+    }
+
+async def run(intent, user_id, mode="propose", proposal=None, candidates=None):
     """
     Orphanage Supply Workflow.
     """
@@ -10,11 +20,10 @@ async def run(intent, user_id, mode="propose", proposal=None):
 
     if mode == "propose":
         supply_type = intent.filters.get("item", "General supplies")
-        urgent_only = intent.filters.get("urgent", False)
-        results = await search_orphanages(supply_type, urgent_only)
-        ranked_results = rank_by_urgency(results)
-        
-        top_matches = ranked_results[:3]
+        if candidates is None:
+            search, kwargs = candidate_query(intent)
+            candidates = await search(**kwargs)
+        top_matches = rank_by_urgency(candidates, k=3)
         summary = f"I've found {len(top_matches)} orphanages that urgently need {supply_type}. "
         summary += " ".join([f"{o['name']} (Urgency: {o['urgency']}/10)" for o in top_matches])
         
@@ -30,9 +39,14 @@ async def run(intent, user_id, mode="propose", proposal=None):
         if not proposal:
             raise ValueError("Proposal missing for execution")
         execution_result = await execute_donation(proposal, user_id, confirmed=True)
-        impact = f"Success! Your donation of ₹{proposal['total_amount']} has been processed for {proposal['item']} supplies."
+        # One whole-plan item (no allocations)
+        donated = [{"name": f"{proposal['item']} supplies", "amount": proposal["total_amount"] or 0}]
+        impact = describe_outcome(
+            execution_outcome(donated, execution_result),
+            "Success! Your donation of {amount} has been processed for {names}."
+        )
         return {
-            "success": True,
+            "success": execution_result["success"],
             "impact_summary": impact,
             "details": execution_result
         }
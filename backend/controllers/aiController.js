@@ -1,3 +1,4 @@
+const { pipeline } = require("stream");
 const aiAgents = require("../services/aiAgents");
 
 exports.predictRisk = async (req, res) => {
@@ -9,6 +10,27 @@ exports.predictRisk = async (req, res) => {
     }
 };
 
+// Streams NDJSON straight through from the AI engine, so the first
+// results show up while the rest of the orphanage is still being scored.
+// pipeline() tears down both sides together: if the engine drops
+// mid-stream the response is destroyed (the client sees a truncated
+// stream without the final {"done": true} line), and if the client
+// disconnects the upstream request is aborted.
+exports.predictRiskBatch = async (req, res) => {
+    try {
+        const stream = await aiAgents.predictRiskBatch(req.params.orphanageId);
+        res.status(200).set("Content-Type", "application/x-ndjson");
+        pipeline(stream, res, (error) => {
+            // A client disconnect shows up as a premature close — not an error
+            if (error && error.code !== "ERR_STREAM_PREMATURE_CLOSE") {
+                console.error("Risk batch stream failed:", error.message);
+            }
+        });
+    } catch (error) {
+        res.status(500).json({ success: false, message: error.message });
+    }
+};
+
 exports.matchSchemes = async (req, res) => {
     try {
         const matches = await aiAgents.matchSchemes(req.params.childId);
@@ -43,6 +65,21 @@ exports.matchOpportunity = async (req, res) => {
     }
 };
 
+// Same bounds as CohortRequest.k in the AI engine
+const COHORT_MAX_K = 50;
+
+exports.matchTransitionCohort = async (req, res) => {
+    try {
+        const withinDays = parseInt(req.query.withinDays, 10) || 365;
+        const k = Math.min(Math.max(parseInt(req.query.k, 10) || 5, 1), COHORT_MAX_K);
+        const assign = req.query.assign === "true";
+        const result = await aiAgents.matchTransitionCohort({ withinDays, k, assign });
+        res.status(200).json({ success: true, result });
+    } catch (error) {
+        res.status(500).json({ success: false, message: error.message });
+    }
+};
+
 exports.chat = async (req, res) => {
     try {
         // req.user corresponds to the JWT parsed user if protect middleware used
@@ -1,6 +1,8 @@
 const Child = require("../models/Child");
 const Achievement = require("../models/Achievement");
 const User = require("../models/User");
+const MedicalCase = require("../models/MedicalCase");
+const { invalidateChildAnalyses } = require("../services/aiAgents");
 
 // CREATE
 exports.createChild = async (req, res) => {
@@ -23,11 +25,100 @@ exports.createChild = async (req, res) => {
     }
 };
 
+// Search categories used by the AI engine's workflows. The Child model has no
+// category field, so these mirror the rules in ai-engine/tools/children_catalog.py
+const URGENT_ATTENDANCE = 80;
+const CATEGORY_FILTERS = {
+    sponsorship: {},
+    education: {
+        $or: [
+            { age: { $lte: 18 } },
+            { age: null },
+            { education: { $nin: [null, ""] } },
+            { academicRecord: { $exists: true } }
+        ]
+    },
+    medical: {
+        $or: [
+            { "attendanceStats.percentage": { $lt: URGENT_ATTENDANCE } },
+            { "behavioralNotes.severity": "high" }
+        ]
+    }
+};
+const MAX_LIMIT = 100;
+
+// The catalog also puts every child with an open MedicalCase in "medical".
+// Cases live in their own collection, so that part of the rule is resolved
+// per request: a case with no status counts as open, as in the catalog.
+async function categoryFilter(category) {
+    if (category !== "medical") return CATEGORY_FILTERS[category];
+    const withOpenCase = await MedicalCase.distinct("child", { status: { $nin: ["funded", "closed"] } });
+    return { $or: [...CATEGORY_FILTERS.medical.$or, { _id: { $in: withOpenCase } }] };
+}
+
 // READ ALL
+// Optional query parameters (all used by the AI engine):
+//   updatedSince=<ISO date>  only children changed at or after that time
+//                            (incremental catalog sync)
+//   category=<name>          one of CATEGORY_FILTERS
+//   urgentOnly=true          attendance below URGENT_ATTENDANCE
+//   orphanage=<id>           only that orphanage's children
+//   limit=<n>                at most n children (capped at MAX_LIMIT)
+//   sort=attendance          lowest attendance first, so a limited page
+//                            holds the likeliest urgent children
+//   fields=a,b,c             projection — only these fields are returned
+// `total` is the size of the whole collection, so the engine can notice
+// deletions, which never show up in a delta.
 exports.getChildren = async (req, res) => {
     try {
-        const children = await Child.find().populate("orphanage", "name email");
-        res.status(200).json({ success: true, data: children });
+        const { updatedSince, category, urgentOnly, orphanage, limit, fields, sort } = req.query;
+        const conditions = [];
+
+        if (updatedSince) {
+            const since = new Date(updatedSince);
+            if (isNaN(since)) {
+                return res.status(400).json({ success: false, message: "Invalid updatedSince date" });
+            }
+            conditions.push({ updatedAt: { $gte: since } });
+        }
+        if (category && CATEGORY_FILTERS[category]) {
+            conditions.push(await categoryFilter(category));
+        }
+        if (urgentOnly === "true") {
+            conditions.push({ "attendanceStats.percentage": { $lt: URGENT_ATTENDANCE } });
+        }
+        if (orphanage) {
+            conditions.push({ orphanage });
+        }
+
+        const filter = conditions.length ? { $and: conditions } : {};
+        let query = Child.find(filter);
+
+        if (fields) {
+            const selected = fields.split(",")
+                .map(f => f.trim())
+                .filter(f => ["real", "nested"].includes(Child.schema.pathType(f)));
+            query = query.select(selected.join(" "));
+            if (selected.includes("orphanage")) query = query.populate("orphanage", "name email");
+        } else {
+            query = query.populate("orphanage", "name email");
+        }
+
+        if (updatedSince) query = query.sort({ updatedAt: 1 });
+        else if (sort === "attendance") query = query.sort({ "attendanceStats.percentage": 1, _id: 1 });
+        if (limit) {
+            const n = parseInt(limit, 10);
+            if (!(n > 0)) {
+                return res.status(400).json({ success: false, message: "Invalid limit" });
+            }
+            query = query.limit(Math.min(n, MAX_LIMIT));
+        }
+
+        const [children, total] = await Promise.all([
+            query.lean(),
+            Child.estimatedDocumentCount()
+        ]);
+        res.status(200).json({ success: true, data: children, total });
     } catch (error) {
         res.status(500).json({ success: false, message: error.message });
     }
@@ -50,6 +141,7 @@ exports.updateChild = async (req, res) => {
     try {
         const child = await Child.findByIdAndUpdate(req.params.id, req.body, { new: true, runValidators: true });
         if (!child) return res.status(404).json({ success: false, message: "Child not found" });
+        invalidateChildAnalyses(child._id);
         res.status(200).json({ success: true, data: child });
     } catch (error) {
         res.status(500).json({ success: false, message: error.message });
@@ -61,6 +153,7 @@ exports.deleteChild = async (req, res) => {
     try {
         const child = await Child.findByIdAndDelete(req.params.id);
         if (!child) return res.status(404).json({ success: false, message: "Child not found" });
+        invalidateChildAnalyses(child._id);
         res.status(200).json({ success: true, message: "Child deleted" });
     } catch (error) {
         res.status(500).json({ success: false, message: error.message });
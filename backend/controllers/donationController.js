@@ -1,5 +1,8 @@
 const Donation = require("../models/Donation");
 const Child = require("../models/Child");
+const MedicalCase = require("../models/MedicalCase");
+
+const MAX_BATCH_SIZE = 500;
 
 exports.createDonation = async (req, res) => {
   try {
@@ -48,6 +51,100 @@ exports.createDonation = async (req, res) => {
   }
 };
 
+// BATCH CREATE
+// POST /donations/batch  { items: [{ amount, message, childId, orphanageId,
+//                                     medicalCaseId, idempotencyKey }] }
+// One request for a whole multi-recipient donation. Every item needs an
+// idempotencyKey: an item whose key already exists is returned as-is
+// ("duplicate") instead of being written again, so the caller can retry
+// the whole batch safely. Medical cases are credited only for new items.
+exports.createDonations = async (req, res) => {
+  try {
+    const items = req.body.items;
+    if (!Array.isArray(items) || items.length === 0 || items.length > MAX_BATCH_SIZE) {
+      return res.status(400).json({ success: false, message: `items must be an array of 1-${MAX_BATCH_SIZE} donations` });
+    }
+    if (items.some(item => !item.idempotencyKey || !(item.amount > 0))) {
+      return res.status(400).json({ success: false, message: "Every item needs an idempotencyKey and a positive amount" });
+    }
+
+    // One lookup for every child's orphanage
+    const childIds = items.filter(item => item.childId).map(item => item.childId);
+    const children = await Child.find({ _id: { $in: childIds } }).select("orphanage").lean();
+    const orphanageOf = new Map(children.map(c => [String(c._id), c.orphanage]));
+
+    const docs = items.map(item => {
+      const doc = {
+        donor: req.user.id,
+        amount: item.amount,
+        message: item.message || `Donation for ${item.childId ? 'Child' : 'General Support'}`,
+        fundType: "general",
+        orphanage: item.orphanageId,
+        idempotencyKey: item.idempotencyKey
+      };
+      const knownChild = item.childId && orphanageOf.has(String(item.childId));
+      if (knownChild) doc.orphanage = orphanageOf.get(String(item.childId));
+
+      if (item.medicalCaseId) {
+        Object.assign(doc, { fundType: "medical", targetModel: "MedicalCase", targetRef: item.medicalCaseId });
+      } else if (knownChild) {
+        Object.assign(doc, { fundType: "individual_sponsorship", targetModel: "Child", targetRef: item.childId });
+      }
+      return doc;
+    });
+
+    // Insert-if-absent by idempotencyKey, all in one round-trip
+    const write = await Donation.bulkWrite(
+      docs.map(doc => ({
+        updateOne: {
+          filter: { idempotencyKey: doc.idempotencyKey },
+          update: { $setOnInsert: doc },
+          upsert: true
+        }
+      })),
+      { ordered: false }
+    );
+    const inserted = new Set(Object.keys(write.upsertedIds || {}).map(Number));
+
+    // Credit medical cases for newly written donations only
+    const credits = items
+      .map((item, i) => ({ item, i }))
+      .filter(({ item, i }) => item.medicalCaseId && inserted.has(i))
+      .map(({ item }) => ({
+        updateOne: {
+          filter: { _id: item.medicalCaseId },
+          update: [
+            { $set: { amountRaised: { $add: [{ $ifNull: ["$amountRaised", 0] }, item.amount] } } },
+            { $set: { status: { $cond: [{ $gte: ["$amountRaised", "$targetAmount"] }, "funded", "$status"] } } }
+          ]
+        }
+      }));
+    if (credits.length) await MedicalCase.bulkWrite(credits, { ordered: false });
+
+    const saved = await Donation.find({ idempotencyKey: { $in: docs.map(d => d.idempotencyKey) } }).lean();
+    const byKey = new Map(saved.map(d => [d.idempotencyKey, d]));
+    const results = docs.map((doc, i) => ({
+      idempotencyKey: doc.idempotencyKey,
+      status: inserted.has(i) ? "created" : "duplicate",
+      data: byKey.get(doc.idempotencyKey)
+    }));
+
+    const io = req.app.get("io");
+    if (io) {
+      results.filter(r => r.status === "created").forEach(r => io.emit("new_donation", {
+        amount: r.data.amount,
+        message: r.data.message,
+        fundType: r.data.fundType
+      }));
+    }
+
+    res.status(201).json({ success: true, data: results });
+  } catch (error) {
+    console.error("Batch donation error:", error);
+    res.status(500).json({ success: false, message: error.message });
+  }
+};
+
 exports.getMyDonations = async (req, res) => {
   try {
     const donations = await Donation.find({
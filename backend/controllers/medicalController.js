@@ -9,9 +9,20 @@ exports.createMedicalCase = async (req, res) => {
     }
 };
 
+// ?updatedSince=<ISO date> returns only cases changed at or after that time
+// (used by the AI engine's catalog to keep urgency scores current)
 exports.getMedicalCases = async (req, res) => {
     try {
-        const cases = await MedicalCase.find().populate("child");
+        const filter = {};
+        if (req.query.updatedSince) {
+            const since = new Date(req.query.updatedSince);
+            if (isNaN(since)) {
+                return res.status(400).json({ success: false, message: "Invalid updatedSince date" });
+            }
+            filter.updatedAt = { $gte: since };
+        }
+
+        const cases = await MedicalCase.find(filter).populate("child");
         res.status(200).json({ success: true, data: cases });
     } catch (error) {
         res.status(500).json({ success: false, message: error.message });
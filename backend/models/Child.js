@@ -45,4 +45,7 @@ const childSchema = new mongoose.Schema(
   { timestamps: true }
 );
 
+// Incremental sync queries filter on updatedAt
+childSchema.index({ updatedAt: 1 });
+
 module.exports = mongoose.model("Child", childSchema);
\ No newline at end of file
@@ -30,6 +30,12 @@ const donationSchema = new mongoose.Schema({
     type: mongoose.Schema.Types.ObjectId,
     ref: "User",
     required: false // Optional for general platform donations
+  },
+  // Client-chosen key so a retried request never creates a second donation
+  idempotencyKey: {
+    type: String,
+    unique: true,
+    sparse: true
   }
 }, { timestamps: true });
 
@@ -47,4 +47,10 @@ const medicalCaseSchema = new mongoose.Schema(
     { timestamps: true }
 );
 
+// Incremental sync queries filter on updatedAt
+medicalCaseSchema.index({ updatedAt: 1 });
+
+// Children with an open case (the "medical" search category)
+medicalCaseSchema.index({ status: 1, child: 1 });
+
 module.exports = mongoose.model("MedicalCase", medicalCaseSchema);
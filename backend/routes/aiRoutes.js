@@ -2,7 +2,7 @@ const express = require("express");
 const router = express.Router();
 const multer = require("multer");
 const path = require("path");
-const { predictRisk, matchSchemes, processDocument, matchOpportunity, chat } = require("../controllers/aiController");
+const { predictRisk, predictRiskBatch, matchSchemes, processDocument, matchOpportunity, matchTransitionCohort, chat } = require("../controllers/aiController");
 const { protect } = require("../middleware/authMiddleware");
 
 // Configure Multer storage
@@ -23,10 +23,12 @@ router.post("/chat", chat);
 // All other AI functionalities require protection
 router.use(protect);
 
+router.get("/predict-risk/orphanage/:orphanageId", predictRiskBatch);
 router.get("/predict-risk/:childId", predictRisk);
 router.get("/match-schemes/:childId", matchSchemes);
 // Use multer for the process-document route
 router.post("/process-document", upload.single('documentFile'), processDocument);
 router.get("/match-opportunity/:childId", matchOpportunity);
+router.get("/transition-matches", matchTransitionCohort);
 
 module.exports = router;
\ No newline at end of file
@@ -3,6 +3,7 @@ const router = express.Router();
 
 const {
   createDonation,
+  createDonations,
   getMyDonations
 } = require("../controllers/donationController");
 
@@ -11,6 +12,9 @@ const { protect, authorize } = require("../middleware/authMiddleware");
 // Create donation (only donor)
 router.post("/", protect, authorize("donor"), createDonation);
 
+// Create several donations at once (AI engine multi-recipient plans)
+router.post("/batch", protect, authorize("donor"), createDonations);
+
 // Get my donations
 router.get("/my", protect, authorize("donor"), getMyDonations);
 
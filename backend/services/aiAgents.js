@@ -26,6 +26,27 @@ exports.predictRisk = async (childId) => {
     }
 };
 
+// Agent 1 (batch): screen every child of an orphanage in one call.
+// Resolves to the AI engine's NDJSON stream — one JSON line per child
+// as soon as it is scored, then {"done": true, "count": n}.
+exports.predictRiskBatch = async (orphanageId) => {
+    try {
+        const children = await Child.find({ orphanage: orphanageId }).lean();
+        if (children.length === 0) throw new Error("No children found for this orphanage");
+
+        console.log(`Screening ${children.length} children of orphanage ${orphanageId} via Python AI Engine`);
+
+        const response = await axios.post(`${PYTHON_API_URL}/ai/risk/batch`, {
+            children
+        }, { responseType: "stream" });
+
+        return response.data;
+    } catch (error) {
+        console.error("Error communicating with AI Engine:", error.message);
+        throw error;
+    }
+};
+
 // Agent 2: Smart Government Scheme Matching Agent
 exports.matchSchemes = async (childId) => {
     try {
@@ -77,7 +98,11 @@ exports.matchOpportunity = async (childId) => {
         const child = await Child.findById(childId);
         if (!child) throw new Error("Child not found");
 
-        const opportunities = await Opportunity.find({ status: "active" });
+        // The AI engine ranks the board itself (BM25) and only sends the
+        // best few to the LLM — ship just the fields it reads
+        const opportunities = await Opportunity.find({ status: "active" })
+            .select("title type provider description requirements location updatedAt")
+            .lean();
         console.log(`Analyzing ${opportunities.length} opportunities for ${child.name} via Python AI Engine`);
 
         const response = await axios.post(`${PYTHON_API_URL}/ai/opportunities`, {
@@ -92,6 +117,48 @@ exports.matchOpportunity = async (childId) => {
     }
 };
 
+// Drops the AI engine's cached analyses of a child after it changes.
+// Best effort — a failure only means an extra cache miss later.
+exports.invalidateChildAnalyses = async (childId) => {
+    try {
+        await axios.post(`${PYTHON_API_URL}/ai/cache/invalidate`, { childId: String(childId) });
+    } catch (error) {
+        console.error("Error invalidating AI Engine cache:", error.message);
+    }
+};
+
+// Agent 4 (cohort): every youth leaving care within `withinDays` against
+// the whole opportunity board in one call — per-child and per-opportunity
+// top-k, plus an optional capacity-aware assignment
+exports.matchTransitionCohort = async ({ withinDays = 365, k = 5, assign = false } = {}) => {
+    try {
+        const cutoff = new Date(Date.now() + withinDays * 24 * 60 * 60 * 1000);
+        const [children, opportunities] = await Promise.all([
+            Child.find({ "transitionTimeline.expectedExitDate": { $lte: cutoff } })
+                .select("name age skills education academicRecord transitionTimeline")
+                .lean(),
+            Opportunity.find({ status: "active" })
+                .select("title type requirements location")
+                .lean()
+        ]);
+
+        console.log(`Matching ${children.length} youth against ${opportunities.length} opportunities via Python AI Engine`);
+
+        const response = await axios.post(`${PYTHON_API_URL}/ai/opportunities/cohort`, {
+            children,
+            opportunities,
+            withinDays,
+            k,
+            assign
+        });
+
+        return response.data;
+    } catch (error) {
+        console.error("Error communicating with AI Engine:", error.message);
+        throw error;
+    }
+};
+
 // Agent 5: Chatbot Agent
 exports.chat = async (message, userRole) => {
     try {